@@ -1,11 +1,19 @@
 import os
-import joblib
+import sys
+import time
 import pandas as pd
 import numpy as np
 import traceback
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from dashboard_cache import ArtifactCache
+from model_registry import ModelRegistry
+from thread_budget import limit_estimator_threads
+from micro_batcher import MicroBatcher
+from prediction_cache import PredictionCache
+from marketing_engine import aggregate_gains, build_dashboard_payload
+
 # ─────────────────────────────────────────────
 # App setup & Pathing Logic
 # ─────────────────────────────────────────────
@@ -15,21 +23,104 @@ app = Flask(__name__)
 CORS(app, origins=["http://127.0.0.1:5500", "http://localhost:5500"])
 
 # ─────────────────────────────────────────────
-# Load models
+# Model registry (lazy loading + hot reload)
 # ─────────────────────────────────────────────
-try:
-    MODEL_PATH = os.path.join(BASE_DIR, "..", "models")
-    
-    churn_model = joblib.load(os.path.join(MODEL_PATH, "churn_predictor_v1.pkl"))
-    persona_model = joblib.load(os.path.join(MODEL_PATH, "persona_classifier.pkl"))
-    scaler = joblib.load(os.path.join(MODEL_PATH, "main_scaler.pkl"))
-    marketing_model = joblib.load(os.path.join(MODEL_PATH, "marketing_timeline_model.pkl"))
-    marketing_scaler = joblib.load(os.path.join(MODEL_PATH, "marketing_timeline_scaler.pkl"))
-    
-    print("✅ All Models loaded successfully.")
-except Exception as e:
-    print(f"❌ Critical Error loading files: {e}")
-    raise e
+MODEL_PATH = os.path.join(BASE_DIR, "..", "models")
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "src", "Models"))
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "src", "PreData"))
+
+from Compact_Models import FlatForestRegressor, FlatXGBClassifier, FlatKMeans, LookupGrid, current_churn_model_file
+from Lookup_Grid import GRID_FILE, source_files, source_digests
+from Persona_Alignment import persona_names, DEFAULT_PERSONA_NAMES
+from CVS_Storage import load_frame, resolve_frame_path
+
+# Prefer the flat, mmap-shared marketing forest when it has been exported
+# (python src/Models/Compact_Models.py); fall back to the sklearn pickle.
+marketing_forest_file = "marketing_timeline_forest.joblib"
+use_marketing_mmap = (
+    os.environ.get("MODEL_MMAP", "1") == "1"
+    and os.path.exists(os.path.join(MODEL_PATH, marketing_forest_file))
+)
+
+# Fused scaler + model pipelines written by the training scripts: one
+# predict() per endpoint and the scaler can't drift from its model. The
+# separate pickles stay as the fallback for models trained before them.
+# (The mmap forest, when exported, still wins for the marketing model.)
+pipeline_files = {
+    "churn_pipeline": "churn_pipeline.pkl",
+    "persona_pipeline": "persona_pipeline.pkl",
+    "marketing_pipeline": "marketing_timeline_pipeline.pkl",
+}
+use_pipelines = os.environ.get("MODEL_PIPELINES", "1") == "1"
+use_fused_scoring = use_pipelines and all(
+    os.path.exists(os.path.join(MODEL_PATH, pipeline_files[name])) for name in ["churn_pipeline", "persona_pipeline"]
+)
+use_marketing_pipeline = (
+    use_pipelines and not use_marketing_mmap
+    and os.path.exists(os.path.join(MODEL_PATH, pipeline_files["marketing_pipeline"]))
+)
+
+# NumPy-only churn/persona predictors (scaler folded in) when exported by the
+# training scripts or `python src/Models/Compact_Models.py`: scoring then
+# never imports xgboost/scikit-learn. They take precedence over the pipelines.
+flat_scoring_files = {
+    "churn_flat": "churn_predictor_flat.joblib",
+    "persona_flat": "persona_classifier_flat.joblib",
+}
+use_numpy_scoring = os.environ.get("MODEL_NUMPY", "1") == "1" and all(
+    os.path.exists(os.path.join(MODEL_PATH, f)) for f in flat_scoring_files.values()
+)
+
+# Precomputed persona/churn labels over the integer domain
+# (python src/Models/Lookup_Grid.py). Opt-in: memory-mapped, rows on the grid
+# are answered by indexing, every other row still goes through the models.
+use_lookup_grid = os.environ.get("MODEL_LOOKUP_GRID", "0") == "1" and os.path.exists(
+    os.path.join(MODEL_PATH, GRID_FILE)
+)
+
+# The churn pickle is the promoted version (churn_model_current.json) at
+# startup; promotions also rewrite the churn pipeline/flat export, which
+# hot-reload, so only the pickle fallback needs a restart to follow them.
+model_artifacts = {
+    "churn_model": current_churn_model_file(MODEL_PATH),
+    "persona_model": "persona_classifier.pkl",
+    "scaler": "main_scaler.pkl",
+    "marketing_model": marketing_forest_file if use_marketing_mmap else "marketing_timeline_model.pkl",
+    "marketing_scaler": "marketing_timeline_scaler.pkl",
+}
+if use_numpy_scoring:
+    model_artifacts.update(flat_scoring_files)
+if use_fused_scoring:
+    model_artifacts["churn_pipeline"] = pipeline_files["churn_pipeline"]
+    model_artifacts["persona_pipeline"] = pipeline_files["persona_pipeline"]
+if use_marketing_pipeline:
+    model_artifacts["marketing_pipeline"] = pipeline_files["marketing_pipeline"]
+if use_lookup_grid:
+    model_artifacts["label_grid"] = GRID_FILE
+
+# Compute threads per request, set by the production entry point (app/wsgi.py)
+# so concurrent requests don't oversubscribe the cores. Unset: models keep
+# their own n_jobs (dev server, one request at a time).
+model_threads = int(os.environ["MODEL_THREADS"]) if os.environ.get("MODEL_THREADS") else None
+
+registry = ModelRegistry(
+    MODEL_PATH,
+    model_artifacts,
+    watch=os.environ.get("MODEL_WATCH", "1") == "1",
+    check_interval=float(os.environ.get("MODEL_CHECK_INTERVAL", "1.0")),
+    loaders={
+        **({"marketing_model": FlatForestRegressor.load} if use_marketing_mmap else {}),
+        **({"churn_flat": FlatXGBClassifier.load, "persona_flat": FlatKMeans.load} if use_numpy_scoring else {}),
+        **({"label_grid": LookupGrid.load} if use_lookup_grid else {}),
+    },
+    on_load=(lambda model: limit_estimator_threads(model, model_threads)) if model_threads else None,
+)
+if os.environ.get("MODEL_PRELOAD", "0") == "1":
+    # Production: load everything up front (before the server forks workers)
+    registry.preload()
+    print("✅ Model registry ready (all models preloaded).")
+else:
+    print("✅ Model registry ready (models load on first use).")
 
 # ─────────────────────────────────────────────
 # Constants / Columns for new marketing model
@@ -42,22 +133,167 @@ persona_cols = ["Pers_0","Pers_1","Pers_2","Pers_3"]
 season_names = {0: "Autumn", 1: "Winter", 2: "Spring", 3: "Summer"}
 region_names = {"Reg_4": "Central Europe", "Reg_8": "UK", "Reg_Other": "Other"}
 
-persona_names_map = {
-    0: "Loyal High-Spender",
-    2: "At-Risk / Hibernating",
-    1: "Recent Explorer / Newbie",
-    3: "Loyal Active"
-
-}
-
 churn_names_map = {0: "Critique", 1: "Faible", 2: "Moyen", 3: "Élevé"}
 season_bonus_multiplier = 1.2  # 20% gain boost for clients favoring the season
 
 marketing_input_cols = numeric_cols + season_cols + region_cols + persona_cols
 
 # ─────────────────────────────────────────────
-# /api/predict_all
+# Shared scoring helpers (single row & batch)
 # ─────────────────────────────────────────────
+feature_names = ["Recency", "Frequency", "CustomerTenureDays"]
+max_batch_rows = 50000
+
+
+def parse_feature_row(row):
+    """Validate one [Recency, Frequency, CustomerTenureDays] row, return floats."""
+    if isinstance(row, dict):
+        missing = [f for f in feature_names if f not in row]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+        row = [row[f] for f in feature_names]
+    if not isinstance(row, (list, tuple)) or len(row) != len(feature_names):
+        raise ValueError(f"Expected {len(feature_names)} features {feature_names}")
+    values = [float(v) for v in row]
+    if not np.all(np.isfinite(values)):
+        raise ValueError("Features must be finite numbers")
+    return values
+
+
+# {id(grid): (source file keys, is_current, checked_at)}
+_grid_checks = {}
+
+
+def _grid_source_keys():
+    source_keys = []
+    # Current file names, so promoting another churn version invalidates the check too
+    for name in source_files(MODEL_PATH):
+        st = os.stat(os.path.join(MODEL_PATH, name))
+        source_keys.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(source_keys)
+
+
+def current_label_grid():
+    """The lookup grid, or None when it was built from other model files than the ones on disk."""
+    grid = registry.get("label_grid")
+    check = _grid_checks.get(id(grid))
+    # Like the registry, look at the source files at most every check_interval seconds
+    if check is not None and time.monotonic() - check[2] < registry.check_interval:
+        return grid if check[1] else None
+
+    try:
+        source_keys = _grid_source_keys()
+        if check is not None and check[0] == source_keys:
+            is_current = check[1]
+        else:
+            # Hash again only when the grid or one of its source files changed
+            is_current = source_digests(MODEL_PATH) == grid.sources
+            if not is_current:
+                print(f"⚠️ {GRID_FILE} is stale (models changed since it was built), scoring with the models")
+    except OSError as e:
+        # A source file is missing or being replaced: score with the models meanwhile
+        if check is None or check[0] is not None:
+            print(f"⚠️ Cannot check {GRID_FILE} sources ({e}), scoring with the models")
+        source_keys, is_current = None, False
+    _grid_checks.clear()
+    _grid_checks[id(grid)] = (source_keys, is_current, time.monotonic())
+    return grid if is_current else None
+
+
+def score_matrix(X):
+    """Scale + predict an (n, 3) array in one vectorized pass per model."""
+    grid = current_label_grid() if use_lookup_grid else None
+    if grid is not None:
+        X = np.asarray(X, dtype=float)
+        persona_idx, churn_idx, hit = grid.lookup(X)
+        if not hit.all():
+            persona_idx[~hit], churn_idx[~hit] = score_with_models(X[~hit])
+        return persona_idx.astype(int), churn_idx.astype(int)
+    return score_with_models(X)
+
+
+def score_with_models(X):
+    if use_numpy_scoring:
+        X = np.asarray(X, dtype=float)
+        persona_idx = registry.get("persona_flat").predict(X)
+        churn_idx = registry.get("churn_flat").predict(X)
+        return persona_idx.astype(int), churn_idx.astype(int)
+
+    if use_fused_scoring:
+        # Pipelines take the positional array as is: no DataFrame, no separate scaling
+        X = np.asarray(X, dtype=float)
+        persona_idx = registry.get("persona_pipeline").predict(X)
+        churn_idx = registry.get("churn_pipeline").predict(X)
+        return persona_idx.astype(int), churn_idx.astype(int)
+
+    features_scaled = registry.get("scaler").transform(pd.DataFrame(X, columns=feature_names))
+    persona_idx = registry.get("persona_model").predict(features_scaled)
+    churn_idx = registry.get("churn_model").predict(features_scaled)
+    return persona_idx.astype(int), churn_idx.astype(int)
+
+
+def served_persona_names():
+    """ID -> name stored in the served persona artifact (DEFAULT_PERSONA_NAMES for older models)."""
+    return persona_names(registry.get(persona_artifact), default=DEFAULT_PERSONA_NAMES)
+
+
+def format_prediction(persona_idx, churn_idx, names):
+    # names: served_persona_names(), resolved once per request (not per row)
+    return {
+        "persona_name": names[persona_idx],
+        "churn_risk": churn_names_map[churn_idx],
+        "raw_indices": {"persona": persona_idx, "churn": churn_idx}
+    }
+
+
+# Concurrent single-customer calls share one vectorized score_matrix() call.
+# Only worth it with a multi-threaded server (app/wsgi.py turns it on).
+use_micro_batching = os.environ.get("MICRO_BATCH", "0") == "1"
+micro_batcher = MicroBatcher(
+    score_matrix,
+    max_batch=int(os.environ.get("MICRO_BATCH_MAX_ROWS", "64")),
+    max_latency=float(os.environ.get("MICRO_BATCH_MAX_MS", "2")) / 1000,
+)
+
+# The front end asks for the same customer's triple many times per session.
+# Entries are tied to the registry versions of the artifacts score_matrix
+# uses, so reloading the churn or persona model empties the cache.
+prediction_cache_size = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+prediction_cache = PredictionCache(prediction_cache_size)
+if use_numpy_scoring:
+    scoring_artifacts = ["persona_flat", "churn_flat"]
+elif use_fused_scoring:
+    scoring_artifacts = ["persona_pipeline", "churn_pipeline"]
+else:
+    scoring_artifacts = ["scaler", "persona_model", "churn_model"]
+persona_artifact = next(name for name in scoring_artifacts if name.startswith("persona"))
+
+
+def scoring_version():
+    return tuple(registry.version(name) for name in scoring_artifacts)
+
+
+def predict_row(row):
+    """(persona, churn) of one validated row: cache, then micro-batch or direct scoring."""
+    key = tuple(row.tolist())
+    version = scoring_version() if prediction_cache_size else None
+    if prediction_cache_size:
+        cached = prediction_cache.get(key, version)
+        if cached is not None:
+            return cached
+
+    if use_micro_batching:
+        persona_idx, churn_idx = micro_batcher.submit(row)
+    else:
+        personas, churns = score_matrix(row[None, :])
+        persona_idx, churn_idx = personas[0], churns[0]
+    result = (int(persona_idx), int(churn_idx))
+
+    if prediction_cache_size:
+        prediction_cache.put(key, result, version)
+    return result
+
+
 # ─────────────────────────────────────────────
 # /api/predict_all
 # ─────────────────────────────────────────────
@@ -65,106 +301,158 @@ marketing_input_cols = numeric_cols + season_cols + region_cols + persona_cols
 def predict_all():
     try:
         data = request.get_json()
-        features = data["features"]
+        # Same per-row checks as /api/predict_batch (3 finite numbers), before
+        # the row becomes a cache key or joins a shared micro-batch
+        row = np.asarray(parse_feature_row(data["features"]), dtype=float)
+        return jsonify(format_prediction(*predict_row(row), served_persona_names()))
 
-        # Only 3 features
-        feature_names = ["Recency", "Frequency", "CustomerTenureDays"]
-        input_df = pd.DataFrame([features], columns=feature_names)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-        # Scale features
-        features_scaled = scaler.transform(input_df)
 
-        persona_idx = int(persona_model.predict(features_scaled)[0])
-        churn_idx = int(churn_model.predict(features_scaled)[0])
+@app.route('/api/predict_all/stats', methods=['GET'])
+def predict_all_stats():
+    return jsonify({
+        "micro_batching": micro_batcher.stats() if use_micro_batching else None,
+        "cache": prediction_cache.stats() if prediction_cache_size else None,
+    })
 
-        return jsonify({
-            "persona_name": persona_names_map[persona_idx],
-            "churn_risk": churn_names_map[churn_idx],
-            "raw_indices": {"persona": persona_idx, "churn": churn_idx}
-        })
 
+# ─────────────────────────────────────────────
+# /api/predict_batch
+# ─────────────────────────────────────────────
+@app.route('/api/predict_batch', methods=['POST'])
+def predict_batch():
+    """
+    Scores many customers at once: {"rows": [[Recency, Frequency, Tenure], ...]}.
+    Rows may also be objects keyed by feature name. Results come back in input
+    order; invalid rows get an "error" entry instead of failing the batch.
+    """
+    try:
+        data = request.get_json()
+        rows = data["rows"]
+        if not isinstance(rows, list):
+            raise ValueError("'rows' must be a list")
+        if len(rows) > max_batch_rows:
+            raise ValueError(f"Batch too large ({len(rows)} > {max_batch_rows} rows)")
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+    results = [None] * len(rows)
+    valid_pos, valid_values = [], []
+    for i, row in enumerate(rows):
+        try:
+            valid_values.append(parse_feature_row(row))
+            valid_pos.append(i)
+        except (TypeError, ValueError) as e:
+            results[i] = {"index": i, "error": str(e)}
+
+    try:
+        if valid_pos:
+            personas, churns = score_matrix(np.asarray(valid_values, dtype=float))
+            names = served_persona_names()
+            for i, p_idx, c_idx in zip(valid_pos, personas.tolist(), churns.tolist()):
+                results[i] = {"index": i, **format_prediction(p_idx, c_idx, names)}
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify({
+        "results": results,
+        "n_rows": len(rows),
+        "n_errors": len(rows) - len(valid_pos)
+    })
+
 
 # ─────────────────────────────────────────────
 # /api/marketing_dashboard
 # ─────────────────────────────────────────────
+marketing_csv_path = os.path.join(BASE_DIR, "..", "data", "MarketingTimelineData", "X_Train_Marketing.csv")
+
+
+def compute_marketing_dashboard():
+    """Runs the marketing model over the training customers and aggregates gains."""
+    customers = load_frame(marketing_csv_path)
+
+    # Build model input (missing columns -> 0)
+    X_scaled = customers.reindex(columns=marketing_input_cols, fill_value=0).fillna(0)
+
+    # Predict base gain (the pipeline scales the numeric features itself)
+    if use_marketing_pipeline:
+        predicted_gain = registry.get("marketing_pipeline").predict(X_scaled)
+    else:
+        X_scaled[numeric_cols] = registry.get("marketing_scaler").transform(X_scaled[numeric_cols])
+        predicted_gain = registry.get("marketing_model").predict(X_scaled)
+
+    # ── Season × Region aggregation (single vectorized pass) ──
+    season_totals, region_season = aggregate_gains(
+        predicted_gain,
+        X_scaled[season_cols].to_numpy(dtype=float),
+        X_scaled[region_cols].to_numpy(dtype=float),
+        bonus_multiplier=season_bonus_multiplier
+    )
+    return build_dashboard_payload(season_totals, region_season, season_names, region_names)
+
+
+# The payload only depends on the model, its scaler and the customers CSV:
+# serve it from memory until one of them is replaced on disk.
+# The registry versions are part of the key: the files can change before the
+# registry serves them (MODEL_CHECK_INTERVAL, MODEL_WATCH=0), and a payload
+# computed by the old model must not be stored for the new files.
+marketing_artifacts = ["marketing_pipeline"] if use_marketing_pipeline else ["marketing_model", "marketing_scaler"]
+dashboard_cache = ArtifactCache(
+    compute_marketing_dashboard,
+    [registry.path(name) for name in marketing_artifacts] + [lambda: resolve_frame_path(marketing_csv_path)],
+    use_hash=os.environ.get("DASHBOARD_CACHE_HASH", "0") == "1",
+    versions=lambda: [registry.version(name) for name in marketing_artifacts],
+)
+
+
 @app.route("/api/marketing_dashboard", methods=["GET"])
 def marketing_dashboard():
     try:
-        csv_path = os.path.join(BASE_DIR, "..", "data", "MarketingTimelineData", "X_Train_Marketing.csv")
-        customers = pd.read_csv(csv_path)
-
-        # ── Columns used by the marketing model
-        numeric_cols = ["Recency","Frequency","CustomerTenureDays","WeekendPurchaseRatio"]
-        season_cols  = ["Season_0","Season_1","Season_2","Season_3"]
-        region_cols  = ["Reg_4","Reg_8","Reg_Other"]
-        persona_cols = ["Pers_0","Pers_1","Pers_2","Pers_3"]
-        all_cols = numeric_cols + season_cols + region_cols + persona_cols
-
-        # Build model input
-        X = pd.DataFrame(0, index=customers.index, columns=all_cols)
-        for col in all_cols:
-            if col in customers.columns:
-                X[col] = customers[col].fillna(0)
-
-        # Scale numeric features only
-        X_scaled = X.copy()
-        X_scaled[numeric_cols] = marketing_scaler.transform(X[numeric_cols])
-
-        # Predict base gain
-        customers["predicted_gain"] = marketing_model.predict(X_scaled)
-
-        # ── Season Aggregation ──
-        season_names = {0: "Autumn", 1: "Winter", 2: "Spring", 3: "Summer"}
-        season_bonus_multiplier = 1.2
-        seasons_agg = {}
-
-        for s_idx, s_name in season_names.items():
-            gain_col = f"season_{s_idx}_gain"
-            season_col = f"Season_{s_idx}"
-
-            # Copy base gain and apply bonus if client prefers this season
-            customers[gain_col] = customers["predicted_gain"]
-            customers.loc[customers[season_col] > 0.8, gain_col] *= season_bonus_multiplier
-
-            # Aggregate total for season
-            season_total = customers[gain_col].sum()
-
-            # Top regions
-            top_regions = []
-            for region_col, region_label in {"Reg_4": "Central Europe", "Reg_8": "UK", "Reg_Other": "Other"}.items():
-                region_gain = customers.loc[customers[region_col] > 0.8, gain_col].sum()
-                top_regions.append({"region": region_label, "estimated_gain": round(region_gain,2)})
-
-            # Sort top 3 regions
-            top_regions.sort(key=lambda x: x["estimated_gain"], reverse=True)
-            seasons_agg[s_name] = {"season_total": round(season_total,2), "top_regions": top_regions[:3]}
-
-        # ── Region Aggregation ──
-        regions_view = []
-        for region_col, region_label in {"Reg_4": "Central Europe", "Reg_8": "UK", "Reg_Other": "Other"}.items():
-            s_gains = []
-            season_gain_cols = [f"season_{s_idx}_gain" for s_idx in season_names]
-            for s_idx, s_name in season_names.items():
-                gain = customers.loc[customers[region_col] > 0.8, f"season_{s_idx}_gain"].sum()
-                s_gains.append({"season": s_name, "estimated_gain": round(gain,2)})
-            total_annual_gain = customers.loc[customers[region_col] > 0.8, season_gain_cols].sum().sum()
-            regions_view.append({
-                "region": region_label,
-                "seasons_ranked": sorted(s_gains, key=lambda x: x["estimated_gain"], reverse=True),
-                "total_annual_gain": round(total_annual_gain,2)
-            })
-        regions_view.sort(key=lambda x: x["total_annual_gain"], reverse=True)
-
-        return jsonify({"seasons": seasons_agg, "regions": regions_view})
+        return jsonify(dashboard_cache.get())
 
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+
+# ─────────────────────────────────────────────
+# /api/models (registry status & explicit reload)
+# ─────────────────────────────────────────────
+@app.route("/api/models", methods=["GET"])
+def models_status():
+    return jsonify(registry.status())
+
+
+@app.route("/api/models/reload", methods=["POST"])
+def models_reload():
+    try:
+        data = request.get_json(silent=True) or {}
+        reloaded = registry.reload(data.get("name"))
+        if set(reloaded) & set(marketing_artifacts):
+            dashboard_cache.invalidate()
+        return jsonify({"reloaded": reloaded, "models": registry.status()})
+
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+
+# Opt-in warm-up so the first dashboard GET is already a cache hit. Off by
+# default: it loads the marketing model at import time, which lazy loading
+# avoids. gunicorn.conf.py turns it on for the preloading master, whose
+# workers then inherit the cached payload through fork.
+if os.environ.get("DASHBOARD_WARMUP", "0") == "1":
+    try:
+        dashboard_cache.warm_up()
+        print(f"✅ Marketing dashboard cached ({dashboard_cache.last_compute_seconds:.3f}s).")
+    except Exception as e:
+        print(f"⚠️ Dashboard warm-up failed, will retry on first request: {e}")
+
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     app.run(host="127.0.0.1", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import hashlib
+import threading
+import time
+
+
+# ─────────────────────────────────────────────
+# Artifact-keyed response cache
+# ─────────────────────────────────────────────
+class ArtifactCache:
+    """
+    Memoizes an expensive, argument-free computation (e.g. the marketing
+    dashboard payload) on the files it depends on.
+
+    The cache key is (path, mtime_ns, size) for every watched file, so a GET
+    only costs a few os.stat calls. When use_hash=True and the stat key moves,
+    the files are additionally SHA-256 hashed and the cached value is kept if
+    the content did not actually change (e.g. a plain `touch`).
+    A path may also be a callable returning the current file to watch.
+
+    `versions` (optional callable) returns extra key parts, e.g. the registry
+    versions of the models compute_fn uses: a file can change on disk before
+    the registry serves the new model, so the value is only reused while the
+    loaded models are the same too.
+    """
+
+    def __init__(self, compute_fn, paths, use_hash=False, versions=None):
+        self.compute_fn = compute_fn
+        self.paths = [p if callable(p) else os.path.abspath(p) for p in paths]
+        self.use_hash = use_hash
+        self.versions = versions
+
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._hash_key = None
+        self._value = None
+
+        self.hits = 0
+        self.misses = 0
+        self.last_compute_seconds = None
+
+    # ── Keys ──
+    def _resolved_paths(self):
+        return [p() if callable(p) else p for p in self.paths]
+
+    def _versions(self):
+        return tuple(self.versions()) if self.versions is not None else ()
+
+    def _stat_fingerprint(self):
+        key = [self._versions()]
+        for path in self._resolved_paths():
+            st = os.stat(path)
+            key.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(key)
+
+    def _content_fingerprint(self):
+        digests = [self._versions()]
+        for path in self._resolved_paths():
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digests.append(h.hexdigest())
+        return tuple(digests)
+
+    # ── Public API ──
+    def get(self):
+        stat_key = self._stat_fingerprint()
+        if stat_key == self._stat_key:
+            self.hits += 1
+            return self._value
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if stat_key == self._stat_key:
+                self.hits += 1
+                return self._value
+
+            hash_key = self._content_fingerprint() if self.use_hash else None
+            if hash_key is not None and hash_key == self._hash_key:
+                self._stat_key = stat_key
+                self.hits += 1
+                return self._value
+
+            start = time.perf_counter()
+            value = self.compute_fn()
+            self.last_compute_seconds = time.perf_counter() - start
+
+            self._value = value
+            self._hash_key = hash_key
+            self._stat_key = stat_key
+            self.misses += 1
+            return value
+
+    def warm_up(self):
+        """Computes the value ahead of the first request."""
+        return self.get()
+
+    def invalidate(self):
+        with self._lock:
+            self._stat_key = None
+            self._hash_key = None
+            self._value = None
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": self._stat_key is not None,
+            "last_compute_seconds": self.last_compute_seconds,
+        }
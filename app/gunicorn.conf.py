@@ -0,0 +1,31 @@
+import os
+import sys
+
+# ─────────────────────────────────────────────
+# gunicorn settings: gunicorn -c app/gunicorn.conf.py
+# ─────────────────────────────────────────────
+# See app/wsgi.py for the concurrency model and the environment variables.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = "wsgi:application"
+
+bind = f"{os.environ.get('WEB_HOST', '127.0.0.1')}:{os.environ.get('WEB_PORT', '5000')}"
+workers = int(os.environ.get("WEB_WORKERS", "2"))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+worker_class = "gthread"
+
+# Load models and warm the dashboard cache once in the master, then fork
+preload_app = True
+os.environ.setdefault("DASHBOARD_WARMUP", "1")
+# wsgi.py warms up single-threaded and leaves the thread budget to post_fork
+os.environ["WEB_FORKING_SERVER"] = "1"
+# Scoring a full 50k-row batch stays well below this
+timeout = int(os.environ.get("WEB_TIMEOUT", "60"))
+
+
+def post_fork(server, worker):
+    # Native pools were capped at 1 thread in the master: raise them to the
+    # per-request budget in the worker, where their threads get created
+    from thread_budget import limit_runtime_threads
+    limit_runtime_threads(int(os.environ["MODEL_THREADS"]))
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+# ─────────────────────────────────────────────
+# Vectorized season × region gain aggregation
+# ─────────────────────────────────────────────
+def aggregate_gains(predicted_gain, season_flags, region_flags, bonus_multiplier=1.2, threshold=0.8):
+    """
+    Computes every season/region total of the marketing dashboard in one pass.
+
+    predicted_gain : (N,) base gain per customer
+    season_flags   : (N, S) one-hot favourite season columns
+    region_flags   : (N, R) one-hot region columns
+
+    A customer's gain for season s is predicted_gain * bonus_multiplier when
+    they favour s, predicted_gain otherwise. Returns (season_totals (S,),
+    region_season (R, S)) where region_season = region_onehotᵀ @ gain_matrix.
+    """
+    gain = np.asarray(predicted_gain, dtype=float)
+    seasons = np.asarray(season_flags, dtype=float) > threshold
+    regions = np.asarray(region_flags, dtype=float) > threshold
+
+    # (N, S) gain matrix: base gain, boosted where the season is favoured
+    gain_matrix = np.where(seasons, gain[:, None] * bonus_multiplier, gain[:, None])
+
+    season_totals = gain_matrix.sum(axis=0)
+    region_season = regions.T.astype(float) @ gain_matrix
+    return season_totals, region_season
+
+
+def build_dashboard_payload(season_totals, region_season, season_names, region_names):
+    """Turns the aggregated matrices into the /api/marketing_dashboard JSON shape."""
+    season_labels = list(season_names.values())
+    region_labels = list(region_names.values())
+
+    seasons_agg = {}
+    for s, s_name in enumerate(season_labels):
+        top_regions = [
+            {"region": r_name, "estimated_gain": round(float(region_season[r, s]), 2)}
+            for r, r_name in enumerate(region_labels)
+        ]
+        top_regions.sort(key=lambda x: x["estimated_gain"], reverse=True)
+        seasons_agg[s_name] = {
+            "season_total": round(float(season_totals[s]), 2),
+            "top_regions": top_regions[:3]
+        }
+
+    regions_view = []
+    for r, r_name in enumerate(region_labels):
+        s_gains = [
+            {"season": s_name, "estimated_gain": round(float(region_season[r, s]), 2)}
+            for s, s_name in enumerate(season_labels)
+        ]
+        regions_view.append({
+            "region": r_name,
+            "seasons_ranked": sorted(s_gains, key=lambda x: x["estimated_gain"], reverse=True),
+            "total_annual_gain": round(float(region_season[r].sum()), 2)
+        })
+    regions_view.sort(key=lambda x: x["total_annual_gain"], reverse=True)
+
+    return {"seasons": seasons_agg, "regions": regions_view}
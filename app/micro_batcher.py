@@ -0,0 +1,97 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# ─────────────────────────────────────────────
+# Request coalescing for single-row scoring
+# ─────────────────────────────────────────────
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+
+    Request threads `submit(row)` and block; one scoring thread takes the
+    first waiting row, collects whatever else arrives within `max_latency`
+    seconds (or until `max_batch` rows), runs `score_fn` once on the stacked
+    (n, d) array and hands every caller its own row of the result.
+
+    - score_fn(X) must return a tuple of arrays with one entry per row.
+    - A failing batch raises the same exception in every waiting caller.
+    - The scoring thread is started lazily and again after a fork
+      (gunicorn --preload forks after import, threads don't survive it).
+    """
+
+    def __init__(self, score_fn, max_batch=64, max_latency=0.002, timeout=30.0):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(target=self._run, args=(self._queue,), name="micro-batcher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _collect(self, pending):
+        batch = [pending.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                # Rows that are already queued are taken even past the deadline
+                batch.append(pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, pending):
+        while True:
+            batch = self._collect(pending)
+            futures = [future for _, future in batch]
+            try:
+                results = self.score_fn(np.asarray([row for row, _ in batch], dtype=float))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for i, future in enumerate(futures):
+                future.set_result(tuple(values[i] for values in results))
+
+    # ── Public API ──
+    def submit(self, row):
+        """Scores one row (blocks until its batch is done); returns one value per score_fn output."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((row, future))
+        return future.result(timeout=self.timeout)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else None,
+            "largest_batch": self.largest_batch,
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency * 1000,
+        }
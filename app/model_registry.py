@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+import joblib
+
+
+# ─────────────────────────────────────────────
+# Lazy, hot-reloadable model registry
+# ─────────────────────────────────────────────
+class ModelRegistry:
+    """
+    Holds the joblib artifacts served by the app.
+
+    - Each artifact is loaded on first `get(name)`, so a worker that only
+      serves one endpoint never deserializes the others.
+    - With watch=True the file mtime/size is re-checked (at most every
+      `check_interval` seconds) and a replaced file is loaded again.
+    - The new object is swapped in with a single reference assignment:
+      requests that already fetched the previous model keep using it until
+      they return, new requests get the new one.
+    - `loaders` overrides joblib.load per artifact (e.g. mmap-backed formats).
+    - `on_load(obj)` runs on every freshly loaded object before it is served
+      (e.g. capping n_jobs under a multi-threaded server).
+    """
+
+    def __init__(self, model_dir, artifacts, watch=True, check_interval=1.0, loader=joblib.load, loaders=None,
+                 on_load=None):
+        self.model_dir = model_dir
+        self.artifacts = dict(artifacts)
+        self.watch = watch
+        self.check_interval = check_interval
+        self.loader = loader
+        self.loaders = dict(loaders or {})
+        self.on_load = on_load
+
+        self._entries = {}
+        self._locks = {name: threading.Lock() for name in self.artifacts}
+
+    def path(self, name):
+        return os.path.join(self.model_dir, self.artifacts[name])
+
+    def _file_key(self, name):
+        st = os.stat(self.path(name))
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, name, previous=None):
+        path = self.path(name)
+        file_key = self._file_key(name)
+        start = time.perf_counter()
+        obj = self.loaders.get(name, self.loader)(path)
+        if self.on_load is not None:
+            self.on_load(obj)
+        entry = {
+            "model": obj,
+            "file_key": file_key,
+            "version": previous["version"] + 1 if previous else 1,
+            "load_seconds": time.perf_counter() - start,
+            "loaded_at": time.time(),
+            "checked_at": time.monotonic(),
+        }
+        self._entries[name] = entry
+        print(f"📦 Loaded {self.artifacts[name]} (v{entry['version']}, {entry['load_seconds']:.3f}s)")
+        return entry
+
+    def _entry(self, name):
+        if name not in self.artifacts:
+            raise KeyError(f"Unknown model artifact: {name}")
+
+        entry = self._entries.get(name)
+        if entry is not None and not self.watch:
+            return entry
+        if entry is not None and time.monotonic() - entry["checked_at"] < self.check_interval:
+            return entry
+
+        with self._locks[name]:
+            entry = self._entries.get(name)
+            if entry is None:
+                return self._load(name)
+            try:
+                changed = self._file_key(name) != entry["file_key"]
+            except FileNotFoundError:
+                # File is being replaced: keep serving the current model
+                changed = False
+            if changed:
+                try:
+                    return self._load(name, previous=entry)
+                except Exception as e:
+                    print(f"⚠️ Reload of {self.artifacts[name]} failed, keeping v{entry['version']}: {e}")
+            entry["checked_at"] = time.monotonic()
+            return entry
+
+    # ── Public API ──
+    def get(self, name):
+        return self._entry(name)["model"]
+
+    def version(self, name):
+        return self._entry(name)["version"]
+
+    def reload(self, name=None):
+        """Explicitly reloads one artifact (or every artifact already loaded)."""
+        names = [name] if name is not None else list(self._entries)
+        for n in names:
+            with self._locks[n]:
+                self._load(n, previous=self._entries.get(n))
+        return names
+
+    def preload(self):
+        for name in self.artifacts:
+            self._entry(name)
+
+    def status(self):
+        report = {}
+        for name, filename in self.artifacts.items():
+            entry = self._entries.get(name)
+            report[name] = {
+                "file": filename,
+                "loaded": entry is not None,
+                "version": entry["version"] if entry else None,
+                "load_seconds": round(entry["load_seconds"], 4) if entry else None,
+                "loaded_at": entry["loaded_at"] if entry else None,
+            }
+        return report
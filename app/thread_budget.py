@@ -0,0 +1,65 @@
+import os
+
+# ─────────────────────────────────────────────
+# CPU budget for concurrent requests
+# ─────────────────────────────────────────────
+# Under gunicorn/waitress several requests are scored at the same time
+# (workers x threads). Left alone, every one of them would also fan out:
+# the marketing RandomForest was trained with n_jobs=-1, XGBoost uses one
+# OpenMP thread per core and NumPy's BLAS does the same. 4 workers x 4
+# threads on 8 cores would then ask for ~128 threads.
+#
+# The budget gives each concurrent request cores // (workers * threads)
+# compute threads (at least 1) and applies it to the BLAS/OpenMP pools and to
+# the n_jobs of every estimator the registry loads.
+
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def thread_budget(workers, threads, cpus=None):
+    """Compute threads per in-flight request so workers * threads * budget <= cpus."""
+    cpus = cpus or available_cpus()
+    return max(1, cpus // max(1, workers * threads))
+
+
+def apply_thread_env(n_threads):
+    """Caps the native thread pools; must run before numpy/sklearn/xgboost are imported."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    os.environ["MODEL_THREADS"] = str(n_threads)
+
+
+def limit_runtime_threads(n_threads):
+    """Same cap for pools that already exist (no-op without threadpoolctl)."""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return None
+    return threadpool_limits(limits=n_threads)
+
+
+def limit_estimator_threads(model, n_threads):
+    """Sets n_jobs (and the XGBoost booster nthread) on a model and its pipeline steps."""
+    for _, step in getattr(model, "steps", []):
+        limit_estimator_threads(step, n_threads)
+    for _, transformer, _ in getattr(model, "transformers_", []):
+        limit_estimator_threads(transformer, n_threads)
+    if "n_jobs" in getattr(model, "__dict__", {}):
+        model.n_jobs = n_threads
+    if hasattr(model, "get_booster"):
+        model.get_booster().set_param({"nthread": n_threads})
+    return model
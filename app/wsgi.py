@@ -0,0 +1,83 @@
+import os
+import sys
+
+# ─────────────────────────────────────────────
+# Production entry point
+# ─────────────────────────────────────────────
+# `python app/app.py` is the single-threaded dev server (debug + reloader).
+# For real traffic run one of:
+#
+#   gunicorn -c app/gunicorn.conf.py            (Linux/macOS, N processes x M threads)
+#   python app/wsgi.py                          (waitress, 1 process x M threads, any OS)
+#
+# Concurrency model
+#   - Each worker process imports the app once; with gunicorn the app is
+#     preloaded in the master (models + dashboard cache) and the workers are
+#     forked from it, so read-only model pages (mmap'd forest, lookup grid)
+#     are shared between workers instead of being loaded N times.
+#   - Inside a worker, requests run on WEB_THREADS threads. The registry,
+#     the dashboard cache and the scorers are thread-safe: models are only
+#     read, and reloads swap a reference under a per-artifact lock.
+#   - Scoring is CPU-bound. Every in-flight request gets
+#     cores // (WEB_WORKERS * WEB_THREADS) compute threads (MODEL_THREADS to
+#     override), applied to BLAS/OpenMP and to the models' n_jobs, so the
+#     machine never runs more compute threads than it has cores.
+#   - The master does run native code before the fork: preloading unpickles
+#     the models and the dashboard warm-up runs the marketing forest (and
+#     BLAS). That warm-up is capped at 1 thread, so no multi-threaded
+#     OpenMP/BLAS pool exists when gunicorn forks (a pool inherited across
+#     fork can deadlock with libgomp). The per-request budget is applied
+#     afterwards: in each worker after the fork (post_fork in
+#     gunicorn.conf.py), or right after the warm-up under waitress.
+#
+# Environment
+#   WEB_HOST / WEB_PORT   bind address            (default 127.0.0.1:5000)
+#   WEB_WORKERS           gunicorn processes      (default 2)
+#   WEB_THREADS           threads per process     (default 4)
+#   MODEL_THREADS         compute threads per request (default: derived)
+#   MICRO_BATCH           coalesce concurrent /api/predict_all calls (default 1)
+#   MICRO_BATCH_MAX_ROWS / MICRO_BATCH_MAX_MS   batch size and wait bounds (64 / 2 ms)
+#   DASHBOARD_WARMUP      build the dashboard at startup (default 0; 1 under gunicorn)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from thread_budget import apply_thread_env, limit_runtime_threads, thread_budget
+
+host = os.environ.get("WEB_HOST", "127.0.0.1")
+port = int(os.environ.get("WEB_PORT", "5000"))
+workers = int(os.environ.get("WEB_WORKERS", "2"))
+threads = int(os.environ.get("WEB_THREADS", "4"))
+model_threads = int(os.environ.get("MODEL_THREADS") or thread_budget(workers, threads))
+
+# Before numpy / sklearn / xgboost are imported by the app: single-threaded
+# native pools while the models load and the dashboard warms up
+apply_thread_env(1)
+os.environ["MODEL_THREADS"] = str(model_threads)
+os.environ.setdefault("MODEL_PRELOAD", "1")
+# Files can still be swapped on disk; explicit POST /api/models/reload works per worker
+os.environ.setdefault("MODEL_WATCH", "1")
+os.environ.setdefault("MICRO_BATCH", "1")
+
+from app import app  # noqa: E402
+
+# Libraries loaded from now on start with the real budget
+apply_thread_env(model_threads)
+if os.environ.get("WEB_FORKING_SERVER") != "1":
+    # Single process (waitress / Flask): raise the loaded pools right away.
+    # Under gunicorn this runs in each worker after the fork instead.
+    limit_runtime_threads(model_threads)
+application = app
+
+
+if __name__ == "__main__":
+    try:
+        from waitress import serve
+    except ImportError:
+        print("⚠️ waitress is not installed (pip install waitress), using Flask's threaded server.")
+        print(f"🚀 Serving on http://{host}:{port} ({threads} threads, {model_threads} compute threads/request)")
+        app.run(host=host, port=port, debug=False, use_reloader=False, threaded=True)
+    else:
+        # waitress is a single process: the budget is computed for one worker
+        print(f"🚀 Serving on http://{host}:{port} ({threads} threads, {model_threads} compute threads/request)")
+        serve(app, host=host, port=port, threads=threads)
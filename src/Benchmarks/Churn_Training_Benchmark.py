@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import warnings
+import numpy as np
+import pandas as pd
+import joblib
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "Models"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "PreData"))
+
+from CVS_Storage import load_frame, save_frame
+from Churn_Predictor import train_churn_model, TRAINING_CONFIGS
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "data", "TestTrainData")
+
+
+# ==========================================
+# 2. SYNTHETIC TRAINING SET
+# ==========================================
+def make_training_set(n_rows, out_dir, seed=42):
+    """X_Train/y_Train resampled to n_rows, features jittered a little."""
+    X = load_frame(os.path.join(DATA_DIR, "X_Train.csv"))
+    y = load_frame(os.path.join(DATA_DIR, "y_Train.csv"))
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(X), n_rows)
+    X_big = pd.DataFrame(X.to_numpy()[idx] + rng.normal(0, 0.01, (n_rows, X.shape[1])), columns=X.columns)
+    x_path, y_path = os.path.join(out_dir, "X.csv"), os.path.join(out_dir, "y.csv")
+    save_frame(X_big, x_path)
+    save_frame(y.iloc[idx].reset_index(drop=True), y_path)
+    return x_path, y_path
+
+
+# ==========================================
+# 3. ONE CONFIGURATION PER PROCESS (clean peak RSS)
+# ==========================================
+def fit_in_child(config, x_path, y_path, out_dir):
+    import resource
+    warnings.filterwarnings("ignore")
+    paths = {"model_path": os.path.join(out_dir, f"{config}.pkl"),
+             "flat_path": os.path.join(out_dir, f"{config}_flat.joblib")}
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if TRAINING_CONFIGS[config].get("external_memory"):
+        train_churn_model(x_path, y_path, config=config, **paths)
+    else:
+        # Loading is part of the cost of the in-memory modes
+        train_churn_model(load_frame(x_path), load_frame(y_path).values.ravel(), config=config, **paths)
+    seconds = time.perf_counter() - start
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    print(json.dumps({"seconds": seconds, "peak_mb": peak_mb}))
+
+
+def measure(config, x_path, y_path, out_dir):
+    out = subprocess.run([sys.executable, __file__, "--child", config, x_path, y_path, out_dir],
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return joblib.load(os.path.join(out_dir, f"{config}.pkl")), result["seconds"], result["peak_mb"]
+
+
+# ==========================================
+# 4. REPORT
+# ==========================================
+def run_benchmark(n_rows=2_000_000):
+    warnings.filterwarnings("ignore")
+    out_dir = tempfile.mkdtemp()
+    x_path, y_path = make_training_set(n_rows, out_dir)
+    X_test = load_frame(os.path.join(DATA_DIR, "X_Test.csv"))
+    y_test = load_frame(os.path.join(DATA_DIR, "y_Test.csv")).values.ravel()
+
+    print("\n" + "=" * 72)
+    print(f"📊 Churn training on {n_rows:,} rows ({os.cpu_count()} cores)")
+    print("=" * 72)
+    print(f"{'config':<12}{'fit s':>10}{'+peak MB':>12}{'trees/class':>14}{'holdout acc':>14}")
+    for config in TRAINING_CONFIGS:
+        model, seconds, peak_mb = measure(config, x_path, y_path, out_dir)
+        accuracy = (model.predict(X_test) == y_test).mean()
+        print(f"{config:<12}{seconds:>10.2f}{peak_mb:>12.1f}{model.get_booster().num_boosted_rounds():>14}{accuracy:>14.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        fit_in_child(*sys.argv[2:6])
+    else:
+        run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
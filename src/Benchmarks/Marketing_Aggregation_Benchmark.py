@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "app"))
+
+from marketing_engine import aggregate_gains
+
+season_names = {0: "Autumn", 1: "Winter", 2: "Spring", 3: "Summer"}
+region_names = {"Reg_4": "Central Europe", "Reg_8": "UK", "Reg_Other": "Other"}
+season_cols = [f"Season_{i}" for i in season_names]
+region_cols = list(region_names)
+
+
+# ==========================================
+# 2. SYNTHETIC CUSTOMERS
+# ==========================================
+def make_customers(n, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"predicted_gain": rng.gamma(2.0, 3.0, size=n)})
+    season = rng.integers(0, len(season_cols), size=n)
+    region = rng.integers(0, len(region_cols), size=n)
+    for i, col in enumerate(season_cols):
+        df[col] = season == i
+    for i, col in enumerate(region_cols):
+        df[col] = region == i
+    return df
+
+
+# ==========================================
+# 3. LEGACY LOOPS (previous marketing_dashboard body)
+# ==========================================
+def legacy_aggregate(customers):
+    customers = customers.copy()
+    season_totals = []
+    for s_idx in season_names:
+        gain_col = f"season_{s_idx}_gain"
+        customers[gain_col] = customers["predicted_gain"]
+        customers.loc[customers[f"Season_{s_idx}"] > 0.8, gain_col] *= 1.2
+        season_totals.append(customers[gain_col].sum())
+        for region_col in region_names:
+            customers.loc[customers[region_col] > 0.8, gain_col].sum()
+
+    region_season = []
+    for region_col in region_names:
+        region_season.append([
+            customers.loc[customers[region_col] > 0.8, f"season_{s_idx}_gain"].sum()
+            for s_idx in season_names
+        ])
+    return np.array(season_totals), np.array(region_season)
+
+
+def vectorized_aggregate(customers):
+    return aggregate_gains(
+        customers["predicted_gain"].to_numpy(),
+        customers[season_cols].to_numpy(dtype=float),
+        customers[region_cols].to_numpy(dtype=float)
+    )
+
+
+def best_of(fn, arg, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+# ==========================================
+# 4. RUN
+# ==========================================
+def run_benchmark(sizes=(2_000, 10_000, 100_000, 1_000_000), repeats=3):
+    print("\n" + "=" * 72)
+    print(f"{'CUSTOMERS':>10} | {'LEGACY (ms)':>12} | {'VECTORIZED (ms)':>16} | {'SPEEDUP':>8} | MATCH")
+    print("-" * 72)
+
+    rows = []
+    for n in sizes:
+        customers = make_customers(n)
+        t_legacy, (legacy_s, legacy_rs) = best_of(legacy_aggregate, customers, repeats)
+        t_vec, (vec_s, vec_rs) = best_of(vectorized_aggregate, customers, repeats)
+        match = np.allclose(legacy_s, vec_s) and np.allclose(legacy_rs, vec_rs)
+
+        print(f"{n:>10,} | {t_legacy*1000:>12.2f} | {t_vec*1000:>16.2f} | {t_legacy/t_vec:>7.1f}x | {match}")
+        rows.append({"customers": n, "legacy_ms": t_legacy * 1000, "vectorized_ms": t_vec * 1000, "match": match})
+
+    print("=" * 72)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import threading
+import warnings
+import numpy as np
+import pandas as pd
+import joblib
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "app"))
+
+from micro_batcher import MicroBatcher
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "preparedData", "X_unscaled.csv")
+FEATURES = ["Recency", "Frequency", "CustomerTenureDays"]
+
+
+# ==========================================
+# 2. CONCURRENT CLIENTS
+# ==========================================
+def run_clients(call, rows, n_clients):
+    """n_clients threads each score their share of rows one at a time."""
+    latencies = [[] for _ in range(n_clients)]
+    results = [None] * len(rows)
+
+    def client(k):
+        for i in range(k, len(rows), n_clients):
+            start = time.perf_counter()
+            results[i] = call(rows[i])
+            latencies[k].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(n_clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    all_lat = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    return results, len(rows) / elapsed, np.percentile(all_lat, 50), np.percentile(all_lat, 99)
+
+
+def run_benchmark(n_rows=4000, n_clients=64):
+    warnings.filterwarnings("ignore")
+    scaler = joblib.load(os.path.join(MODEL_DIR, "main_scaler.pkl"))
+    churn = joblib.load(os.path.join(MODEL_DIR, "churn_predictor_v1.pkl"))
+    persona = joblib.load(os.path.join(MODEL_DIR, "persona_classifier.pkl"))
+
+    # Same scoring as app.score_matrix without the fused/flat artifacts
+    def score_matrix(X):
+        scaled = scaler.transform(pd.DataFrame(X, columns=FEATURES))
+        return persona.predict(scaled).astype(int), churn.predict(scaled).astype(int)
+
+    rows = [np.asarray(r, dtype=float) for r in pd.read_csv(DATA_PATH).to_numpy()[:n_rows]]
+
+    def single_call(row):
+        personas, churns = score_matrix(row[None, :])
+        return int(personas[0]), int(churns[0])
+
+    batcher = MicroBatcher(score_matrix, max_batch=64, max_latency=0.002)
+
+    def batched_call(row):
+        persona_idx, churn_idx = batcher.submit(row)
+        return int(persona_idx), int(churn_idx)
+
+    base, rps_single, p50_single, p99_single = run_clients(single_call, rows, n_clients)
+    batched, rps_batch, p50_batch, p99_batch = run_clients(batched_call, rows, n_clients)
+    stats = batcher.stats()
+
+    print("\n" + "=" * 66)
+    print(f"📊 {n_rows} predict_all calls from {n_clients} concurrent clients")
+    print("=" * 66)
+    print(f"{'':<22}{'req/s':>10}{'p50 ms':>12}{'p99 ms':>12}")
+    print(f"{'One predict per call':<22}{rps_single:>10.0f}{p50_single:>12.2f}{p99_single:>12.2f}")
+    print(f"{'Micro-batched':<22}{rps_batch:>10.0f}{p50_batch:>12.2f}{p99_batch:>12.2f}")
+    print(f"Throughput gain: {rps_batch / rps_single:.1f}x | mean batch {stats['mean_batch_size']} rows "
+          f"(max {stats['largest_batch']}) | identical results: {base == batched}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
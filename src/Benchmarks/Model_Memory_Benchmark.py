@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+import joblib
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "Models"))
+
+from Compact_Models import FlatForestRegressor, export_forest
+
+PICKLE_PATH = os.path.join(PROJECT_ROOT, "models", "marketing_timeline_model.pkl")
+FOREST_PATH = os.path.join(PROJECT_ROOT, "models", "marketing_timeline_forest.joblib")
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "MarketingTimelineData", "X_Train_Marketing.csv")
+
+
+# ==========================================
+# 2. MEMORY PROBE (Linux /proc)
+# ==========================================
+def read_memory_kb():
+    """RSS, PSS (shared pages split between sharers) and USS (private) in KB."""
+    mem = {"rss": 0, "pss": 0, "uss": 0}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key == "Rss":
+                mem["rss"] = int(rest.split()[0])
+            elif key == "Pss":
+                mem["pss"] = int(rest.split()[0])
+            elif key in ("Private_Clean", "Private_Dirty"):
+                mem["uss"] += int(rest.split()[0])
+    return mem
+
+
+def worker(mode, forest_path, X, barrier, results):
+    # Import sklearn up front in both modes so the delta is the model itself
+    import sklearn.ensemble  # noqa: F401
+
+    # Baseline once every worker has finished its imports: shared library
+    # pages are then already split between all of them, so the delta below is
+    # only the model (a baseline taken earlier can even come out negative)
+    barrier.wait()
+    before = read_memory_kb()
+    if mode == "pickle":
+        model = joblib.load(PICKLE_PATH)
+    else:
+        model = FlatForestRegressor.load(forest_path, mmap_mode="r")
+    model.predict(X)
+
+    # Measure while every worker is alive so PSS reflects the sharing
+    barrier.wait()
+    after = read_memory_kb()
+    results.put({**{k: after[k] - before[k] for k in after}, "pss_total": after["pss"]})
+    barrier.wait()
+
+
+# ==========================================
+# 3. RUN
+# ==========================================
+def run_benchmark(n_workers=4):
+    X = pd.read_csv(DATA_PATH).to_numpy(dtype=np.float32)
+
+    forest_path = FOREST_PATH
+    if not os.path.exists(forest_path):
+        forest_path = os.path.join(tempfile.mkdtemp(), "marketing_timeline_forest.joblib")
+        export_forest(joblib.load(PICKLE_PATH), forest_path)
+
+    ctx = mp.get_context("spawn")
+    print("\n" + "=" * 84)
+    print(f"Per-worker memory for the marketing forest ({n_workers} workers, KB)")
+    print(f"{'MODE':<10} | {'RSS':>10} | {'PSS':>10} | {'USS (private)':>14} | {'PSS total':>10}")
+    print("-" * 84)
+
+    summary = {}
+    for mode in ["pickle", "mmap"]:
+        barrier = ctx.Barrier(n_workers)
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(mode, forest_path, X, barrier, results)) for _ in range(n_workers)]
+        for p in procs:
+            p.start()
+        deltas = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+        mean = {k: np.mean([d[k] for d in deltas]) for k in deltas[0]}
+        summary[mode] = mean
+        print(f"{mode:<10} | {mean['rss']:>10.0f} | {mean['pss']:>10.0f} | {mean['uss']:>14.0f} | {mean['pss_total']:>10.0f}")
+
+    print("=" * 84)
+    print("RSS/PSS/USS: growth from loading + predicting (baseline after imports, all workers alive).")
+    print("RSS counts shared page-cache pages in every worker; PSS/USS show the real per-worker cost.")
+    print("PSS total: absolute proportional footprint of one worker at the end.")
+    return pd.DataFrame(summary).T
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
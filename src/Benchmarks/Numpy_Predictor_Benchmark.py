@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import warnings
+import numpy as np
+import pandas as pd
+import joblib
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+MODELS_SRC = os.path.join(PROJECT_ROOT, "src", "Models")
+sys.path.insert(0, MODELS_SRC)
+
+from Compact_Models import export_xgb_classifier, export_kmeans, FlatXGBClassifier, FlatKMeans
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+DATA_PATH = os.path.join(PROJECT_ROOT, "data", "preparedData", "X_unscaled.csv")
+FEATURES = ["Recency", "Frequency", "CustomerTenureDays"]
+
+
+# ==========================================
+# 2. IMPORT TIME (fresh interpreter each)
+# ==========================================
+def import_seconds(statement, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, cwd=MODELS_SRC)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# ==========================================
+# 3. PER-CALL LATENCY
+# ==========================================
+def per_call_us(fn, rows, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for row in rows:
+            fn(row)
+        timings.append((time.perf_counter() - start) / len(rows))
+    return min(timings) * 1e6
+
+
+def run_benchmark(n_calls=2000):
+    warnings.filterwarnings("ignore")
+    scaler = joblib.load(os.path.join(MODEL_DIR, "main_scaler.pkl"))
+    churn = joblib.load(os.path.join(MODEL_DIR, "churn_predictor_v1.pkl"))
+    persona = joblib.load(os.path.join(MODEL_DIR, "persona_classifier.pkl"))
+
+    out_dir = tempfile.mkdtemp()
+    churn_path = export_xgb_classifier(churn, os.path.join(out_dir, "churn.joblib"), scaler=scaler)
+    persona_path = export_kmeans(persona, os.path.join(out_dir, "persona.joblib"), scaler=scaler)
+    flat_churn, flat_persona = FlatXGBClassifier.load(churn_path), FlatKMeans.load(persona_path)
+
+    X = pd.read_csv(DATA_PATH).to_numpy(dtype=float)
+    rows = [[float(v) for v in r] for r in X[:n_calls]]
+
+    def library_call(row):
+        scaled = scaler.transform(pd.DataFrame([row], columns=FEATURES))
+        return int(persona.predict(scaled)[0]), int(churn.predict(scaled)[0])
+
+    def numpy_call(row):
+        return int(flat_persona.predict(row)[0]), int(flat_churn.predict(row)[0])
+
+    scaled_all = scaler.transform(pd.DataFrame(X, columns=FEATURES))
+    identical = (np.array_equal(persona.predict(scaled_all), flat_persona.predict(X))
+                 and np.array_equal(churn.predict(scaled_all), flat_churn.predict(X)))
+
+    t_lib, t_np = per_call_us(library_call, rows), per_call_us(numpy_call, rows)
+    imp_lib = import_seconds("import pandas, xgboost, sklearn.cluster, sklearn.preprocessing")
+    imp_np = import_seconds("import Compact_Models")
+
+    print("\n" + "=" * 66)
+    print(f"{'PATH':<28} | {'PER CALL (us)':>14} | {'IMPORT (s)':>11}")
+    print("-" * 66)
+    print(f"{'pandas + sklearn + xgboost':<28} | {t_lib:>14.1f} | {imp_lib:>11.2f}")
+    print(f"{'NumPy-only (Compact_Models)':<28} | {t_np:>14.1f} | {imp_np:>11.2f}")
+    print("-" * 66)
+    print(f"Speedup per call: {t_lib / t_np:.1f}x | identical classes on {len(X)} rows: {identical}")
+    print("=" * 66)
+    return pd.DataFrame([
+        {"path": "library", "per_call_us": t_lib, "import_s": imp_lib},
+        {"path": "numpy", "per_call_us": t_np, "import_s": imp_np},
+    ])
+
+
+if __name__ == "__main__":
+    run_benchmark()
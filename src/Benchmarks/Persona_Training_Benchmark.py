@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import tempfile
+import json
+import subprocess
+import warnings
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.metrics import adjusted_rand_score
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "Models"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "PreData"))
+
+from CVS_Storage import load_frame, save_frame
+from Customer_Classifier import train_persona_model, train_persona_model_streaming
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "models")
+TRAIN_PATH = os.path.join(PROJECT_ROOT, "data", "TestTrainData", "X_Train.csv")
+TEST_PATH = os.path.join(PROJECT_ROOT, "data", "TestTrainData", "X_Test.csv")
+
+
+# ==========================================
+# 2. SYNTHETIC CUSTOMER BASE
+# ==========================================
+def make_customer_base(n_rows, path, seed=42):
+    """X_Train resampled to n_rows with a little noise (same scaled feature space)."""
+    base = load_frame(TRAIN_PATH)
+    rng = np.random.default_rng(seed)
+    rows = base.to_numpy()[rng.integers(0, len(base), n_rows)]
+    rows += rng.normal(0, 0.05, rows.shape)
+    return save_frame(pd.DataFrame(rows, columns=base.columns), path)
+
+
+# ==========================================
+# 3. ONE FIT PER PROCESS (clean peak RSS)
+# ==========================================
+def fit_in_child(mode, data_path, out_dir, chunksize):
+    """Runs one training mode in this process and prints seconds + peak RSS growth."""
+    import resource
+    warnings.filterwarnings("ignore")
+    paths = {"pipeline_path": os.path.join(out_dir, f"{mode}_pipeline.pkl"),
+             "flat_path": os.path.join(out_dir, f"{mode}_flat.joblib"),
+             "model_path": os.path.join(out_dir, f"{mode}.pkl")}
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "full":
+        train_persona_model(load_frame(data_path), **paths)
+    else:
+        train_persona_model_streaming(data_path, chunksize=chunksize, n_epochs=1,
+                                      init_model_path=os.path.join(MODEL_DIR, "persona_classifier.pkl"), **paths)
+    seconds = time.perf_counter() - start
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    print(json.dumps({"seconds": seconds, "peak_mb": peak_mb}))
+
+
+def measure(mode, data_path, out_dir, chunksize):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, data_path, out_dir, str(chunksize)],
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return joblib.load(os.path.join(out_dir, f"{mode}.pkl")), result["seconds"], result["peak_mb"]
+
+
+# ==========================================
+# 4. REPORT
+# ==========================================
+def run_benchmark(n_rows=1_000_000, chunksize=100_000):
+    warnings.filterwarnings("ignore")
+    out_dir = tempfile.mkdtemp()
+    data_path = make_customer_base(n_rows, os.path.join(out_dir, "customers.csv"))
+
+    full, t_full, mem_full = measure("full", data_path, out_dir, chunksize)
+    stream, t_stream, mem_stream = measure("stream", data_path, out_dir, chunksize)
+    current = joblib.load(os.path.join(MODEL_DIR, "persona_classifier.pkl"))
+    X_test = load_frame(TEST_PATH)
+    labels = {name: m.predict(X_test) for name, m in [("current", current), ("full", full), ("stream", stream)]}
+
+    print("\n" + "=" * 70)
+    print(f"📊 Persona training on {n_rows:,} customers (chunks of {chunksize:,})")
+    print("=" * 70)
+    print(f"{'':<30}{'fit s':>10}{'+peak MB':>12}{'ARI vs current':>16}")
+    print(f"{'KMeans(n_init=10), in memory':<30}{t_full:>10.2f}{mem_full:>12.1f}"
+          f"{adjusted_rand_score(labels['current'], labels['full']):>16.3f}")
+    print(f"{'MiniBatchKMeans, streamed':<30}{t_stream:>10.2f}{mem_stream:>12.1f}"
+          f"{adjusted_rand_score(labels['current'], labels['stream']):>16.3f}")
+    print(f"Streamed model keeps the current persona IDs on "
+          f"{(labels['stream'] == labels['current']).mean():.1%} of X_Test "
+          f"(in-memory refit: {(labels['full'] == labels['current']).mean():.1%}, IDs not aligned)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        fit_in_child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+    else:
+        run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
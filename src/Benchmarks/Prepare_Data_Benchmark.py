@@ -0,0 +1,129 @@
+import os
+import sys
+import io
+import time
+import tempfile
+import contextlib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(CURRENT_DIR))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "PreData"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src", "PreData", "CVS_DataFix"))
+
+from CVS_Storage import load_frame, save_frame
+from CVS_Datafixer import prepare_data
+
+CLEANED_PATH = os.path.join(PROJECT_ROOT, "data", "preparedData", "cleaned_data.csv")
+
+
+# ==========================================
+# 2. SYNTHETIC EXPORT (cleaned data tiled + dirt)
+# ==========================================
+def make_export(n, seed=42):
+    rng = np.random.default_rng(seed)
+    base = load_frame(CLEANED_PATH)
+    df = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
+    # A few invalid tokens (rows dropped) and one mostly-missing column (placeholder)
+    for col, token, rate in [("Gender", "?", 0.03), ("Region", "NULL", 0.02), ("AccountStatus", "None", 0.15)]:
+        values = df[col].astype(object)
+        values[rng.random(n) < rate] = token
+        df[col] = values
+    df.loc[rng.random(n) < 0.1, "Age"] = np.nan
+    return df
+
+
+# ==========================================
+# 3. LEGACY COLUMN-BY-COLUMN VERSION (previous prepare_data body)
+# ==========================================
+def legacy_prepare_data(df, output_path):
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    for col in numeric_cols:
+        if df[col].isnull().any():
+            df[col] = df[col].fillna(df[col].median())
+
+    categorical_cols = df.select_dtypes(include=['object', 'string']).columns
+    for col in categorical_cols:
+        invalid_mask = df[col].astype(str).str.lower().isin(['?', 'none', 'null', 'nan', '', 'nan'])
+        invalid_count = invalid_mask.sum()
+        invalid_pct = invalid_count / len(df)
+        if 0 < invalid_pct < 0.10:
+            df = df[~invalid_mask].copy()
+        elif invalid_pct >= 0.10:
+            df[col] = df[col].replace(['?', 'None', 'null', 'nan', '', 'NaN'], 'Unknown').fillna('Unknown')
+
+    if 'RegistrationDate' in df.columns:
+        df['RegistrationDate'] = pd.to_datetime(df['RegistrationDate'], errors='coerce', format='mixed')
+        df['Reg_Year'] = df['RegistrationDate'].dt.year
+        df['Reg_Month'] = df['RegistrationDate'].dt.month
+        df['Reg_Day'] = df['RegistrationDate'].dt.day
+        df = df.drop(columns=['RegistrationDate'])
+
+    if 'LastLoginIP' in df.columns:
+        ip_split = df['LastLoginIP'].astype(str).str.split('.', expand=True)
+        for i in range(4):
+            df[f'IP_Octet_{i+1}'] = pd.to_numeric(ip_split[i], errors='coerce').fillna(0).astype(int)
+        df = df.drop(columns=['LastLoginIP'])
+
+    le = LabelEncoder()
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if col != 'CustomerID':
+            df[col] = le.fit_transform(df[col].astype(str))
+
+    for col, max_val in {'PreferredHour': 23, 'PreferredMonth': 12, 'PreferredDayOfWeek': 6}.items():
+        if col in df.columns:
+            df[f'{col}_sin'] = np.sin(2 * np.pi * df[col] / max_val)
+            df[f'{col}_cos'] = np.cos(2 * np.pi * df[col] / max_val)
+            df = df.drop(columns=[col])
+
+    for col in ['MonetaryTotal', 'Frequency', 'TotalQuantity']:
+        if col in df.columns:
+            shift = abs(df[col].min()) + 1 if df[col].min() <= 0 else 0
+            df[col] = np.log1p(df[col] + shift)
+
+    save_frame(df, output_path)
+    return df
+
+
+def timed(fn, df, output_path):
+    # The legacy body edits its input; give both versions a fresh frame
+    df = df.copy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(df, output_path)
+        return time.perf_counter() - start, result
+
+
+# ==========================================
+# 4. RUN
+# ==========================================
+def run_benchmark(sizes=(10_000, 100_000, 500_000)):
+    out_dir = tempfile.mkdtemp()
+    print("\n" + "=" * 72)
+    print(f"{'ROWS':>10} | {'LEGACY (ms)':>12} | {'SINGLE-PASS (ms)':>16} | {'SPEEDUP':>8} | MATCH")
+    print("-" * 72)
+
+    rows = []
+    for n in sizes:
+        df = make_export(n)
+        t_legacy, legacy = timed(legacy_prepare_data, df, os.path.join(out_dir, "legacy.csv"))
+        t_new, new = timed(prepare_data, df, os.path.join(out_dir, "new.csv"))
+        # Same values; the new frame stores the IP octets as uint8 instead of int64
+        match = legacy.equals(new.astype(legacy.dtypes.to_dict()))
+
+        print(f"{n:>10,} | {t_legacy*1000:>12.1f} | {t_new*1000:>16.1f} | {t_legacy/t_new:>7.1f}x | {match}")
+        rows.append({"rows": n, "legacy_ms": t_legacy * 1000, "single_pass_ms": t_new * 1000, "match": match})
+
+    print("=" * 72)
+    print("Both versions include writing the prepared frame (same format).")
+    print("MATCH compares values; IP_Octet_* columns are uint8 in the single-pass frame (int64 in legacy).")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
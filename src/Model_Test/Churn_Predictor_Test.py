@@ -4,6 +4,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models"))
+from CVS_Storage import load_frame
+from Compact_Models import current_churn_model_file
 
 from sklearn.metrics import (
     classification_report,
@@ -16,15 +21,16 @@ from sklearn.metrics import (
 # ==============================
 data_dir = "data/TestTrainData/"
 
-X_test = pd.read_csv(os.path.join(data_dir, "X_Test.csv"))
-y_test = pd.read_csv(os.path.join(data_dir, "y_Test.csv")).values.ravel()
+X_test = load_frame(os.path.join(data_dir, "X_Test.csv"))
+y_test = load_frame(os.path.join(data_dir, "y_Test.csv")).values.ravel()
 
 print(f"✅ Loaded test data: {X_test.shape}")
 
 # ==============================
 # 2. Load Trained Model
 # ==============================
-model_path = "models/churn_predictor_v1.pkl"
+# The promoted version (churn_model_current.json)
+model_path = os.path.join("models", current_churn_model_file("models"))
 
 if not os.path.exists(model_path):
     raise FileNotFoundError("❌ Trained model not found!")
@@ -2,6 +2,11 @@ import pandas as pd
 import joblib
 import os
 import numpy as np
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models"))
+from CVS_Storage import load_frame, resolve_frame_path
+from Persona_Alignment import persona_names
 
 # ==========================================
 # 1. SETUP PATHS & LOAD ASSETS
@@ -14,27 +19,22 @@ MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "persona_classifier.pkl")
 SCALER_PATH = os.path.join(PROJECT_ROOT, "models", "main_scaler.pkl")
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "TestTrainData", "X_Train.csv")
 
-# ==========================================
-# 2. DEFINE BUSINESS MAPPING
-# ==========================================
-persona_map = {
-    0: {"name": "Loyal High-Spender"},
-    1: {"name": "Recent Explorer / Newbie"},
-    2: {"name": "At-Risk / Hibernating"},
-    3: {"name": "Loyal Active"},
-}
-
 def run_analysis():
     # Validation
     for path in [MODEL_PATH, SCALER_PATH, DATA_PATH]:
-        if not os.path.exists(path):
+        if not os.path.exists(path) and resolve_frame_path(path) is None:
             print(f"❌ Critical Error: Missing file at {path}")
             return
 
     # Load everything
     model = joblib.load(MODEL_PATH)
     scaler = joblib.load(SCALER_PATH)
-    X_scaled = pd.read_csv(DATA_PATH)
+    X_scaled = load_frame(DATA_PATH)
+
+    # ==========================================
+    # 2. BUSINESS MAPPING (stored in the model)
+    # ==========================================
+    names = persona_names(model)
 
        # ==========================================
     # 3. PREDICT & UNSCALE
@@ -67,10 +67,10 @@ def run_analysis():
     total_users = len(df_final)
 
     for cluster_id, count in counts.items():
-        info = persona_map.get(cluster_id, {"name": f"Unknown {cluster_id}", "strategy": "N/A"})
+        name = names.get(int(cluster_id), f"Unknown {cluster_id}")
         percent = (count / total_users) * 100
         
-        print(f"{info['name']:<30} | {count:<10} | {percent:>10.1f}%")
+        print(f"{name:<30} | {count:<10} | {percent:>10.1f}%")
 
     print("="*80)
 
@@ -83,7 +83,7 @@ def run_analysis():
     report = df_final.groupby('ClusterID').mean().round(2)
     
     # Replace numeric index with Persona Names for the final table
-    report.index = [persona_map.get(i, {"name": i})["name"] for i in report.index]
+    report.index = [names.get(int(i), i) for i in report.index]
     
     print(report)
     print("\n✅ Analysis Complete. Use these means to verify your persona mappings match the data behaviors.")
@@ -2,6 +2,11 @@ import pandas as pd
 import joblib
 import os
 import numpy as np
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Models"))
+from CVS_Storage import load_frame, resolve_frame_path
+from Persona_Alignment import persona_names
 
 # ==========================================
 # 1. SETUP PATHS & LOAD ASSETS
@@ -13,9 +18,7 @@ MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "marketing_timeline_model.pkl"
 SCALER_PATH = os.path.join(PROJECT_ROOT, "models", "marketing_timeline_scaler.pkl")
 DATA_PATH = os.path.join(PROJECT_ROOT, "data", "MarketingTimelineData", "X_Test_Marketing.csv")
 TARGET_PATH = os.path.join(PROJECT_ROOT, "data", "MarketingTimelineData", "y_Test_Marketing.csv")
-
-# Mapping Persona IDs to names
-persona_names = {0: "Loyal High-Spender", 1: "Recent Explorer", 2: "At-Risk / Hibernating"}
+PERSONA_MODEL_PATH = os.path.join(PROJECT_ROOT, "models", "persona_classifier.pkl")
 
 # ==========================================
 # 2. MAIN FUNCTION
@@ -23,15 +26,17 @@ persona_names = {0: "Loyal High-Spender", 1: "Recent Explorer", 2: "At-Risk / Hi
 def run_marketing_analysis(add_noise=True, noise_level=0.05):
     # Validate file existence
     for path in [MODEL_PATH, SCALER_PATH, DATA_PATH]:
-        if not os.path.exists(path):
+        if not os.path.exists(path) and resolve_frame_path(path) is None:
             print(f"❌ Missing file: {path}")
             return
 
     # Load assets
     model = joblib.load(MODEL_PATH)
     scaler = joblib.load(SCALER_PATH)
-    X_scaled = pd.read_csv(DATA_PATH)
-    y_actual = pd.read_csv(TARGET_PATH)
+    X_scaled = load_frame(DATA_PATH)
+    y_actual = load_frame(TARGET_PATH)
+    # Mapping Persona IDs to names: stored in the persona model that produced the Pers_* columns
+    names = persona_names(joblib.load(PERSONA_MODEL_PATH)) if os.path.exists(PERSONA_MODEL_PATH) else persona_names(None)
 
     # ==========================================
     # 3. PREDICTIONS
@@ -100,7 +105,7 @@ def run_marketing_analysis(add_noise=True, noise_level=0.05):
     }).reset_index()
 
     for _, row in strategy.iterrows():
-        name = persona_names.get(row['Persona_ID'], f"ID {row['Persona_ID']}")
+        name = names.get(row['Persona_ID'], f"ID {row['Persona_ID']}")
         print(f"{name:<25} | {row['Best_Season']:<12} | {row['Target_Region']:<12} | ${row['Predicted_Gain']:>10.2f}")
 
     print("="*80)
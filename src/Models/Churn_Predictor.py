@@ -1,14 +1,300 @@
 import pandas as pd
+import numpy as np
+import xgboost as xgb
 from xgboost import XGBClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, log_loss
 import joblib
 import os
+import re
+import sys
+import json
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+from CVS_Storage import load_frame, iter_frame_chunks
+from Model_Pipelines import fuse_with_scaler, save_pipeline, CHURN_PIPELINE_PATH
+from Compact_Models import export_xgb_classifier, current_churn_model_file, CHURN_CURRENT_FILE
 
-X_train = pd.read_csv("data/TestTrainData/X_Train.csv")
-y_train = pd.read_csv("data/TestTrainData/y_Train.csv").values.ravel()
+# ─────────────────────────────────────────────
+# Training configurations
+# ─────────────────────────────────────────────
+#   default  : the original settings (100 trees, xgboost defaults)
+#   hist     : histogram tree method on an explicit thread count, up to 1000
+#              rounds with early stopping on a stratified validation split;
+#              the model keeps its best rounds only
+#   external : same, but X/y are streamed in chunks through an xgboost
+#              DataIter into an external-memory (ExtMemQuantileDMatrix) cache,
+#              for training sets that don't fit in RAM
+# n_jobs=None means every core. See src/Benchmarks/Churn_Training_Benchmark.py
+# for time and memory per configuration.
 
-model = XGBClassifier(n_estimators=100, random_state=42, eval_metric='logloss')
-model.fit(X_train, y_train)
+TRAINING_CONFIGS = {
+    "default": {},
+    "hist": {"tree_method": "hist", "n_jobs": None, "n_estimators": 1000,
+             "early_stopping_rounds": 20, "validation_size": 0.2},
+    "external": {"tree_method": "hist", "n_jobs": None, "n_estimators": 1000,
+                 "early_stopping_rounds": 20, "validation_size": 0.2,
+                 "external_memory": True, "chunksize": 500_000, "validation_max_rows": 200_000},
+}
+DEFAULT_PARAMS = {"n_estimators": 100, "random_state": 42, "eval_metric": 'logloss'}
 
-# This will now definitely have 7 features
-joblib.dump(model, 'models/churn_predictor_v1.pkl')
-print(f"✅ Model trained on {X_train.shape[1]} features.")
\ No newline at end of file
+# ─────────────────────────────────────────────
+# Model versions
+# ─────────────────────────────────────────────
+# Full trains write churn_predictor_v1.pkl and make it the served model again.
+# Incremental runs (continue_churn_model) write the next churn_predictor_v<N>.pkl
+# and only promote it past the holdout guard. CHURN_CURRENT_FILE (see
+# Compact_Models) names the promoted one, which the app, the lookup grid and
+# the flat export load.
+CHURN_VERSION_PATTERN = re.compile(r"churn_predictor_v(\d+)\.pkl$")
+
+
+def next_churn_model_path(model_dir='models'):
+    os.makedirs(model_dir, exist_ok=True)
+    versions = [int(m.group(1)) for m in map(CHURN_VERSION_PATTERN.match, os.listdir(model_dir)) if m]
+    return os.path.join(model_dir, f"churn_predictor_v{max(versions, default=0) + 1}.pkl")
+
+
+def _set_current_churn_model(model_path, info=None):
+    pointer = os.path.join(os.path.dirname(model_path), CHURN_CURRENT_FILE)
+    tmp_path = pointer + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"model": os.path.basename(model_path), "promoted_at": time.time(), **(info or {})}, f, indent=2)
+    os.replace(tmp_path, pointer)
+
+
+def _booster_params(config, params=None):
+    """XGBClassifier keyword arguments for a training config (+ tuned params)."""
+    out = {**DEFAULT_PARAMS, **(params or {})}
+    if "tree_method" in config:
+        out["tree_method"] = config["tree_method"]
+    if "n_jobs" in config:
+        out["n_jobs"] = config["n_jobs"] or os.cpu_count()
+    if "n_estimators" in config and not (params or {}).get("n_estimators"):
+        out["n_estimators"] = config["n_estimators"]
+    return out
+
+
+def _fit_in_memory(X_train, y_train, config, params=None):
+    kwargs = _booster_params(config, params)
+    rounds = config.get("early_stopping_rounds")
+    if not rounds:
+        model = XGBClassifier(**kwargs)
+        model.fit(X_train, y_train)
+        return model
+
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=config.get("validation_size", 0.2),
+                                                  random_state=42, stratify=y_train)
+    # 'logloss' is binary-only once a validation set is evaluated
+    probe = XGBClassifier(**{**kwargs, "eval_metric": "mlogloss"}, early_stopping_rounds=rounds)
+    probe.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    print(f"⏱️  Early stopping: {probe.best_iteration + 1} rounds (validation logloss {probe.best_score:.4f})")
+    return _best_rounds_model(probe.get_booster(), probe.best_iteration)
+
+
+def _best_rounds_model(booster, best_iteration):
+    """XGBClassifier holding only the first best_iteration + 1 rounds, so predict and the flat export agree."""
+    model = XGBClassifier()
+    model.load_model(bytearray(booster[: best_iteration + 1].save_raw("ubj")))
+    return model
+
+
+class _ChunkIter(xgb.DataIter):
+    """Streams (X, y) chunks of the stored frames; rows with index % every == 0 are held out."""
+
+    def __init__(self, x_path, y_path, chunksize, holdout_every, cache_prefix):
+        super().__init__(cache_prefix=cache_prefix)
+        self.x_path, self.y_path = x_path, y_path
+        self.chunksize = chunksize
+        self.holdout_every = holdout_every
+        self._chunks = None
+
+    def _pairs(self):
+        return zip(iter_frame_chunks(self.x_path, self.chunksize), iter_frame_chunks(self.y_path, self.chunksize))
+
+    def holdout(self, max_rows):
+        X_parts, y_parts, n = [], [], 0
+        for X, y in self._pairs():
+            rows = (X.index % self.holdout_every == 0)
+            X_parts.append(X[rows])
+            y_parts.append(y[rows].iloc[:, 0])
+            n += int(rows.sum())
+            if n >= max_rows:
+                break
+        return pd.concat(X_parts).iloc[:max_rows], pd.concat(y_parts).iloc[:max_rows]
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = self._pairs()
+        try:
+            X, y = next(self._chunks)
+        except StopIteration:
+            return False
+        rows = (X.index % self.holdout_every != 0)
+        input_data(data=X[rows], label=y[rows].iloc[:, 0].to_numpy())
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+def _fit_external(x_path, y_path, config, params=None):
+    kwargs = _booster_params(config, params)
+    labels = set()
+    for y in iter_frame_chunks(y_path, config.get("chunksize", 500_000)):
+        labels.update(y.iloc[:, 0].unique().tolist())
+    booster_params = {
+        "objective": "multi:softprob", "num_class": len(labels), "eval_metric": "mlogloss",
+        "tree_method": "hist", "nthread": kwargs.get("n_jobs") or os.cpu_count(), "seed": kwargs["random_state"],
+        **{k: v for k, v in kwargs.items() if k not in ("n_estimators", "random_state", "eval_metric", "n_jobs",
+                                                        "tree_method")},
+    }
+    holdout_every = max(2, round(1 / config.get("validation_size", 0.2)))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        it = _ChunkIter(x_path, y_path, config.get("chunksize", 500_000), holdout_every,
+                        os.path.join(cache_dir, "churn"))
+        dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=256, nthread=booster_params["nthread"])
+        X_val, y_val = it.holdout(config.get("validation_max_rows", 200_000))
+        dval = xgb.QuantileDMatrix(X_val, label=y_val.to_numpy(), ref=dtrain)
+        booster = xgb.train(booster_params, dtrain, num_boost_round=kwargs["n_estimators"],
+                            evals=[(dval, "validation")], early_stopping_rounds=config.get("early_stopping_rounds"),
+                            verbose_eval=False)
+        if config.get("early_stopping_rounds"):
+            print(f"⏱️  Early stopping: {booster.best_iteration + 1} rounds "
+                  f"(validation logloss {booster.best_score:.4f})")
+            return _best_rounds_model(booster, booster.best_iteration)
+    # Same sklearn wrapper as the in-memory path (pickle, pipeline, flat export)
+    return _best_rounds_model(booster, booster.num_boosted_rounds() - 1)
+
+
+def train_churn_model(X_train, y_train, model_path='models/churn_predictor_v1.pkl',
+                      scaler=None, pipeline_path=CHURN_PIPELINE_PATH,
+                      flat_path='models/churn_predictor_flat.joblib', params=None, config="default"):
+    # The retrained model becomes the served one: the current pointer is reset
+    # to model_path so it agrees with the pipeline and flat export
+    # params: overrides from the tuning leaderboard (Model_Tuning.best_params)
+    # config: a TRAINING_CONFIGS name or dict. For "external", X_train/y_train
+    # are the paths of the stored frames instead of the data itself.
+    config = TRAINING_CONFIGS[config] if isinstance(config, str) else config
+    if config.get("external_memory"):
+        model = _fit_external(X_train, y_train, config, params)
+    else:
+        model = _fit_in_memory(X_train, y_train, config, params)
+
+    # This will now definitely have 7 features
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(model, model_path)
+    print(f"✅ Model trained on {model.n_features_in_} features.")
+
+    _publish(model, model_path, scaler, pipeline_path, flat_path)
+    return model
+
+
+def _publish(model, model_path, scaler, pipeline_path, flat_path, info=None):
+    """Makes model_path the served churn model: serving exports + current-version pointer."""
+    # X_train is already scaled: bundle the scaler that produced it
+    if scaler is not None:
+        save_pipeline(fuse_with_scaler(scaler, model), pipeline_path)
+
+    # NumPy-only copy of the trees (+ scaler) for the lightweight serving path
+    export_xgb_classifier(model, flat_path, scaler=scaler)
+    print(f"💾 Flat churn predictor saved to {flat_path}")
+    _set_current_churn_model(model_path, info)
+
+
+# ─────────────────────────────────────────────
+# Incremental training (continued boosting)
+# ─────────────────────────────────────────────
+def holdout_metrics(model, X_holdout, y_holdout):
+    proba = model.predict_proba(X_holdout)
+    return {
+        "accuracy": float(accuracy_score(y_holdout, model.classes_[proba.argmax(axis=1)])),
+        "logloss": float(log_loss(y_holdout, proba, labels=model.classes_)),
+    }
+
+
+def continue_churn_model(X_new, y_new, base_path=None, n_rounds=50, model_dir='models',
+                         holdout_paths=("data/TestTrainData/X_Test.csv", "data/TestTrainData/y_Test.csv"),
+                         max_accuracy_drop=0.0, max_logloss_increase=0.01,
+                         scaler=None, pipeline_path=CHURN_PIPELINE_PATH,
+                         flat_path='models/churn_predictor_flat.joblib'):
+    """
+    Adds n_rounds boosting rounds to the current churn model, fitted on a new
+    batch of (scaled) customers only, and saves them as the next
+    churn_predictor_v<N>.pkl.
+
+    Promotion guard: the candidate is scored on the fixed holdout next to
+    the base model and only becomes the served model (pipeline, flat export,
+    current pointer) if its accuracy drops by at most max_accuracy_drop and
+    its logloss grows by at most max_logloss_increase.
+    Returns (candidate, report).
+    """
+    base_path = base_path or os.path.join(model_dir, current_churn_model_file(model_dir))
+    base = joblib.load(base_path)
+
+    # Low-level train: the batch may not contain every class, the booster keeps num_class
+    params = {k: v for k, v in base.get_xgb_params().items() if v is not None and k not in ("eval_metric", "n_jobs")}
+    params.update({"objective": "multi:softprob", "num_class": int(base.n_classes_)})
+    start = time.perf_counter()
+    booster = xgb.train(params, xgb.DMatrix(X_new, label=np.asarray(y_new)), num_boost_round=n_rounds,
+                        xgb_model=base.get_booster())
+    candidate = _best_rounds_model(booster, booster.num_boosted_rounds() - 1)
+    seconds = time.perf_counter() - start
+
+    candidate_path = next_churn_model_path(model_dir)
+    joblib.dump(candidate, candidate_path)
+
+    X_holdout = load_frame(holdout_paths[0])
+    y_holdout = load_frame(holdout_paths[1]).values.ravel()
+    before, after = holdout_metrics(base, X_holdout, y_holdout), holdout_metrics(candidate, X_holdout, y_holdout)
+    promoted = (after["accuracy"] >= before["accuracy"] - max_accuracy_drop
+                and after["logloss"] <= before["logloss"] + max_logloss_increase)
+    report = {
+        "base": os.path.basename(base_path),
+        "candidate": os.path.basename(candidate_path),
+        "batch_rows": int(len(y_new)),
+        "rounds_added": n_rounds,
+        "train_seconds": round(seconds, 3),
+        "holdout_before": before,
+        "holdout_after": after,
+        "promoted": promoted,
+    }
+
+    print(f"➕ {report['candidate']}: {n_rounds} rounds on {len(y_new)} new rows in {seconds:.2f}s "
+          f"(from {report['base']})")
+    print(f"🔎 Holdout accuracy {before['accuracy']:.4f} -> {after['accuracy']:.4f}, "
+          f"logloss {before['logloss']:.4f} -> {after['logloss']:.4f}")
+    if promoted:
+        _publish(candidate, candidate_path, scaler, pipeline_path, flat_path,
+                 info={"base": report["base"], "holdout": after})
+        print(f"✅ {report['candidate']} promoted")
+    else:
+        print(f"⛔ {report['candidate']} kept but not promoted (holdout got worse); still serving {report['base']}")
+    return candidate, report
+
+
+if __name__ == "__main__":
+    if "--continue" in sys.argv:
+        # --continue X_batch.csv y_batch.csv [--rounds N]: incremental update on new customers
+        i = sys.argv.index("--continue")
+        rounds = int(sys.argv[sys.argv.index("--rounds") + 1]) if "--rounds" in sys.argv else 50
+        continue_churn_model(load_frame(sys.argv[i + 1]), load_frame(sys.argv[i + 2]).values.ravel(), n_rounds=rounds,
+                             scaler=joblib.load('models/main_scaler.pkl'))
+        sys.exit(0)
+
+    # --config default|hist|external
+    config = sys.argv[sys.argv.index("--config") + 1] if "--config" in sys.argv else "default"
+    if TRAINING_CONFIGS[config].get("external_memory"):
+        X_train, y_train = "data/TestTrainData/X_Train.csv", "data/TestTrainData/y_Train.csv"
+    else:
+        X_train = load_frame("data/TestTrainData/X_Train.csv")
+        y_train = load_frame("data/TestTrainData/y_Train.csv").values.ravel()
+
+    params = None
+    if "--tuned" in sys.argv:
+        from Model_Tuning import best_params
+        params = best_params("churn")
+    train_churn_model(X_train, y_train, scaler=joblib.load('models/main_scaler.pkl'), params=params,
+                      config=config)
\ No newline at end of file
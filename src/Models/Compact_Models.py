@@ -0,0 +1,387 @@
+import os
+import sys
+import json
+import numpy as np
+import joblib
+
+# ─────────────────────────────────────────────
+# Flat-array model artifacts
+# ─────────────────────────────────────────────
+# Pickled sklearn forests are rebuilt object by object on load (and the tree
+# buffers are copied), so every worker process holds a private copy. Here the
+# forest is flattened into a handful of plain NumPy arrays and written with an
+# uncompressed joblib.dump: joblib.load(..., mmap_mode='r') then maps them
+# straight from the page cache, shared by every process on the machine.
+#
+# This module deliberately only depends on numpy/joblib so the serving side
+# can use it without importing scikit-learn.
+
+FOREST_FORMAT = "flat_forest_v1"
+
+
+def export_forest(model, path):
+    """Flattens a fitted sklearn RandomForestRegressor into an mmap-able artifact."""
+    lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        left = tree.children_left
+        right = tree.children_right
+        is_leaf = left == -1
+        lefts.append(np.where(is_leaf, -1, left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, right + offset).astype(np.int32))
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    arrays = {
+        "format": FOREST_FORMAT,
+        "children_left": np.ascontiguousarray(np.concatenate(lefts)),
+        "children_right": np.ascontiguousarray(np.concatenate(rights)),
+        "feature": np.ascontiguousarray(np.concatenate(features)),
+        "threshold": np.ascontiguousarray(np.concatenate(thresholds)),
+        "value": np.ascontiguousarray(np.concatenate(values)),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": int(max_depth),
+        "n_features": int(model.n_features_in_),
+        "feature_names": list(feature_names) if feature_names is not None else None,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # compress=0 is required for mmap_mode to work on load
+    joblib.dump(arrays, path, compress=0)
+    return path
+
+
+class FlatForestRegressor:
+    """NumPy-only drop-in for RandomForestRegressor.predict on an exported forest."""
+
+    def __init__(self, arrays, chunk_size=4096):
+        if arrays.get("format") != FOREST_FORMAT:
+            raise ValueError(f"Not a {FOREST_FORMAT} artifact")
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = arrays["max_depth"]
+        self.n_features_in_ = arrays["n_features"]
+        self.feature_names_in_ = arrays["feature_names"]
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns") and self.feature_names_in_ is not None:
+            X = X[self.feature_names_in_]
+        # sklearn trees evaluate splits on float32 inputs
+        return np.asarray(X, dtype=np.float32)
+
+    def _predict_chunk(self, X):
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            left = self.children_left[node]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(is_leaf, node, np.where(go_left, left, self.children_right[node]))
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X):
+        X = self._as_matrix(X)
+        return np.concatenate([
+            self._predict_chunk(X[start:start + self.chunk_size])
+            for start in range(0, X.shape[0], self.chunk_size)
+        ]) if X.shape[0] else np.empty(0)
+
+
+# ─────────────────────────────────────────────
+# Churn XGBoost + persona KMeans (3-feature endpoints)
+# ─────────────────────────────────────────────
+# /api/predict_all only needs predict() on 3 numbers. Both exports can carry
+# the fitted StandardScaler (mean_/scale_), so a single load + predict covers
+# scaling and scoring without importing xgboost, scikit-learn or pandas.
+
+KMEANS_FORMAT = "flat_kmeans_v1"
+XGB_FORMAT = "flat_xgb_classifier_v1"
+
+# Full churn trains write churn_predictor_v1.pkl; Churn_Predictor.continue_churn_model
+# writes churn_predictor_v2.pkl, ... and this pointer, next to the pickles,
+# names the promoted one.
+CHURN_CURRENT_FILE = "churn_model_current.json"
+
+
+def current_churn_model_file(model_dir="models"):
+    """File name of the promoted churn pickle (churn_predictor_v1.pkl before any promotion)."""
+    pointer = os.path.join(model_dir, CHURN_CURRENT_FILE)
+    if os.path.exists(pointer):
+        with open(pointer) as f:
+            return json.load(f)["model"]
+    return "churn_predictor_v1.pkl"
+
+
+def _scaler_arrays(scaler):
+    if scaler is None:
+        return {"input_mean": None, "input_scale": None}
+    return {
+        "input_mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "input_scale": np.asarray(scaler.scale_, dtype=np.float64),
+    }
+
+
+def _scaled(X, arrays):
+    # Same float64 operations as StandardScaler.transform
+    X = np.array(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[None, :]
+    if arrays["input_mean"] is not None:
+        X -= arrays["input_mean"]
+        X /= arrays["input_scale"]
+    return X
+
+
+def export_kmeans(model, path, scaler=None):
+    """Stores the fitted KMeans centroids (and optionally the scaler in front of it)."""
+    arrays = {
+        "format": KMEANS_FORMAT,
+        "centers": np.ascontiguousarray(model.cluster_centers_, dtype=np.float64),
+        "n_features": int(model.n_features_in_),
+        # Persona ID -> name, when the model carries it (Persona_Alignment.py)
+        "persona_names": getattr(model, "persona_names_", None),
+        **_scaler_arrays(scaler),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(arrays, path, compress=0)
+    return path
+
+
+class FlatKMeans:
+    """NumPy-only KMeans.predict: argmin over squared distances to the centroids."""
+
+    def __init__(self, arrays):
+        if arrays.get("format") != KMEANS_FORMAT:
+            raise ValueError(f"Not a {KMEANS_FORMAT} artifact")
+        self.arrays = arrays
+        self.centers = arrays["centers"]
+        # Same expression as scikit-learn's Lloyd labelling: ||c||^2 - 2 x.c
+        # (||x||^2 is the same for every centroid, so it is left out)
+        self.center_norms = (self.centers ** 2).sum(axis=1)
+        self.n_features_in_ = arrays["n_features"]
+        if arrays.get("persona_names") is not None:
+            self.persona_names_ = arrays["persona_names"]
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    def predict(self, X):
+        X = _scaled(X, self.arrays)
+        distances = self.center_norms[None, :] - 2.0 * (X @ self.centers.T)
+        return distances.argmin(axis=1).astype(np.int32)
+
+
+def export_xgb_classifier(model, path, scaler=None):
+    """
+    Flattens a multi-class XGBClassifier (gbtree, multi:softprob/softmax)
+    from the booster's JSON model into node arrays.
+    """
+    learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+    booster = learner["gradient_booster"]
+    objective = learner["objective"]["name"]
+    if booster["name"] != "gbtree" or objective not in ("multi:softprob", "multi:softmax"):
+        raise ValueError(f"Unsupported booster/objective: {booster['name']} / {objective}")
+
+    n_class = int(learner["learner_model_param"]["num_class"])
+    base_score = learner["learner_model_param"]["base_score"]
+    base_score = json.loads(base_score) if base_score.startswith("[") else [float(base_score)] * n_class
+
+    lefts, rights, features, thresholds, default_left, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in booster["model"]["trees"]:
+        left = np.asarray(tree["left_children"], dtype=np.int32)
+        right = np.asarray(tree["right_children"], dtype=np.int32)
+        is_leaf = left == -1
+        lefts.append(np.where(is_leaf, -1, left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, right + offset).astype(np.int32))
+        features.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+        # Leaves keep their value in split_conditions
+        thresholds.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        roots.append(offset)
+        offset += len(left)
+
+        depth = np.zeros(len(left), dtype=np.int32)
+        for node in range(len(left)):
+            if not is_leaf[node]:
+                depth[left[node]] = depth[right[node]] = depth[node] + 1
+        max_depth = max(max_depth, int(depth.max()))
+
+    arrays = {
+        "format": XGB_FORMAT,
+        "children_left": np.concatenate(lefts),
+        "children_right": np.concatenate(rights),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "default_left": np.concatenate(default_left),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "tree_class": np.asarray(booster["model"]["tree_info"], dtype=np.int32),
+        "base_score": np.asarray(base_score, dtype=np.float32),
+        "n_class": n_class,
+        "max_depth": max_depth,
+        "n_features": int(learner["learner_model_param"]["num_feature"]),
+        "classes": np.asarray(model.classes_),
+        **_scaler_arrays(scaler),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(arrays, path, compress=0)
+    return path
+
+
+class FlatXGBClassifier:
+    """NumPy-only XGBClassifier.predict / predict_proba on an exported booster."""
+
+    def __init__(self, arrays):
+        if arrays.get("format") != XGB_FORMAT:
+            raise ValueError(f"Not a {XGB_FORMAT} artifact")
+        self.arrays = arrays
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.default_left = arrays["default_left"]
+        self.roots = arrays["roots"]
+        self.base_score = arrays["base_score"]
+        self.max_depth = arrays["max_depth"]
+        self.classes_ = arrays["classes"]
+        self.n_features_in_ = arrays["n_features"]
+        # Trees of each class, in boosting order
+        self.class_trees = [np.flatnonzero(arrays["tree_class"] == k) for k in range(arrays["n_class"])]
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    def predict_margin(self, X):
+        # XGBoost evaluates `x < split` on float32 features, missing -> default branch
+        X = _scaled(X, self.arrays).astype(np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        for _ in range(self.max_depth):
+            left = self.children_left[node]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(is_leaf, node, np.where(go_left, left, self.children_right[node]))
+        leaves = self.threshold[node]
+
+        # Float32 running sum from the base score, tree by tree (as the C++ predictor)
+        margins = np.empty((X.shape[0], len(self.class_trees)), dtype=np.float32)
+        for k, trees in enumerate(self.class_trees):
+            terms = np.concatenate([np.broadcast_to(self.base_score[k], (X.shape[0], 1)), leaves[:, trees]], axis=1)
+            margins[:, k] = np.cumsum(terms, axis=1, dtype=np.float32)[:, -1]
+        return margins
+
+    def predict_proba(self, X):
+        margins = self.predict_margin(X)
+        exp = np.exp(margins - margins.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True, dtype=np.float32)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+# ─────────────────────────────────────────────
+# Precomputed label grid over the integer feature domain
+# ─────────────────────────────────────────────
+# Recency, raw Frequency and CustomerTenureDays are bounded integers, so both
+# classifiers can be tabulated once (src/Models/Lookup_Grid.py builds and
+# validates the table). Each uint8 cell packs persona | churn << 4.
+# The models see Frequency as log1p(purchases) (prepare_data STEP 7), so a row
+# hits the grid only when Frequency is exactly log1p(k) for an integer k in
+# range; any other row must be scored by the models.
+
+GRID_FORMAT = "lookup_grid_v1"
+
+
+class LookupGrid:
+    """O(1) persona/churn labels for rows on the integer grid."""
+
+    def __init__(self, arrays):
+        if arrays.get("format") != GRID_FORMAT:
+            raise ValueError(f"Not a {GRID_FORMAT} artifact")
+        self.arrays = arrays
+        self.table = arrays["table"]
+        self.lows = np.asarray(arrays["lows"], dtype=np.int64)
+        self.highs = np.asarray(arrays["highs"], dtype=np.int64)
+        self.sources = arrays["sources"]
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    def cells(self, X):
+        """Integer grid coordinates of each row and a mask of rows that are on the grid."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        with np.errstate(invalid="ignore", over="ignore"):
+            raw = X.copy()
+            raw[:, 1] = np.round(np.expm1(X[:, 1]))
+            idx = np.nan_to_num(np.round(raw), nan=-1).astype(np.int64)
+            on_grid = (raw == idx) & (idx >= self.lows) & (idx <= self.highs)
+            on_grid[:, 1] &= np.log1p(idx[:, 1].astype(np.float64)) == X[:, 1]
+        return idx - self.lows, on_grid.all(axis=1)
+
+    def lookup(self, X):
+        """(persona, churn, hit): labels are only meaningful where hit is True."""
+        idx, hit = self.cells(X)
+        idx[~hit] = 0
+        packed = np.asarray(self.table[idx[:, 0], idx[:, 1], idx[:, 2]])
+        return (packed & 0x0F).astype(np.int32), (packed >> 4).astype(np.int32), hit
+
+
+# ─────────────────────────────────────────────
+# CLI: convert the committed pickles
+# ─────────────────────────────────────────────
+if __name__ == "__main__":
+    import pandas as pd
+
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else "models"
+    src_path = os.path.join(model_dir, "marketing_timeline_model.pkl")
+    dst_path = os.path.join(model_dir, "marketing_timeline_forest.joblib")
+
+    rf_model = joblib.load(src_path)
+    export_forest(rf_model, dst_path)
+
+    # Sanity check on random inputs in the scaled feature space
+    X_check = np.random.default_rng(0).normal(size=(2000, rf_model.n_features_in_))
+    flat = FlatForestRegressor.load(dst_path)
+    max_diff = np.abs(flat.predict(X_check) - rf_model.predict(X_check)).max()
+    print(f"✅ Exported {src_path} -> {dst_path} (max |diff| = {max_diff:.2e})")
+
+    # Churn + persona, with the main scaler folded in
+    scaler = joblib.load(os.path.join(model_dir, "main_scaler.pkl"))
+    X_raw = np.random.default_rng(0).normal(size=(2000, 3)) * scaler.scale_ + scaler.mean_
+    X_scaled = scaler.transform(pd.DataFrame(X_raw, columns=scaler.feature_names_in_))
+    for src_name, dst_name, export, flat_cls in [
+        (current_churn_model_file(model_dir), "churn_predictor_flat.joblib", export_xgb_classifier, FlatXGBClassifier),
+        ("persona_classifier.pkl", "persona_classifier_flat.joblib", export_kmeans, FlatKMeans),
+    ]:
+        model = joblib.load(os.path.join(model_dir, src_name))
+        export(model, os.path.join(model_dir, dst_name), scaler=scaler)
+        flat = flat_cls.load(os.path.join(model_dir, dst_name))
+        same = np.array_equal(np.asarray(model.predict(X_scaled)), flat.predict(X_raw))
+        print(f"✅ Exported {src_name} -> {dst_name} (identical classes: {same})")
@@ -1,32 +1,127 @@
 import pandas as pd
+import numpy as np
 import joblib
 import os
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+from CVS_Storage import load_frame, iter_frame_chunks
+from Model_Pipelines import fuse_with_scaler, save_pipeline, PERSONA_PIPELINE_PATH
+from Compact_Models import export_kmeans
+from Persona_Alignment import align_personas
 
-# 1. Load Training Data (Scaled)
 data_path = 'data/TestTrainData/X_Train.csv'
-df_scaled = pd.read_csv(data_path)
-
-# 2. Final KMeans Model
-optimal_k = 4
-
-model_kmeans = KMeans(
-    n_clusters=optimal_k,
-    init='k-means++',
-    random_state=42,
-    n_init=10
-)
-
-# Fit on the scaled training features
-clusters = model_kmeans.fit_predict(df_scaled)
-
-# 3. Save Model
-os.makedirs('models', exist_ok=True)
-joblib.dump(model_kmeans, 'models/persona_classifier.pkl')
-print("✅ Persona model saved successfully")
-
-# 4. Summary for Business
-summary = df_scaled.copy()
-summary['Persona'] = clusters
-print("\n🚀 Persona Feature Means (Scaled Units):")
-print(summary.groupby('Persona').mean())
+
+
+def train_persona_model(df_scaled, optimal_k=4, model_path='models/persona_classifier.pkl',
+                        scaler=None, pipeline_path=PERSONA_PIPELINE_PATH,
+                        flat_path='models/persona_classifier_flat.joblib', align_with=None):
+    # 2. Final KMeans Model
+    model_kmeans = KMeans(
+        n_clusters=optimal_k,
+        init='k-means++',
+        random_state=42,
+        n_init=10
+    )
+
+    # Fit on the scaled training features
+    model_kmeans.fit(df_scaled)
+
+    # 3. Save Model (+ fused pipeline and NumPy-only centroids for serving),
+    # renumbered to the persona IDs of the model it replaces
+    _save_persona_model(model_kmeans, model_path, scaler, pipeline_path, flat_path,
+                        align_with=model_path if align_with is None else align_with)
+
+    # 4. Summary for Business
+    summary = df_scaled.copy()
+    summary['Persona'] = model_kmeans.labels_
+    print("\n🚀 Persona Feature Means (Scaled Units):")
+    print(summary.groupby('Persona').mean())
+    return model_kmeans
+
+
+def _save_persona_model(model, model_path, scaler, pipeline_path, flat_path, align_with=None):
+    # align_with: previous persona model whose IDs (and names) must be kept
+    previous = joblib.load(align_with) if align_with and os.path.exists(align_with) else None
+    distances = align_personas(model, previous)
+    if previous is not None:
+        print(f"🔗 Persona IDs aligned to {align_with} (centroid distance per ID: "
+              f"{ {pid: round(d, 4) for pid, d in sorted(distances.items())} })")
+
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(model, model_path)
+    print("✅ Persona model saved successfully")
+    if scaler is not None:
+        save_pipeline(fuse_with_scaler(scaler, model), pipeline_path)
+    export_kmeans(model, flat_path, scaler=scaler)
+
+
+def train_persona_model_streaming(path=data_path, optimal_k=4, chunksize=100_000, n_epochs=3,
+                                  init_model_path='models/persona_classifier.pkl',
+                                  model_path='models/persona_classifier.pkl',
+                                  scaler=None, pipeline_path=PERSONA_PIPELINE_PATH,
+                                  flat_path='models/persona_classifier_flat.joblib'):
+    """
+    Out-of-core persona training: MiniBatchKMeans.partial_fit over chunks of
+    the scaled feature file, so memory stays at one chunk whatever the size
+    of the customer base.
+
+    When init_model_path exists, its centroids are the starting point and no
+    cluster is ever re-seeded (reassignment_ratio=0): cluster i keeps meaning
+    persona i, and the names stored in the model (persona_names_) still fit
+    their clusters. Otherwise the first chunk seeds the clusters with k-means++.
+    """
+    previous = joblib.load(init_model_path) if init_model_path and os.path.exists(init_model_path) else None
+    if previous is not None and previous.n_clusters != optimal_k:
+        raise ValueError(f"{init_model_path} has {previous.n_clusters} personas, expected {optimal_k}")
+
+    model = MiniBatchKMeans(
+        n_clusters=optimal_k,
+        init=previous.cluster_centers_ if previous is not None else 'k-means++',
+        n_init=1 if previous is not None else 3,
+        batch_size=min(chunksize, 4096),
+        reassignment_ratio=0.0 if previous is not None else 0.01,
+        random_state=42,
+    )
+
+    columns = None
+    for epoch in range(n_epochs):
+        rows = 0
+        for chunk in iter_frame_chunks(path, chunksize):
+            columns = list(chunk.columns)
+            # sklearn copies to float64 anyway; doing it here avoids a second copy
+            X = chunk.to_numpy(dtype=np.float64)
+            # partial_fit takes one mini-batch step per call: feed the chunk in batch_size slices
+            for start in range(0, len(X), model.batch_size):
+                model.partial_fit(X[start:start + model.batch_size])
+            rows += len(X)
+        print(f"   ... epoch {epoch + 1}/{n_epochs}: {rows} customers streamed")
+
+    # Fitted on arrays: restore the column names the batch model carries
+    model.feature_names_in_ = np.asarray(columns, dtype=object)
+    if previous is not None:
+        print(f"🔁 Warm-started from {init_model_path}")
+
+    # Warm-started clusters keep their IDs already; the matching also carries the names over
+    _save_persona_model(model, model_path, scaler, pipeline_path, flat_path, align_with=init_model_path)
+    print("\n🚀 Persona Centroids (Scaled Units):")
+    print(pd.DataFrame(model.cluster_centers_, columns=columns).rename_axis('Persona'))
+    return model
+
+
+if __name__ == "__main__":
+    if "--stream" in sys.argv:
+        # Large customer bases: MiniBatchKMeans over chunks, warm-started from the current model
+        train_persona_model_streaming(scaler=joblib.load('models/main_scaler.pkl'))
+        sys.exit(0)
+
+    # 1. Load Training Data (Scaled)
+    df_scaled = load_frame(data_path)
+    optimal_k = 4
+    if "--tuned" in sys.argv:
+        # k with the best silhouette in the tuning sweep (Model_Tuning.py persona).
+        # Names travel in the model (persona_names_): clusters added beyond the
+        # previous model's get a "Persona <i>" placeholder to rename there.
+        from Model_Tuning import best_params
+        optimal_k = (best_params("persona") or {}).get("n_clusters", optimal_k)
+    train_persona_model(df_scaled, optimal_k=optimal_k, scaler=joblib.load('models/main_scaler.pkl'))
@@ -0,0 +1,132 @@
+import os
+import sys
+import time
+import hashlib
+import warnings
+import numpy as np
+import pandas as pd
+import joblib
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+from CVS_Storage import load_frame
+from Compact_Models import GRID_FORMAT, LookupGrid, current_churn_model_file
+
+# ─────────────────────────────────────────────
+# Build + validate the persona/churn lookup grid
+# ─────────────────────────────────────────────
+# Domain from validate_dataset_logic (CVS_InvalidData_Check.py):
+#   Recency 0-400, Frequency 1-50 purchases, CustomerTenureDays 0-730
+# = 401 x 50 x 731 ≈ 14.7M uint8 cells (~14 MB), memory-mapped by the app.
+
+FEATURES = ["Recency", "Frequency", "CustomerTenureDays"]
+GRID_LOWS = (0, 1, 0)
+GRID_HIGHS = (400, 50, 730)
+GRID_FILE = "label_grid.joblib"
+
+
+def source_files(model_dir):
+    """Scaler, persona model and the currently promoted churn model."""
+    return ["main_scaler.pkl", "persona_classifier.pkl", current_churn_model_file(model_dir)]
+
+
+def source_digests(model_dir):
+    """sha256 of the artifacts the grid was computed from (checked by the app)."""
+    digests = {}
+    for name in source_files(model_dir):
+        h = hashlib.sha256()
+        with open(os.path.join(model_dir, name), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digests[name] = h.hexdigest()
+    return digests
+
+
+def model_inputs(recency, purchases, tenure):
+    """Grid coordinates -> model feature rows (Frequency is log1p'd like in prepare_data)."""
+    return np.column_stack([
+        np.asarray(recency, dtype=np.float64),
+        np.log1p(np.asarray(purchases, dtype=np.float64)),
+        np.asarray(tenure, dtype=np.float64),
+    ])
+
+
+def score(scaler, persona_model, churn_model, X):
+    scaled = scaler.transform(pd.DataFrame(X, columns=FEATURES))
+    return persona_model.predict(scaled).astype(np.int64), churn_model.predict(scaled).astype(np.int64)
+
+
+def build_grid(scaler, persona_model, churn_model, recency_per_chunk=20):
+    n_r, n_f, n_t = (h - l + 1 for l, h in zip(GRID_LOWS, GRID_HIGHS))
+    table = np.empty((n_r, n_f, n_t), dtype=np.uint8)
+    f_vals, t_vals = np.meshgrid(np.arange(GRID_LOWS[1], GRID_HIGHS[1] + 1),
+                                 np.arange(GRID_LOWS[2], GRID_HIGHS[2] + 1), indexing="ij")
+    start = time.perf_counter()
+    for r0 in range(0, n_r, recency_per_chunk):
+        r_vals = np.arange(r0, min(r0 + recency_per_chunk, n_r)) + GRID_LOWS[0]
+        R = np.repeat(r_vals, f_vals.size)
+        X = model_inputs(R, np.tile(f_vals.ravel(), len(r_vals)), np.tile(t_vals.ravel(), len(r_vals)))
+        persona, churn = score(scaler, persona_model, churn_model, X)
+        if persona.max() > 0x0F or churn.max() > 0x0F:
+            raise ValueError("Labels do not fit in 4 bits")
+        table[r0:r0 + len(r_vals)] = (persona | (churn << 4)).astype(np.uint8).reshape(len(r_vals), n_f, n_t)
+        print(f"   ... Recency {r_vals[0]}-{r_vals[-1]} done ({time.perf_counter() - start:.1f}s)")
+    return table
+
+
+def validate_grid(grid, scaler, persona_model, churn_model, X_test_scaled):
+    """
+    Held-out check: every X_Test row is mapped back to its grid cell and the
+    cell must hold the label the models give for that row.
+    """
+    X_raw = scaler.inverse_transform(X_test_scaled)
+    cells = np.column_stack([np.round(X_raw[:, 0]), np.round(np.expm1(X_raw[:, 1])), np.round(X_raw[:, 2])])
+    on_grid = np.all((cells >= GRID_LOWS) & (cells <= GRID_HIGHS), axis=1)
+
+    persona_ref, churn_ref = score(scaler, persona_model, churn_model, X_raw)
+    persona_exact, churn_exact = score(scaler, persona_model, churn_model, model_inputs(*cells.T))
+    persona_grid, churn_grid, hit = grid.lookup(model_inputs(*cells[on_grid].T))
+
+    report = {
+        "rows": len(X_raw),
+        "on_grid": int(on_grid.sum()),
+        # Cells vs the models on the exact grid inputs (what the app looks up)
+        "exact_mismatches": int((~hit).sum() + (persona_grid != persona_exact[on_grid]).sum()
+                                + (churn_grid != churn_exact[on_grid]).sum()),
+        # Cells vs the models on the stored test rows (inverse-scaled floats)
+        "test_mismatches": int((persona_grid != persona_ref[on_grid]).sum() + (churn_grid != churn_ref[on_grid]).sum()),
+    }
+    return report
+
+
+def build_and_save(model_dir="models", test_path="data/TestTrainData/X_Test.csv"):
+    warnings.filterwarnings("ignore", category=UserWarning)
+    scaler = joblib.load(os.path.join(model_dir, "main_scaler.pkl"))
+    persona_model = joblib.load(os.path.join(model_dir, "persona_classifier.pkl"))
+    churn_model = joblib.load(os.path.join(model_dir, current_churn_model_file(model_dir)))
+
+    print(f"🧮 Building lookup grid {GRID_LOWS} -> {GRID_HIGHS}...")
+    arrays = {
+        "format": GRID_FORMAT,
+        "table": build_grid(scaler, persona_model, churn_model),
+        "lows": np.asarray(GRID_LOWS, dtype=np.int64),
+        "highs": np.asarray(GRID_HIGHS, dtype=np.int64),
+        "features": FEATURES,
+        "sources": source_digests(model_dir),
+    }
+
+    X_test = load_frame(test_path)[FEATURES]
+    report = validate_grid(LookupGrid(arrays), scaler, persona_model, churn_model, X_test)
+    print(f"🔎 Validation on {test_path}: {report}")
+    if report["exact_mismatches"] or report["test_mismatches"]:
+        raise ValueError(f"Lookup grid does not match the models: {report}")
+
+    path = os.path.join(model_dir, GRID_FILE)
+    tmp_path = path + ".tmp"
+    # compress=0 so the app can mmap the table
+    joblib.dump(arrays, tmp_path, compress=0)
+    os.replace(tmp_path, path)
+    print(f"💾 Lookup grid saved to {path} ({arrays['table'].nbytes / 1024 ** 2:.1f} MB)")
+    return path
+
+
+if __name__ == "__main__":
+    build_and_save(sys.argv[1] if len(sys.argv) > 1 else "models")
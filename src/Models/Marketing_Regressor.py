@@ -1,82 +1,109 @@
 import pandas as pd
 import joblib
 import os
+import copy
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 
-# ─────────────────────────────────────────────
-# 1. Load the NEW processed dataset
-# ─────────────────────────────────────────────
+from Compact_Models import export_forest
+from Model_Pipelines import build_marketing_pipeline, save_pipeline, MARKETING_PIPELINE_PATH
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PreData"))
+from CVS_Storage import load_frame
+
 data_path = 'data/MarketingTimelineData/XY_Full_Marketing.csv'
-df = pd.read_csv(data_path)
-
-os.makedirs('models', exist_ok=True)
-
-# ─────────────────────────────────────────────
-# 2. Separate features and target
-# ─────────────────────────────────────────────
-X = df.drop('TargetSpendingPerSeason', axis=1)
-y = df['TargetSpendingPerSeason']
-
-# ─────────────────────────────────────────────
-# 3. Train/Test Split
-# ─────────────────────────────────────────────
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# ─────────────────────────────────────────────
-# 4. Scale ONLY numeric columns
-# ─────────────────────────────────────────────
-numeric_cols = [
-    'Recency',
-    'Frequency',
-    'CustomerTenureDays',
-    'WeekendPurchaseRatio'
-]
-
-scaler = StandardScaler()
-
-X_train_scaled = X_train.copy()
-X_test_scaled = X_test.copy()
-
-X_train_scaled[numeric_cols] = scaler.fit_transform(X_train[numeric_cols])
-X_test_scaled[numeric_cols] = scaler.transform(X_test[numeric_cols])
-
-# ─────────────────────────────────────────────
-# 5. Train RandomForestRegressor
-# ─────────────────────────────────────────────
-rf_model = RandomForestRegressor(
-    n_estimators=300,
-    max_depth=10,
-    min_samples_split=15,
-    min_samples_leaf=6,
-    max_features='sqrt',
-    random_state=42,
-    n_jobs=-1
-)
-
-rf_model.fit(X_train_scaled, y_train)
-
-# ─────────────────────────────────────────────
-# 6. Evaluate
-# ─────────────────────────────────────────────
-y_pred = rf_model.predict(X_test_scaled)
-
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-r2 = r2_score(y_test, y_pred)
-
-print("\n✅ RandomForest Regressor trained on NEW dataset")
-print(f"Test RMSE: {rmse:.4f}")
-print(f"Test R²: {r2:.4f}")
-
-# ─────────────────────────────────────────────
-# 7. Save Model + Scaler ONLY
-# ─────────────────────────────────────────────
-joblib.dump(rf_model, 'models/marketing_timeline_model.pkl')
-joblib.dump(scaler, 'models/marketing_timeline_scaler.pkl')
-
-print("💾 Model and scaler saved successfully.")
\ No newline at end of file
+
+
+def train_marketing_model(df, params=None):
+    os.makedirs('models', exist_ok=True)
+
+    # ─────────────────────────────────────────────
+    # 2. Separate features and target
+    # ─────────────────────────────────────────────
+    X = df.drop('TargetSpendingPerSeason', axis=1)
+    y = df['TargetSpendingPerSeason']
+
+    # ─────────────────────────────────────────────
+    # 3. Train/Test Split
+    # ─────────────────────────────────────────────
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # ─────────────────────────────────────────────
+    # 4. Scale ONLY numeric columns (inside the pipeline)
+    # ─────────────────────────────────────────────
+    numeric_cols = [
+        'Recency',
+        'Frequency',
+        'CustomerTenureDays',
+        'WeekendPurchaseRatio'
+    ]
+
+    # ─────────────────────────────────────────────
+    # 5. Train RandomForestRegressor
+    # ─────────────────────────────────────────────
+    # Fitted end to end so the scaler and the forest always ship together
+    # (scaled numeric columns first, then the flags, as in the input frame)
+    # params: overrides from the tuning leaderboard (Model_Tuning.best_params)
+    rf_params = {
+        "n_estimators": 300,
+        "max_depth": 10,
+        "min_samples_split": 15,
+        "min_samples_leaf": 6,
+        "max_features": 'sqrt',
+        **(params or {}),
+    }
+    pipeline = build_marketing_pipeline(RandomForestRegressor(
+        **rf_params,
+        random_state=42,
+        n_jobs=-1
+    ), numeric_cols)
+
+    pipeline.fit(X_train, y_train)
+    scaler = pipeline.named_steps["prep"].named_transformers_["scale"]
+
+    # Standalone copy of the forest for the separate-pickle fallback, which is
+    # fed a DataFrame: give it the column names the pipeline fed it positionally
+    rf_model = copy.deepcopy(pipeline.named_steps["model"])
+    rf_model.feature_names_in_ = pipeline.named_steps["prep"].get_feature_names_out()
+
+    # ─────────────────────────────────────────────
+    # 6. Evaluate
+    # ─────────────────────────────────────────────
+    y_pred = pipeline.predict(X_test)
+
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+
+    print("\n✅ RandomForest Regressor trained on NEW dataset")
+    print(f"Test RMSE: {rmse:.4f}")
+    print(f"Test R²: {r2:.4f}")
+
+    # ─────────────────────────────────────────────
+    # 7. Save Pipeline + Model + Scaler (separate pickles stay as fallback)
+    # ─────────────────────────────────────────────
+    save_pipeline(pipeline, MARKETING_PIPELINE_PATH)
+    joblib.dump(rf_model, 'models/marketing_timeline_model.pkl')
+    joblib.dump(scaler, 'models/marketing_timeline_scaler.pkl')
+
+    # Flat, uncompressed copy of the forest that workers can mmap and share
+    export_forest(rf_model, 'models/marketing_timeline_forest.joblib')
+
+    print("💾 Model and scaler saved successfully.")
+
+    return rf_model, scaler
+
+
+if __name__ == "__main__":
+    # ─────────────────────────────────────────────
+    # 1. Load the NEW processed dataset
+    # ─────────────────────────────────────────────
+    df = load_frame(data_path)
+    params = None
+    if "--tuned" in sys.argv:
+        from Model_Tuning import best_params
+        params = best_params("marketing")
+    train_marketing_model(df, params=params)
\ No newline at end of file
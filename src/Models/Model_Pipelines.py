@@ -0,0 +1,61 @@
+import os
+import copy
+import joblib
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler
+
+# ─────────────────────────────────────────────
+# Fused (scaler + model) artifacts
+# ─────────────────────────────────────────────
+# The app used to load each scaler and model separately and scale by hand,
+# so a retrained model could be served with a stale scaler. Every training
+# script now also writes one sklearn Pipeline per endpoint: serving is a
+# single predict() call and both halves are always replaced together.
+#
+#   churn / persona : Pipeline(scaler -> model), positional (n, 3) arrays in
+#                     FEATURE_NAMES order, no DataFrame needed
+#   marketing       : Pipeline(ColumnTransformer(scale numeric, passthrough
+#                     flags) -> RandomForestRegressor), fitted end to end
+
+FEATURE_NAMES = ["Recency", "Frequency", "CustomerTenureDays"]
+MARKETING_NUMERIC_COLS = ["Recency", "Frequency", "CustomerTenureDays", "WeekendPurchaseRatio"]
+
+CHURN_PIPELINE_PATH = 'models/churn_pipeline.pkl'
+PERSONA_PIPELINE_PATH = 'models/persona_pipeline.pkl'
+MARKETING_PIPELINE_PATH = 'models/marketing_timeline_pipeline.pkl'
+
+
+def _positional(estimator):
+    """Copy of a fitted estimator that takes plain arrays (no feature-name check)."""
+    estimator = copy.deepcopy(estimator)
+    # Only sklearn stores it as a plain attribute (xgboost reads it from the booster
+    # and already accepts arrays)
+    if "feature_names_in_" in vars(estimator):
+        del estimator.feature_names_in_
+    return estimator
+
+
+def fuse_with_scaler(scaler, model):
+    """Pipeline(scaler -> model) from already fitted parts; nothing is refit."""
+    pipeline = Pipeline([("scaler", _positional(scaler)), ("model", _positional(model))])
+    # Kept for callers that need the expected column order
+    pipeline.input_features = list(getattr(scaler, "feature_names_in_", FEATURE_NAMES))
+    return pipeline
+
+
+def build_marketing_pipeline(model, numeric_cols=MARKETING_NUMERIC_COLS):
+    """Unfitted Pipeline: scale numeric_cols only, pass the one-hot flags through."""
+    preprocess = ColumnTransformer(
+        [("scale", StandardScaler(), numeric_cols)],
+        remainder="passthrough",
+        verbose_feature_names_out=False,
+    )
+    return Pipeline([("prep", preprocess), ("model", model)])
+
+
+def save_pipeline(pipeline, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(pipeline, path)
+    print(f"💾 Fused pipeline saved to {path}")
+    return path
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import silhouette_score, log_loss, accuracy_score, mean_squared_error, r2_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, train_test_split, KFold
+from xgboost import XGBClassifier
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(SRC_DIR, "PreData"))
+sys.path.append(SRC_DIR)
+from CVS_Storage import load_frame
+from Pipeline_Cache import fingerprint
+from Model_Pipelines import build_marketing_pipeline, MARKETING_NUMERIC_COLS
+
+# ─────────────────────────────────────────────
+# Hyperparameter search for the three trainers
+# ─────────────────────────────────────────────
+# Every (model, params) pair is one trial, run in parallel by joblib (loky
+# processes). The training arrays are passed as plain NumPy arrays, which
+# joblib memory-maps once for all workers instead of pickling them per
+# trial.
+#
+#   churn     : XGBClassifier with early stopping on a stratified 20%
+#               validation split of X_Train; score = -val logloss
+#   persona   : KMeans sweep over k; score = silhouette (inertia kept too)
+#   marketing : RandomForest in the marketing pipeline, 3-fold CV on the
+#               trainer's 80% train split; score = mean R²
+#
+# Finished trials are appended to <out>/<model>_trials.jsonl as they
+# complete, keyed on sha256(model, params, data). A rerun skips the trials
+# already in the file, so an interrupted search resumes where it stopped.
+# <out>/<model>_leaderboard.csv is rewritten after every search.
+
+TUNING_DIR = 'models/tuning'
+
+SEARCH_SPACES = {
+    "churn": {
+        "n_estimators": [1000],           # upper bound, early stopping picks the count
+        "max_depth": [3, 4, 6],
+        "learning_rate": [0.05, 0.1, 0.3],
+        "subsample": [0.8, 1.0],
+        "min_child_weight": [1, 5],
+    },
+    "persona": {
+        "n_clusters": list(range(2, 11)),
+    },
+    "marketing": {
+        "n_estimators": [150, 300],
+        "max_depth": [6, 10, None],
+        "min_samples_split": [5, 15],
+        "min_samples_leaf": [2, 6],
+        "max_features": ["sqrt", 0.5],
+    },
+}
+EARLY_STOPPING_ROUNDS = 30
+
+
+# ==========================================
+# 1. DATA (loaded once, shared read-only)
+# ==========================================
+def load_tuning_data(model):
+    if model in ("churn", "persona"):
+        X = load_frame("data/TestTrainData/X_Train.csv")
+        data = {"X": X.to_numpy(dtype=np.float64), "columns": list(X.columns)}
+        if model == "churn":
+            data["y"] = load_frame("data/TestTrainData/y_Train.csv").values.ravel()
+        return data
+
+    df = load_frame('data/MarketingTimelineData/XY_Full_Marketing.csv')
+    X = df.drop('TargetSpendingPerSeason', axis=1)
+    y = df['TargetSpendingPerSeason']
+    # Same split as train_marketing_model: the held-out 20% is never seen here
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+    return {"X": X_train.to_numpy(dtype=np.float64), "y": y_train.to_numpy(dtype=np.float64),
+            "columns": list(X.columns)}
+
+
+# ==========================================
+# 2. TRIALS (run in worker processes)
+# ==========================================
+def _trial_churn(params, data):
+    X_fit, X_val, y_fit, y_val = train_test_split(data["X"], data["y"], test_size=0.2,
+                                                  random_state=42, stratify=data["y"])
+    model = XGBClassifier(random_state=42, eval_metric='mlogloss', n_jobs=1,
+                          early_stopping_rounds=EARLY_STOPPING_ROUNDS, **params)
+    model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    proba = model.predict_proba(X_val)
+    val_logloss = log_loss(y_val, proba, labels=model.classes_)
+    return {
+        "score": -val_logloss,
+        "val_logloss": val_logloss,
+        "val_accuracy": accuracy_score(y_val, model.classes_[proba.argmax(axis=1)]),
+        # What the trainer should use without early stopping
+        "best_params": {**params, "n_estimators": int(model.best_iteration) + 1},
+    }
+
+
+def _trial_persona(params, data):
+    X = data["X"]
+    model = KMeans(init='k-means++', random_state=42, n_init=10, **params)
+    labels = model.fit_predict(X)
+    silhouette = silhouette_score(X, labels, sample_size=min(len(X), 10_000), random_state=42)
+    return {"score": silhouette, "silhouette": silhouette, "inertia": float(model.inertia_), "best_params": params}
+
+
+def _trial_marketing(params, data):
+    X = pd.DataFrame(data["X"], columns=data["columns"])
+    r2s, rmses = [], []
+    for fit_idx, val_idx in KFold(n_splits=3, shuffle=True, random_state=42).split(X):
+        pipeline = build_marketing_pipeline(
+            RandomForestRegressor(random_state=42, n_jobs=1, **params), MARKETING_NUMERIC_COLS
+        )
+        pipeline.fit(X.iloc[fit_idx], data["y"][fit_idx])
+        y_pred = pipeline.predict(X.iloc[val_idx])
+        r2s.append(r2_score(data["y"][val_idx], y_pred))
+        rmses.append(np.sqrt(mean_squared_error(data["y"][val_idx], y_pred)))
+    return {"score": float(np.mean(r2s)), "cv_r2": float(np.mean(r2s)), "cv_rmse": float(np.mean(rmses)),
+            "best_params": params}
+
+
+TRIALS = {"churn": _trial_churn, "persona": _trial_persona, "marketing": _trial_marketing}
+
+
+def _run_trial(model, trial_id, params, data):
+    start = time.perf_counter()
+    result = TRIALS[model](params, data)
+    return {"trial_id": trial_id, "model": model, "params": params, **result,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+# ==========================================
+# 3. SEARCH STATE + LEADERBOARD
+# ==========================================
+def _trials_path(model, out_dir):
+    return os.path.join(out_dir, f"{model}_trials.jsonl")
+
+
+def load_trials(model, out_dir=TUNING_DIR):
+    path = _trials_path(model, out_dir)
+    if not os.path.exists(path):
+        return []
+    trials = []
+    with open(path) as f:
+        for line in f:
+            try:
+                trials.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Last line cut short by an interruption: that trial is rerun
+                continue
+    return trials
+
+
+def _drop_partial_line(path):
+    """Truncates the trials file to its last complete line, so appends start on a fresh one."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def write_leaderboard(model, trials, out_dir=TUNING_DIR):
+    rows = [{k: json.dumps(v) if isinstance(v, dict) else v for k, v in t.items()} for t in trials]
+    board = pd.DataFrame(rows).sort_values("score", ascending=False).reset_index(drop=True)
+    path = os.path.join(out_dir, f"{model}_leaderboard.csv")
+    board.to_csv(path, index_label="rank")
+    return board
+
+
+def best_params(model, out_dir=TUNING_DIR):
+    """Best trial's parameters, ready for the trainer (None if never tuned)."""
+    trials = load_trials(model, out_dir)
+    return max(trials, key=lambda t: t["score"])["best_params"] if trials else None
+
+
+# ==========================================
+# 4. SEARCH
+# ==========================================
+def candidate_params(model, search="grid", n_iter=20, seed=42, space=None):
+    space = space or SEARCH_SPACES[model]
+    if search == "grid":
+        return list(ParameterGrid(space))
+    return list(ParameterSampler(space, n_iter=min(n_iter, len(ParameterGrid(space))), random_state=seed))
+
+
+def tune(model, search="grid", n_iter=20, n_jobs=-1, out_dir=TUNING_DIR, restart=False, space=None):
+    """Runs the missing trials of a search in parallel and returns the leaderboard."""
+    os.makedirs(out_dir, exist_ok=True)
+    if restart and os.path.exists(_trials_path(model, out_dir)):
+        os.remove(_trials_path(model, out_dir))
+
+    data = load_tuning_data(model)
+    data_key = fingerprint([data["X"], data.get("y")])
+    candidates = {fingerprint({"model": model, "params": p, "data": data_key}): p
+                  for p in candidate_params(model, search, n_iter, space=space)}
+
+    done = {t["trial_id"]: t for t in load_trials(model, out_dir) if t["trial_id"] in candidates}
+    todo = [(trial_id, p) for trial_id, p in candidates.items() if trial_id not in done]
+    print(f"🔧 [TUNING] {model}: {len(candidates)} candidates, {len(done)} already done, running {len(todo)}")
+
+    trials = list(done.values())
+    if todo:
+        results = Parallel(n_jobs=n_jobs, return_as="generator_unordered", max_nbytes="1M", mmap_mode="r")(
+            delayed(_run_trial)(model, trial_id, p, data) for trial_id, p in todo
+        )
+        _drop_partial_line(_trials_path(model, out_dir))
+        with open(_trials_path(model, out_dir), "a") as f:
+            for i, result in enumerate(results, 1):
+                # One line per finished trial, flushed so an interruption loses nothing
+                f.write(json.dumps(result, default=str) + "\n")
+                f.flush()
+                trials.append(result)
+                print(f"   [{i}/{len(todo)}] score={result['score']:.4f} {result['params']} ({result['seconds']:.1f}s)")
+
+    board = write_leaderboard(model, trials, out_dir)
+    print(f"🏆 [TUNING] {model}: best score {board.loc[0, 'score']:.4f} with {board.loc[0, 'best_params']}")
+    return board
+
+
+# Execute
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search for the churn, persona and marketing models.")
+    parser.add_argument("models", nargs="*", default=list(SEARCH_SPACES), choices=list(SEARCH_SPACES))
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=20, help="candidates per model for --search random")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--out", default=TUNING_DIR)
+    parser.add_argument("--restart", action="store_true", help="discard previous trials instead of resuming")
+    args = parser.parse_args()
+
+    for name in args.models:
+        tune(name, args.search, args.n_iter, args.n_jobs, args.out, args.restart)
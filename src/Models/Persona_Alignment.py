@@ -0,0 +1,87 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# ─────────────────────────────────────────────
+# Stable persona IDs across KMeans retrains
+# ─────────────────────────────────────────────
+# KMeans numbers its clusters arbitrarily, so a retrain can swap persona 0
+# and 2 and silently relabel every customer (and the Pers_* one-hots the
+# marketing model was trained on). After fitting, the new centroids are
+# matched to the previous model's with the Hungarian algorithm (minimum
+# total squared distance) and the clusters are renumbered to the IDs they
+# matched. The ID -> name map travels inside the model as `persona_names_`
+# (and in the fused/flat exports), so the app and reports read names from
+# the artifact instead of a hardcoded dict.
+
+# Names of the committed 4-persona model (before names were stored in it)
+DEFAULT_PERSONA_NAMES = {
+    0: "Loyal High-Spender",
+    1: "Recent Explorer / Newbie",
+    2: "At-Risk / Hibernating",
+    3: "Loyal Active",
+}
+
+
+def persona_names(model, default=None):
+    """{persona id: name} stored in a persona model/pipeline/flat export (or `default`)."""
+    model = getattr(model, "named_steps", {}).get("model", model)
+    names = getattr(model, "persona_names_", None)
+    if names is None:
+        return dict(DEFAULT_PERSONA_NAMES if default is None else default)
+    return {int(k): v for k, v in names.items()}
+
+
+def match_centroids(new_centers, previous_centers):
+    """
+    Hungarian matching: new cluster i -> previous ID. New clusters left over
+    when k grew get the next unused IDs.
+    """
+    cost = ((new_centers[:, None, :] - previous_centers[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(cost)
+    mapping = dict(zip(rows.tolist(), cols.tolist()))
+    next_id = len(previous_centers)
+    for i in range(len(new_centers)):
+        if i not in mapping:
+            mapping[i] = next_id
+            next_id += 1
+    distances = {mapping[i]: float(np.sqrt(cost[i, mapping[i]])) for i in rows.tolist()}
+    return mapping, distances
+
+
+def _renumber(model, mapping):
+    """Puts new cluster i at position mapping[i] (IDs must be 0..k-1)."""
+    order = np.argsort([mapping[i] for i in range(len(mapping))])
+    model.cluster_centers_ = model.cluster_centers_[order]
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    if hasattr(model, "labels_"):
+        model.labels_ = inverse[model.labels_].astype(model.labels_.dtype)
+    # MiniBatchKMeans keeps per-cluster counts for partial_fit
+    if hasattr(model, "_counts"):
+        model._counts = model._counts[order]
+    return model
+
+
+def align_personas(model, previous=None):
+    """
+    Renumbers a fitted (MiniBatch)KMeans to the IDs of `previous` and sets
+    model.persona_names_. Without a previous model, only the names are set.
+    Returns {persona id: centroid distance to the previous persona}.
+    """
+    names = persona_names(previous) if previous is not None else dict(DEFAULT_PERSONA_NAMES)
+    distances = {}
+    if previous is not None:
+        previous_centers = np.asarray(previous.cluster_centers_)
+        if previous_centers.shape[1] != model.cluster_centers_.shape[1]:
+            raise ValueError("Previous persona model uses different features")
+        mapping, distances = match_centroids(model.cluster_centers_, previous_centers)
+        if len(previous_centers) > len(model.cluster_centers_):
+            # k shrank: keep the matched IDs but close the gaps so IDs stay 0..k-1
+            kept = sorted(mapping.values())
+            mapping = {i: kept.index(pid) for i, pid in mapping.items()}
+            names = {kept.index(pid): names.get(pid, f"Persona {pid}") for pid in kept}
+            distances = {kept.index(pid): d for pid, d in distances.items()}
+        _renumber(model, mapping)
+
+    model.persona_names_ = {i: names.get(i, f"Persona {i}") for i in range(len(model.cluster_centers_))}
+    return distances
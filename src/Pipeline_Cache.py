@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import inspect
+import joblib
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SRC_DIR, "PreData"))
+
+from CVS_Storage import resolve_frame_path
+
+DEFAULT_CACHE_DIR = '.pipeline_cache'
+
+
+# ==========================================
+# 1. FINGERPRINTS
+# ==========================================
+class FileInput:
+    """Marks a stage input that should be hashed from disk (not loaded)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def resolve(self):
+        return resolve_frame_path(self.path) or self.path
+
+
+def _hash_file(path, h):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def fingerprint(obj):
+    """Stable content hash for stage inputs: frames, arrays, files, models, params."""
+    h = hashlib.sha256()
+    if isinstance(obj, FileInput):
+        h.update(b"file")
+        _hash_file(obj.resolve(), h)
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr([(str(c), str(t)) for c, t in obj.dtypes.items()]).encode())
+        else:
+            h.update(f"{obj.name}:{obj.dtype}".encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        if obj.dtype == object:
+            h.update(fingerprint(obj.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (str, int, float, bool, type(None), np.generic)):
+        h.update(repr(obj).encode())
+    elif isinstance(obj, (list, tuple)):
+        h.update(type(obj).__name__.encode())
+        for item in obj:
+            h.update(fingerprint(item).encode())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            h.update(fingerprint(obj[k]).encode())
+    elif hasattr(obj, "__dict__") and not callable(obj):
+        # Fitted estimators: hash their learned state attribute by attribute,
+        # pickle bytes are not stable across a dump/load round-trip
+        h.update(f"{type(obj).__module__}.{type(obj).__qualname__}".encode())
+        h.update(fingerprint(vars(obj)).encode())
+    else:
+        h.update(pickle.dumps(obj, protocol=4))
+    return h.hexdigest()
+
+
+def code_fingerprint(*functions):
+    """Source hash of the stage implementation, so code edits invalidate the cache."""
+    return fingerprint([inspect.getsource(fn) for fn in functions])
+
+
+# ==========================================
+# 2. STAGE CACHE
+# ==========================================
+class StageCache:
+    """
+    Memoizes pipeline stages on sha256(stage, code, params, inputs).
+
+    Outputs are stored with joblib under <cache_dir>/<stage>/<key>.joblib and
+    listed in <cache_dir>/index.json. On a hit, `restore(outputs)` is called so
+    the stage's on-disk artifacts are rewritten from the cached values.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, enabled=True, refresh=False):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.refresh = refresh
+        self.index_path = os.path.join(cache_dir, "index.json")
+
+    # ── Index ──
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_path(self, stage, key):
+        return os.path.join(self.cache_dir, stage, f"{key}.joblib")
+
+    # ── Public API ──
+    def key(self, stage, inputs=None, params=None, code=""):
+        parts = {
+            "stage": stage,
+            "code": code,
+            "params": fingerprint(params or {}),
+            "inputs": {name: fingerprint(value) for name, value in sorted((inputs or {}).items())},
+        }
+        return fingerprint(parts)
+
+    def run(self, stage, compute, inputs=None, params=None, code="", restore=None):
+        """Returns the stage outputs, from cache when the key is still valid."""
+        if not self.enabled:
+            return compute()
+
+        key = self.key(stage, inputs, params, code)
+        path = self._entry_path(stage, key)
+        index = self._read_index()
+
+        if not self.refresh and key in index and os.path.exists(path):
+            try:
+                outputs = joblib.load(path)
+                if restore is not None:
+                    restore(outputs)
+                index[key]["hits"] += 1
+                index[key]["last_used"] = time.time()
+                self._write_index(index)
+                print(f"♻️  [CACHE] {stage}: hit ({key[:12]}), stage skipped")
+                return outputs
+            except Exception as e:
+                print(f"⚠️ [CACHE] {stage}: unreadable entry {key[:12]} ({e}), recomputing")
+
+        outputs = compute()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(outputs, path)
+        index[key] = {
+            "stage": stage,
+            "created": time.time(),
+            "last_used": time.time(),
+            "hits": 0,
+            "size_kb": round(os.path.getsize(path) / 1024, 1),
+            "params": params or {},
+        }
+        self._write_index(index)
+        print(f"💾 [CACHE] {stage}: stored ({key[:12]})")
+        return outputs
+
+    def entries(self):
+        rows = [{"key": key, **meta} for key, meta in self._read_index().items()]
+        df = pd.DataFrame(rows, columns=["stage", "key", "created", "last_used", "hits", "size_kb", "params"])
+        for col in ["created", "last_used"]:
+            df[col] = pd.to_datetime(df[col], unit="s")
+        return df.sort_values(["stage", "created"]).reset_index(drop=True)
+
+    def evict(self, stage=None, key=None):
+        """Removes entries matching stage and/or key prefix. Returns the number removed."""
+        index = self._read_index()
+        removed = 0
+        for k, meta in list(index.items()):
+            if stage is not None and meta["stage"] != stage:
+                continue
+            if key is not None and not k.startswith(key):
+                continue
+            path = self._entry_path(meta["stage"], k)
+            if os.path.exists(path):
+                os.remove(path)
+            del index[k]
+            removed += 1
+        self._write_index(index)
+        return removed
+
+    def clear(self):
+        return self.evict()
+
+
+# ==========================================
+# 3. CLI: inspect / evict
+# ==========================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or evict the pipeline stage cache.")
+    parser.add_argument("action", choices=["list", "evict", "clear"])
+    parser.add_argument("--stage", help="only entries of this stage")
+    parser.add_argument("--key", help="only entries whose key starts with this prefix")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = StageCache(args.cache_dir)
+    if args.action == "list":
+        entries = cache.entries()
+        if entries.empty:
+            print("Cache is empty.")
+        else:
+            entries["key"] = entries["key"].str[:12]
+            print(entries.to_string(index=False))
+    elif args.action == "evict":
+        print(f"🗑️  Evicted {cache.evict(args.stage, args.key)} entries.")
+    else:
+        print(f"🗑️  Cleared {cache.clear()} entries.")
@@ -2,56 +2,76 @@ import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from CVS_Report import Report
+from CVS_Storage import iter_frame_chunks, infer_csv_dtypes
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from CVS_Streaming_Stats import StreamingCorrelation
 
-# Load your data
-df = pd.read_csv('data/raw_data.csv')
-
-def analyze_and_plot_correlation(df, threshold=0.8):
-    # 1. Select only numeric columns
-    numeric_df = df.select_dtypes(include=[np.number])
-    
-    # 2. Calculate correlation matrix
-    corr_matrix = numeric_df.corr()
-    
-    # 3. Save the full matrix to CSV
-    corr_matrix.to_csv('correlation_matrix.csv')
-    print("Full correlation matrix saved to 'correlation_matrix.csv'.")
-    
-    # 4. Create the Heatmap Plot
-    plt.figure(figsize=(12, 10))
+# Your data
+data_path = 'data/raw_data.csv'
+
+
+def compute_correlation(data_path, threshold=0.8, chunksize=100_000):
+    # 1-2. Correlation of the numeric columns, accumulated chunk by chunk
+    # (same values as df.select_dtypes(include=[np.number]).corr())
+    correlation = None
+    for chunk in iter_frame_chunks(data_path, chunksize, dtype=infer_csv_dtypes(data_path, chunksize)):
+        if correlation is None:
+            correlation = StreamingCorrelation(chunk.select_dtypes(include=[np.number]).columns)
+        correlation.update(chunk)
+    corr_matrix = correlation.corr()
+
+    # 3. Identify High Correlation Pairs
+    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
+
+    high_corr_pairs = []
+    for column in upper.columns:
+        for row in upper.index:
+            val = upper.loc[row, column]
+            if abs(val) > threshold:
+                high_corr_pairs.append((row, column, float(val)))
+
+    return {"correlation_matrix": corr_matrix, "high_corr_pairs": high_corr_pairs, "threshold": threshold}
+
+
+def render_correlation(stats):
+    corr_matrix = stats["correlation_matrix"]
     # 'mask' hides the upper triangle to make the plot easier to read (since it's a mirror image)
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-    
-    sns.heatmap(corr_matrix, 
-                mask=mask, 
+
+    sns.heatmap(corr_matrix,
+                mask=mask,
                 annot=True,          # Show the numbers in the squares
                 fmt=".2f",           # Round to 2 decimals
                 cmap='coolwarm',     # Red for positive, Blue for negative
-                center=0, 
-                linewidths=.5, 
+                center=0,
+                linewidths=.5,
                 cbar_kws={"shrink": .8})
-    
+
     plt.title('Feature Correlation Heatmap', fontsize=16)
-    plt.tight_layout()
-    plt.savefig('correlation_heatmap.png')  # Saves the plot as an image
-    print("Heatmap saved as 'correlation_heatmap.png'.\n")
-    
-    # 5. Identify High Correlation Pairs
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    
-    high_corr_pairs = []
+
+
+correlation_report = Report("correlation", compute_correlation, render_correlation, figsize=(12, 10))
+
+
+def analyze_and_plot_correlation(data_path=data_path, threshold=0.8, force=False):
+    # Matrix, pairs and heatmap are cached in report/correlation/
+    stats = correlation_report.build({"data_path": data_path}, {"threshold": threshold}, force=force)
+    high_corr_pairs = [tuple(pair) for pair in stats["high_corr_pairs"]]
+
     print(f"--- High Correlation Pairs (Threshold > {threshold}) ---")
-    for column in upper.columns:
-        for row in upper.index:
-            val = upper.loc[row, column]
-            if abs(val) > threshold:
-                print(f"{row} <-> {column}: {val:.4f}")
-                high_corr_pairs.append((row, column, val))
-                
+    for row, column, val in high_corr_pairs:
+        print(f"{row} <-> {column}: {val:.4f}")
+
     if not high_corr_pairs:
         print("No pairs found with high correlation.")
-        
+
     return high_corr_pairs
 
+
 # Usage:
-high_corr_list = analyze_and_plot_correlation(df, threshold=0.8)
\ No newline at end of file
+if __name__ == "__main__":
+    high_corr_list = analyze_and_plot_correlation(data_path, threshold=0.8, force="--force" in sys.argv)
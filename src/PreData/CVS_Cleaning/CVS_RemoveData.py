@@ -2,8 +2,12 @@ import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
 import sys
-
-df = pd.read_csv('data/raw_data.csv')
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from CVS_Storage import load_frame, save_frame, iter_frame_chunks, infer_csv_dtypes, FrameChunkWriter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from CVS_Streaming_Stats import StreamingStats
 
 def clean_data_with_reports(df, var_threshold=0.95, corr_threshold=0.8, outlier_contamination=0.05):
     """
@@ -97,8 +101,187 @@ def clean_data_with_reports(df, var_threshold=0.95, corr_threshold=0.8, outlier_
     
     return df
 
+# ─────────────────────────────────────────────
+# Streaming mode (raw exports larger than RAM)
+# ─────────────────────────────────────────────
+DEDUP_RECORD = np.dtype([("h1", "<u8"), ("h2", "<u8"), ("pos", "<i8")])
+
+
+def _row_filter(chunk):
+    mask = pd.Series(True, index=chunk.index)
+    if 'Recency' in chunk.columns and 'CustomerTenureDays' in chunk.columns:
+        mask &= ((chunk['Recency'] >= 0) &
+                 (chunk['CustomerTenureDays'] >= 0) &
+                 (chunk['Recency'] <= chunk['CustomerTenureDays']))
+    if 'MonetaryTotal' in chunk.columns:
+        mask &= chunk['MonetaryTotal'] >= 0
+    return mask.to_numpy()
+
+
+def _spill_digests(chunk, spill_dir, n_buckets):
+    """Appends (128-bit row digest, row position) records to one file per digest bucket."""
+    records = np.empty(len(chunk), dtype=DEDUP_RECORD)
+    records["h1"] = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    records["h2"] = pd.util.hash_pandas_object(chunk, index=False, hash_key="ml_retail_dedup_").to_numpy()
+    records["pos"] = chunk.index.to_numpy()
+    bucket = records["h1"] % n_buckets
+    for b in np.unique(bucket):
+        with open(os.path.join(spill_dir, f"digests_{b}.bin"), "ab") as f:
+            records[bucket == b].tofile(f)
+
+
+def _drop_duplicate_rows(keep, spill_dir, n_buckets):
+    """Clears keep[pos] for every row whose digest already appeared earlier. One bucket in memory at a time."""
+    removed = 0
+    for b in range(n_buckets):
+        path = os.path.join(spill_dir, f"digests_{b}.bin")
+        if not os.path.exists(path):
+            continue
+        records = np.fromfile(path, dtype=DEDUP_RECORD)
+        records = records[np.lexsort((records["pos"], records["h2"], records["h1"]))]
+        repeated = np.zeros(len(records), dtype=bool)
+        repeated[1:] = (records["h1"][1:] == records["h1"][:-1]) & (records["h2"][1:] == records["h2"][:-1])
+        keep[records["pos"][repeated]] = False
+        removed += int(repeated.sum())
+        os.remove(path)
+    return removed
+
+
+def clean_data_streaming(input_path, output_path=None, chunksize=100_000,
+                         var_threshold=0.95, corr_threshold=0.8, outlier_contamination=0.05,
+                         spill_dir=None, n_buckets=256):
+    """
+    Same result as clean_data_with_reports(load_frame(input_path)) without
+    loading the raw export at once:
+
+    - pass 1 (CSV only): dtypes a full read would infer, so every chunk hashes alike
+    - pass 2: row filters per chunk; 128-bit row digests are spilled to
+      n_buckets files and the first occurrence of each is found bucket by bucket
+    - pass 3: StreamingStats (top-k sketches + co-moments) over the kept rows
+      -> low-variance and correlation drops; a column the sketch can't decide
+      gets its candidate values counted exactly in one more pass
+    - pass 4: the numeric columns left go to a disk-backed matrix for the
+      IsolationForest
+    - pass 5: stream the surviving rows/columns to output_path
+
+    The row mask, the digests and the forest matrix live in spill_dir (a
+    temporary directory by default). The one step that still needs memory
+    proportional to the rows is the IsolationForest itself: scikit-learn copies
+    the surviving numeric columns to an in-memory float32 array and scores
+    every row, so that part is not out-of-core.
+
+    Returns the cleaned DataFrame, or the written path when output_path is given.
+    """
+    print(f"🚀 Starting Streaming Cleaning (chunks of {chunksize} rows)...")
+    print("-" * 50)
+
+    dtypes = infer_csv_dtypes(input_path, chunksize)
+
+    def chunks():
+        return iter_frame_chunks(input_path, chunksize, dtype=dtypes)
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as work_dir:
+        # ── Pass 2: row filters, spilled duplicate digests
+        mask_path = os.path.join(work_dir, "keep.bin")
+        total_rows = filtered_out = 0
+        with open(mask_path, "wb") as mask_file:
+            for chunk in chunks():
+                total_rows += len(chunk)
+                keep = _row_filter(chunk)
+                filtered_out += int((~keep).sum())
+                keep.tofile(mask_file)
+                _spill_digests(chunk[keep], work_dir, n_buckets)
+
+        keep = np.memmap(mask_path, dtype=bool, mode="r+", shape=(total_rows,))
+        duplicates = _drop_duplicate_rows(keep, work_dir, n_buckets)
+        print(f"✅ STEP 0/0.5: Row Sanity Checks | Removed: {filtered_out} of {total_rows} rows")
+        print(f"✅ STEP 1: Duplicate Rows        | Removed: {duplicates} rows")
+        print("-" * 50)
+
+        def kept_chunks():
+            for chunk in chunks():
+                yield chunk[keep[chunk.index.to_numpy()]]
+
+        # ── Pass 3: column statistics of the kept rows
+        stats = StreamingStats(var_threshold, corr_threshold)
+        for chunk in kept_chunks():
+            stats.update(chunk)
+
+        cols_to_drop_var = stats.low_variance_columns()
+        ambiguous = stats.ambiguous_columns()
+        if ambiguous:
+            # Exact frequency of the values that could still reach var_threshold
+            top_counts = {
+                col: {v: 0 for v, count in stats.sketches[col].counts.items()
+                      if count >= var_threshold * stats.sketches[col].n}
+                for col in ambiguous
+            }
+            for chunk in kept_chunks():
+                for col, cands in top_counts.items():
+                    for value in cands:
+                        cands[value] += int((chunk[col] == value).sum())
+            resolved = {col for col in ambiguous
+                        if max(top_counts[col].values(), default=0) / stats.sketches[col].n >= var_threshold}
+            cols_to_drop_var = [col for col in stats.columns if col in cols_to_drop_var or col in resolved]
+        print(f"✅ STEP 2: Low Variance Columns")
+        print(f"   Dropped: {len(cols_to_drop_var)} columns ({', '.join(cols_to_drop_var) if cols_to_drop_var else 'None'})")
+        print("-" * 50)
+
+        cols_to_drop_corr = stats.high_correlation_columns(exclude=cols_to_drop_var)
+        print(f"✅ STEP 3: High Correlation")
+        print(f"   Dropped: {len(cols_to_drop_corr)} columns ({', '.join(cols_to_drop_corr) if cols_to_drop_corr else 'None'})")
+        print("-" * 50)
+
+        # ── Pass 4: Isolation Forest on the remaining numeric columns
+        drop_cols = cols_to_drop_var + cols_to_drop_corr
+        forest_cols = [col for col in stats.correlation.columns if col not in drop_cols]
+        n_kept = total_rows - filtered_out - duplicates
+        numeric = np.lib.format.open_memmap(os.path.join(work_dir, "numeric.npy"), mode="w+",
+                                            dtype=np.float64, shape=(n_kept, len(forest_cols)))
+        row = 0
+        for chunk in kept_chunks():
+            numeric[row:row + len(chunk)] = chunk[forest_cols].to_numpy(dtype=np.float64)
+            row += len(chunk)
+        for j in range(len(forest_cols)):
+            column = numeric[:, j]
+            missing = np.isnan(column)
+            if missing.any():
+                column[missing] = np.nanmedian(column)
+
+        iso = IsolationForest(contamination=outlier_contamination, random_state=42)
+        outlier_preds = iso.fit_predict(numeric)
+        del numeric
+        keep[np.flatnonzero(keep)[outlier_preds != 1]] = False
+        print(f"✅ STEP 4: Extreme Points (Outliers)")
+        print(f"   Removed: {int((outlier_preds != 1).sum())} rows (based on {outlier_contamination*100}% contamination)")
+        print("-" * 50)
+
+        # ── Pass 5: write surviving rows and columns
+        writer = FrameChunkWriter(output_path) if output_path else None
+        parts = []
+        n_out = 0
+        for chunk in kept_chunks():
+            chunk = chunk.drop(columns=drop_cols)
+            n_out += len(chunk)
+            if writer is not None:
+                writer.write(chunk)
+            else:
+                parts.append(chunk)
+        del keep
+
+    print(f"✨ FINAL CLEANING SUMMARY")
+    print(f"Final Shape: {n_out} rows x {len(stats.columns) - len(drop_cols)} columns")
+    if writer is not None:
+        return writer.close()
+    return pd.concat(parts)
+
 # Execute
-df_cleaned = clean_data_with_reports(df)
-output_path = "data/preparedData/cleaned_data.csv"
-df_cleaned.to_csv(output_path, index=False)
-print(f"\n💾 Cleaned data saved to: {output_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    output_path = "data/preparedData/cleaned_data.csv"
+    if "--stream" in sys.argv:
+        saved_path = clean_data_streaming('data/raw_data.csv', output_path)
+    else:
+        df = load_frame('data/raw_data.csv')
+        df_cleaned = clean_data_with_reports(df)
+        saved_path = save_frame(df_cleaned, output_path)
+    print(f"\n💾 Cleaned data saved to: {saved_path}")
\ No newline at end of file
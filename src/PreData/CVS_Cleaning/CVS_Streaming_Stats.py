@@ -0,0 +1,237 @@
+import pandas as pd
+import numpy as np
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from CVS_Storage import iter_frame_chunks
+
+# ─────────────────────────────────────────────
+# Incremental statistics for the cleaning checks
+# ─────────────────────────────────────────────
+# STEP 2 (low variance) and STEP 3 (high correlation) of the cleaning only
+# need a few running numbers per column, not the rows themselves:
+#
+#   - FrequencySketch: Space-Saving top-k counts per column (value_counts)
+#   - StreamingCorrelation: pairwise counts, means, M2 and co-moments merged
+#     batch by batch with Chan/Welford updates (df.corr(), pairwise NaN)
+#   - StreamingStats: both, fed with DataFrame batches, giving the same drop
+#     lists as clean_data_with_reports
+#
+# All three are mergeable and picklable, so statistics of new customers can be
+# folded into the saved state instead of re-reading the whole history.
+
+
+class FrequencySketch:
+    """
+    Mergeable top-k summary of one column's value frequencies.
+
+    Keeps at most `capacity` counters (pandas Series indexed by value). Each
+    estimated count is an upper bound and `count - error` a lower bound;
+    `floor` bounds the count of any value that is not tracked. A value whose
+    true frequency is above n / capacity is guaranteed to be tracked, and
+    counts are exact as long as the column has no more than `capacity`
+    distinct values.
+
+    A batch is folded in as one summary: its value_counts() are aligned with
+    the counters, summed (an untracked value counts as the other side's
+    floor), and only the `capacity` largest are kept.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.floor = 0
+        self.n = 0
+
+    def _combine(self, counts, errors, floor):
+        index = self.counts.index.append(counts.index).unique()
+        merged = self.counts.reindex(index, fill_value=self.floor) + counts.reindex(index, fill_value=floor)
+        merged_errors = self.errors.reindex(index, fill_value=self.floor) + errors.reindex(index, fill_value=floor)
+        self.floor += floor
+        if len(merged) > self.capacity:
+            order = np.argsort(-merged.to_numpy(), kind="stable")
+            dropped = merged.iloc[order[self.capacity:]]
+            # Everything left out is bounded by the largest dropped counter
+            self.floor = max(self.floor, int(dropped.max()))
+            merged, merged_errors = merged.iloc[order[:self.capacity]], merged_errors.iloc[order[:self.capacity]]
+        self.counts, self.errors = merged.astype(np.int64), merged_errors.astype(np.int64)
+
+    def update(self, series):
+        counts = series.value_counts()
+        self.n += int(counts.sum())
+        self._combine(counts.astype(np.int64), pd.Series(0, index=counts.index, dtype=np.int64), 0)
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        self._combine(other.counts, other.errors, other.floor)
+        return self
+
+    def top(self):
+        """(value, estimated count, max overestimate) of the most frequent value."""
+        if self.counts.empty:
+            return None, 0, 0
+        value = self.counts.idxmax()
+        return value, int(self.counts[value]), int(self.errors[value])
+
+    def top_fraction(self):
+        """Lower and upper bound of value_counts(normalize=True).iloc[0]."""
+        _, count, error = self.top()
+        if self.n == 0:
+            return 0.0, 0.0
+        return (count - error) / self.n, count / self.n
+
+
+class StreamingCorrelation:
+    """
+    Pearson correlation of numeric columns, updated batch by batch.
+
+    Like DataFrame.corr(), every pair only uses the rows where both columns
+    are present, so per pair (i, j) it keeps the row count, the mean of
+    column i over those rows, its M2 and the co-moment with column j.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        p = len(self.columns)
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))   # mean[i, j]: mean of column i over rows where i and j exist
+        self.m2 = np.zeros((p, p))     # m2[i, j]: sum of squared deviations of column i over those rows
+        self.comoment = np.zeros((p, p))
+        self._shift = None
+
+    def _combine(self, n_b, mean_b, m2_b, comoment_b):
+        n_a = self.n
+        n = n_a + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            w = np.where(n > 0, n_a * n_b / n, 0.0)
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * np.where(n > 0, n_b / n, 0.0), 0.0)
+        self.m2 = self.m2 + m2_b + delta ** 2 * w
+        self.comoment = self.comoment + comoment_b + delta * delta.T * w
+        self.n = n
+
+    def update(self, df):
+        X = df[self.columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(X)
+        if self._shift is None:
+            # Shift by the first batch's means so the batch sums stay small
+            with np.errstate(invalid="ignore"):
+                self._shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+        Z = np.where(present, X - self._shift, 0.0)
+        M = present.astype(np.float64)
+
+        n_b = M.T @ M
+        s = Z.T @ M                    # s[i, j]: sum of column i over rows where i and j exist
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_shifted = np.where(n_b > 0, s / n_b, 0.0)
+        m2_b = (Z ** 2).T @ M - s * mean_shifted
+        comoment_b = Z.T @ Z - s * mean_shifted.T
+        self._combine(n_b, mean_shifted + self._shift[:, None], m2_b, comoment_b)
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlations over different columns")
+        if self._shift is None:
+            self._shift = other._shift
+        self._combine(other.n, other.mean, other.m2, other.comoment)
+        return self
+
+    def corr(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            divisor = np.sqrt(np.clip(self.m2, 0, None) * np.clip(self.m2, 0, None).T)
+            result = np.where((self.n > 1) & (divisor > 0), self.comoment / divisor, np.nan)
+        return pd.DataFrame(np.clip(result, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+
+class StreamingStats:
+    """
+    Running low-variance and correlation checks of clean_data_with_reports.
+
+    update() with each batch (rows already filtered/deduplicated), then read
+    low_variance_columns() and high_correlation_columns(). Numeric columns are
+    fixed by the first batch, as select_dtypes would pick them on the full frame.
+    """
+
+    def __init__(self, var_threshold=0.95, corr_threshold=0.8, capacity=64):
+        self.var_threshold = var_threshold
+        self.corr_threshold = corr_threshold
+        self.capacity = capacity
+        self.columns = None
+        self.sketches = {}
+        self.correlation = None
+        self.n_rows = 0
+
+    def update(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self.sketches = {col: FrequencySketch(self.capacity) for col in self.columns}
+            self.correlation = StreamingCorrelation(df.select_dtypes(include=[np.number]).columns)
+        for col in self.columns:
+            self.sketches[col].update(df[col])
+        self.correlation.update(df)
+        self.n_rows += len(df)
+        return self
+
+    def merge(self, other):
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self.sketches = {col: FrequencySketch(self.capacity) for col in self.columns}
+            self.correlation = StreamingCorrelation(other.correlation.columns)
+        for col in self.columns:
+            self.sketches[col].merge(other.sketches[col])
+        self.correlation.merge(other.correlation)
+        self.n_rows += other.n_rows
+        return self
+
+    def low_variance_columns(self):
+        """Columns whose most frequent value covers >= var_threshold of non-null rows."""
+        # The lower bound is exact unless a column has more distinct values than
+        # the sketch capacity; see ambiguous_columns() for the undecidable ones.
+        return [col for col in self.columns if self.sketches[col].top_fraction()[0] >= self.var_threshold]
+
+    def ambiguous_columns(self):
+        """Columns whose drop decision depends on counts the sketch could not keep exact."""
+        return [col for col in self.columns
+                if self.sketches[col].top_fraction()[0] < self.var_threshold <= self.sketches[col].top_fraction()[1]]
+
+    def high_correlation_columns(self, exclude=()):
+        """Same rule as STEP 3: upper triangle |r| > corr_threshold, after dropping `exclude`."""
+        kept = [col for col in self.correlation.columns if col not in set(exclude)]
+        corr_matrix = self.correlation.corr().loc[kept, kept].abs()
+        upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
+        return [column for column in upper.columns if any(upper[column] > self.corr_threshold)]
+
+    def drop_decisions(self):
+        cols_to_drop_var = self.low_variance_columns()
+        return {"low_variance": cols_to_drop_var,
+                "high_correlation": self.high_correlation_columns(exclude=cols_to_drop_var)}
+
+
+# Execute: stream the raw export and compare with the in-memory checks
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else 'data/raw_data.csv'
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    df = pd.read_csv(path)
+    stats = StreamingStats()
+    for chunk in iter_frame_chunks(path, chunksize, dtype=df.dtypes.to_dict()):
+        stats.update(chunk)
+    decisions = stats.drop_decisions()
+
+    expected_var = [col for col in df.columns if df[col].value_counts(normalize=True).iloc[0] >= 0.95]
+    numeric_df = df.drop(columns=expected_var).select_dtypes(include=[np.number])
+    corr_matrix = numeric_df.corr().abs()
+    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
+    expected_corr = [column for column in upper.columns if any(upper[column] > 0.8)]
+    max_diff = (stats.correlation.corr() - df.select_dtypes(include=[np.number]).corr()).abs().max().max()
+
+    print(f"📊 Streamed {stats.n_rows} rows in chunks of {chunksize}")
+    print(f"Low variance     : {decisions['low_variance']} | matches in-memory: {decisions['low_variance'] == expected_var}")
+    print(f"High correlation : {decisions['high_correlation']} | matches in-memory: {decisions['high_correlation'] == expected_corr}")
+    print(f"Ambiguous columns: {stats.ambiguous_columns() or 'None'}")
+    print(f"Max |corr| difference vs DataFrame.corr(): {max_diff:.2e}")
@@ -1,7 +1,11 @@
 import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from CVS_Storage import load_frame
 
 
-df=pd.read_csv('data/preparedData/cleaned_data.csv')
+df=load_frame('data/preparedData/cleaned_data.csv')
 
 def validate_dataset_logic(df):
     report = []
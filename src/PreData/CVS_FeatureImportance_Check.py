@@ -1,6 +1,8 @@
+import os
+import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.decomposition import PCA
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_selection import RFE, mutual_info_classif
@@ -8,63 +10,126 @@ from sklearn.inspection import permutation_importance
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
+from CVS_Storage import load_frame
+from CVS_Report import Report
 
-# 1. Setup Data
-df = pd.read_csv('data/preparedData/prepared_data.csv')
-X = df.drop(columns=['CustomerID', 'ChurnRiskCategory'], errors='ignore')
-y = df['ChurnRiskCategory']
+# ─────────────────────────────────────────────
+# Consensus feature ranking (5 algorithms)
+# ─────────────────────────────────────────────
+# The five scorers are independent, so they run side by side in a process
+# pool; `n_jobs` is the thread count each one may use inside sklearn (by
+# default the cores are split between the running scorers). RFE can drop a
+# fraction of the remaining features per round (`rfe_step` in (0, 1))
+# instead of one at a time.
 
-# Split for Permutation Importance
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+ALGORITHMS = ["random_forest", "rfe", "pca", "mutual_info", "permutation"]
 
-# Standardize for PCA/RFE
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-X_test_scaled = scaler.transform(X_test)
 
 def normalize(s):
     return (s - s.min()) / (s.max() - s.min())
 
-print("🧪 Running Ultimate Feature Selection (5 Algorithms)...")
-
-# --- 1. Random Forest Importance ---
-rf = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
-score_rf = normalize(pd.Series(rf.feature_importances_, index=X.columns))
-
-# --- 2. RFE (Linear) ---
-rfe = RFE(estimator=LogisticRegression(max_iter=1000), n_features_to_select=1).fit(X_scaled, y)
-score_rfe = normalize(1 / pd.Series(rfe.ranking_, index=X.columns))
-
-# --- 3. PCA (Variance) ---
-pca = PCA(n_components=10).fit(X_scaled)
-pca_loadings = np.mean(np.abs(pca.components_), axis=0)
-score_pca = normalize(pd.Series(pca_loadings, index=X.columns))
-
-# --- 4. Mutual Information (Statistical) ---
-mi = mutual_info_classif(X, y, random_state=42)
-score_mi = normalize(pd.Series(mi, index=X.columns))
-
-# --- 5. Permutation Importance (Impact) ---
-perm = permutation_importance(rf, X_test, y_test, n_repeats=5, random_state=42)
-score_perm = normalize(pd.Series(perm.importances_mean, index=X.columns))
-
-# --- COMBINE & RANK ---
-ultimate_score = (score_rf + score_rfe + score_pca + score_mi + score_perm) / 5
-ultimate_score = ultimate_score.sort_values(ascending=False) * 100
-
-# --- FINAL REPORT ---
-print("\n" + "💎" * 20)
-print("  THE ULTIMATE ELITE 10 FEATURES")
-print("💎" * 20)
-for i, (feature, score) in enumerate(ultimate_score.head(10).items(), 1):
-    print(f"{i:2d}. {feature:<25} | Score: {score:.2f}/100")
-print("💎" * 20)
-
-# Visualize
-plt.figure(figsize=(12, 7))
-ultimate_score.head(15).plot(kind='barh', color='crimson').invert_yaxis()
-plt.title("Ultimate Elite Feature Ranking (Consensus of 5 Algos)")
-plt.xlabel("Ensemble Power Score (0-100)")
-plt.grid(axis='x', linestyle='--', alpha=0.7)
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+
+def load_importance_data(path='data/preparedData/prepared_data.csv'):
+    df = load_frame(path)
+    X = df.drop(columns=['CustomerID', 'ChurnRiskCategory'], errors='ignore')
+    y = df['ChurnRiskCategory']
+    return X, y
+
+
+def _fit_forest(X, y, n_jobs):
+    return RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs).fit(X, y)
+
+
+def _score(algorithm, X, y, n_jobs, rfe_step):
+    """Raw importance per feature for one algorithm (runs in a worker process)."""
+    if algorithm == "random_forest":
+        return pd.Series(_fit_forest(X, y, n_jobs).feature_importances_, index=X.columns)
+
+    if algorithm in ("rfe", "pca"):
+        # Standardize for PCA/RFE
+        X_scaled = StandardScaler().fit_transform(X)
+        if algorithm == "rfe":
+            rfe = RFE(estimator=LogisticRegression(max_iter=1000), n_features_to_select=1, step=rfe_step).fit(X_scaled, y)
+            return 1 / pd.Series(rfe.ranking_, index=X.columns)
+        pca = PCA(n_components=10).fit(X_scaled)
+        return pd.Series(np.mean(np.abs(pca.components_), axis=0), index=X.columns)
+
+    if algorithm == "mutual_info":
+        return pd.Series(mutual_info_classif(X, y, random_state=42, n_jobs=n_jobs), index=X.columns)
+
+    if algorithm == "permutation":
+        # Same forest as the random_forest scorer (fixed seed), refit here so
+        # the two scorers don't wait on each other
+        rf = _fit_forest(X, y, n_jobs)
+        _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        perm = permutation_importance(rf, X_test, y_test, n_repeats=5, random_state=42, n_jobs=n_jobs)
+        return pd.Series(perm.importances_mean, index=X.columns)
+
+    raise ValueError(f"Unknown algorithm '{algorithm}' (expected one of {ALGORITHMS})")
+
+
+def rank_features(X, y, n_jobs=None, rfe_step=1, parallel=True):
+    """
+    Scores every feature with the 5 algorithms and returns a DataFrame with
+    one normalized (0-1) column per algorithm plus the 'consensus' score
+    (mean x 100), sorted best first.
+    """
+    if parallel:
+        n_workers = min(len(ALGORITHMS), os.cpu_count() or 1)
+        n_jobs = n_jobs or max(1, (os.cpu_count() or 1) // n_workers)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {a: pool.submit(_score, a, X, y, n_jobs, rfe_step) for a in ALGORITHMS}
+            raw = {a: future.result() for a, future in futures.items()}
+    else:
+        raw = {a: _score(a, X, y, n_jobs or -1, rfe_step) for a in ALGORITHMS}
+
+    ranking = pd.DataFrame({a: normalize(raw[a]) for a in ALGORITHMS})
+    ranking["consensus"] = ranking[ALGORITHMS].sum(axis=1) / len(ALGORITHMS) * 100
+    return ranking.sort_values("consensus", ascending=False)
+
+
+def print_ranking(ranking, top=10):
+    print("\n" + "💎" * 20)
+    print("  THE ULTIMATE ELITE 10 FEATURES")
+    print("💎" * 20)
+    for i, (feature, score) in enumerate(ranking["consensus"].head(top).items(), 1):
+        print(f"{i:2d}. {feature:<25} | Score: {score:.2f}/100")
+    print("💎" * 20)
+
+
+def plot_ranking(ranking, top=15):
+    import matplotlib.pyplot as plt
+    ranking["consensus"].head(top).plot(kind='barh', color='crimson').invert_yaxis()
+    plt.title("Ultimate Elite Feature Ranking (Consensus of 5 Algos)")
+    plt.xlabel("Ensemble Power Score (0-100)")
+    plt.grid(axis='x', linestyle='--', alpha=0.7)
+
+
+def compute_feature_ranking(data_path, rfe_step=1, n_jobs=None, parallel=True):
+    X, y = load_importance_data(data_path)
+    print("🧪 Running Ultimate Feature Selection (5 Algorithms)...")
+    return {"ranking": rank_features(X, y, n_jobs=n_jobs, rfe_step=rfe_step, parallel=parallel)}
+
+
+# Ranking (parquet) + bar chart cached in report/feature_importance/
+feature_importance_report = Report("feature_importance", compute_feature_ranking,
+                                   lambda stats: plot_ranking(stats["ranking"]))
+
+
+# Execute
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consensus feature ranking over 5 algorithms.")
+    parser.add_argument("--path", default='data/preparedData/prepared_data.csv')
+    parser.add_argument("--n-jobs", type=int, default=None, help="threads per algorithm (default: cores / 5)")
+    parser.add_argument("--rfe-step", type=float, default=1,
+                        help="features removed per RFE round: count (>= 1) or fraction (0-1)")
+    parser.add_argument("--sequential", action="store_true", help="run the algorithms one after another")
+    parser.add_argument("--force", action="store_true", help="recompute even if the cached report is current")
+    args = parser.parse_args()
+
+    rfe_step = int(args.rfe_step) if args.rfe_step >= 1 else args.rfe_step
+    stats = feature_importance_report.build(
+        {"data_path": args.path}, {"rfe_step": rfe_step}, force=args.force,
+        options={"n_jobs": args.n_jobs, "parallel": not args.sequential},
+    )
+    print_ranking(stats["ranking"])
@@ -4,120 +4,138 @@ import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import numpy as np
+from CVS_Storage import load_frame, save_frame
 
 # ─────────────────────────────────────────────
 # 1. Setup paths
 # ─────────────────────────────────────────────
 raw_base_path = 'data/preparedData/prepared_data.csv'
 output_dir = 'data/MarketingTimelineData/'
-os.makedirs(output_dir, exist_ok=True)
 
-# ─────────────────────────────────────────────
-# 2. Load raw data and persona model
-# ─────────────────────────────────────────────
-df_unscaled = pd.read_csv(raw_base_path)
-persona_model = joblib.load('models/persona_classifier.pkl')
-main_scaler = joblib.load('models/main_scaler.pkl')
-
-# ─────────────────────────────────────────────
-# 3. Generate Persona labels using only numeric features
-# ─────────────────────────────────────────────
-persona_features = ['Recency', 'Frequency', 'CustomerTenureDays']
-X_scaled_temp = pd.DataFrame(
-    main_scaler.transform(df_unscaled[persona_features]),
-    columns=persona_features
-)
-
-df_unscaled['Persona'] = persona_model.predict(X_scaled_temp)
-
-# ─────────────────────────────────────────────
-# 4. Fix Region imbalance (group small regions)
-# ─────────────────────────────────────────────
-min_customers = 50
-region_counts = df_unscaled['Region'].value_counts()
-
-df_unscaled['RegionGrouped'] = df_unscaled['Region'].apply(
-    lambda x: x if region_counts[x] >= min_customers else 'Other'
-)
-
-print("📊 Region distribution after grouping:")
-print(df_unscaled['RegionGrouped'].value_counts())
-
-# ─────────────────────────────────────────────
-# 5. Feature Engineering
-# ─────────────────────────────────────────────
-# Target Spending proxy
-df_unscaled['TargetSpendingPerSeason'] = (
-    df_unscaled['Frequency'] * (df_unscaled['CustomerTenureDays'] / 365)
-)
-
-df_unscaled['TargetSpendingPerSeason'] = (
-    df_unscaled['TargetSpendingPerSeason']
-    .replace([np.inf, -np.inf], 0)
-    .fillna(0)
-)
-
-# Features to keep
-features_to_keep = [
-    'Recency',
-    'Frequency',
-    'CustomerTenureDays',
-    'WeekendPurchaseRatio',
-    'FavoriteSeason',
-    'RegionGrouped',
-    'Persona'
-]
-
-marketing_df = df_unscaled[features_to_keep + ['TargetSpendingPerSeason']].copy()
 
-# ─────────────────────────────────────────────
-# 6. One-hot encode categorical columns
-# ─────────────────────────────────────────────
-marketing_df = pd.get_dummies(
-    marketing_df,
-    columns=['FavoriteSeason', 'RegionGrouped', 'Persona'],
-    prefix=['Season', 'Reg', 'Pers'],
-    drop_first=False
-)
-
-# ─────────────────────────────────────────────
-# 7. Split into train/test
-# ─────────────────────────────────────────────
-X = marketing_df.drop('TargetSpendingPerSeason', axis=1)
-y = marketing_df['TargetSpendingPerSeason']
-
-X_train_m, X_test_m, y_train_m, y_test_m = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# ─────────────────────────────────────────────
-# 8. Scale numeric features only
-# ─────────────────────────────────────────────
-numeric_cols = ['Recency', 'Frequency', 'CustomerTenureDays', 'WeekendPurchaseRatio']
-marketing_scaler = StandardScaler()
-
-X_train_m_scaled = X_train_m.copy()
-X_test_m_scaled = X_test_m.copy()
-
-X_train_m_scaled[numeric_cols] = marketing_scaler.fit_transform(X_train_m[numeric_cols])
-X_test_m_scaled[numeric_cols] = marketing_scaler.transform(X_test_m[numeric_cols])
-
-# ─────────────────────────────────────────────
-# 9. Save datasets
-# ─────────────────────────────────────────────
-X_train_m_scaled.to_csv(os.path.join(output_dir, "X_Train_Marketing.csv"), index=False)
-X_test_m_scaled.to_csv(os.path.join(output_dir, "X_Test_Marketing.csv"), index=False)
-y_train_m.to_csv(os.path.join(output_dir, "y_Train_Marketing.csv"), index=False)
-y_test_m.to_csv(os.path.join(output_dir, "y_Test_Marketing.csv"), index=False)
-
-# Save full dataset
-full_scaled_df = pd.concat([X_train_m_scaled, X_test_m_scaled], axis=0)
-full_y = pd.concat([y_train_m, y_test_m], axis=0)
-full_scaled_df['TargetSpendingPerSeason'] = full_y.values
-full_scaled_df.to_csv(os.path.join(output_dir, "XY_Full_Marketing.csv"), index=False)
-
-# Save scaler
-joblib.dump(marketing_scaler, 'models/marketing_timeline_scaler.pkl')
-
-print("✅ Marketing Timeline datasets created (split & full)")
-print(f"📊 Feature count: {X_train_m_scaled.shape[1]} (including one-hot columns)")
\ No newline at end of file
+def build_marketing_datasets(df_unscaled, persona_model, main_scaler, output_dir=output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    df_unscaled = df_unscaled.copy()
+
+    # ─────────────────────────────────────────────
+    # 3. Generate Persona labels using only numeric features
+    # ─────────────────────────────────────────────
+    persona_features = ['Recency', 'Frequency', 'CustomerTenureDays']
+    X_scaled_temp = pd.DataFrame(
+        main_scaler.transform(df_unscaled[persona_features]),
+        columns=persona_features
+    )
+
+    df_unscaled['Persona'] = persona_model.predict(X_scaled_temp)
+
+    # ─────────────────────────────────────────────
+    # 4. Fix Region imbalance (group small regions)
+    # ─────────────────────────────────────────────
+    min_customers = 50
+    region_counts = df_unscaled['Region'].value_counts()
+
+    df_unscaled['RegionGrouped'] = df_unscaled['Region'].apply(
+        lambda x: x if region_counts[x] >= min_customers else 'Other'
+    )
+
+    print("📊 Region distribution after grouping:")
+    print(df_unscaled['RegionGrouped'].value_counts())
+
+    # ─────────────────────────────────────────────
+    # 5. Feature Engineering
+    # ─────────────────────────────────────────────
+    # Target Spending proxy
+    df_unscaled['TargetSpendingPerSeason'] = (
+        df_unscaled['Frequency'] * (df_unscaled['CustomerTenureDays'] / 365)
+    )
+
+    df_unscaled['TargetSpendingPerSeason'] = (
+        df_unscaled['TargetSpendingPerSeason']
+        .replace([np.inf, -np.inf], 0)
+        .fillna(0)
+    )
+
+    # Features to keep
+    features_to_keep = [
+        'Recency',
+        'Frequency',
+        'CustomerTenureDays',
+        'WeekendPurchaseRatio',
+        'FavoriteSeason',
+        'RegionGrouped',
+        'Persona'
+    ]
+
+    marketing_df = df_unscaled[features_to_keep + ['TargetSpendingPerSeason']].copy()
+
+    # ─────────────────────────────────────────────
+    # 6. One-hot encode categorical columns
+    # ─────────────────────────────────────────────
+    marketing_df = pd.get_dummies(
+        marketing_df,
+        columns=['FavoriteSeason', 'RegionGrouped', 'Persona'],
+        prefix=['Season', 'Reg', 'Pers'],
+        drop_first=False
+    )
+
+    # ─────────────────────────────────────────────
+    # 7. Split into train/test
+    # ─────────────────────────────────────────────
+    X = marketing_df.drop('TargetSpendingPerSeason', axis=1)
+    y = marketing_df['TargetSpendingPerSeason']
+
+    X_train_m, X_test_m, y_train_m, y_test_m = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    # ─────────────────────────────────────────────
+    # 8. Scale numeric features only
+    # ─────────────────────────────────────────────
+    numeric_cols = ['Recency', 'Frequency', 'CustomerTenureDays', 'WeekendPurchaseRatio']
+    marketing_scaler = StandardScaler()
+
+    X_train_m_scaled = X_train_m.copy()
+    X_test_m_scaled = X_test_m.copy()
+
+    X_train_m_scaled[numeric_cols] = marketing_scaler.fit_transform(X_train_m[numeric_cols])
+    X_test_m_scaled[numeric_cols] = marketing_scaler.transform(X_test_m[numeric_cols])
+
+    # ─────────────────────────────────────────────
+    # 9. Save datasets
+    # ─────────────────────────────────────────────
+    save_frame(X_train_m_scaled, os.path.join(output_dir, "X_Train_Marketing.csv"))
+    save_frame(X_test_m_scaled, os.path.join(output_dir, "X_Test_Marketing.csv"))
+    save_frame(y_train_m, os.path.join(output_dir, "y_Train_Marketing.csv"))
+    save_frame(y_test_m, os.path.join(output_dir, "y_Test_Marketing.csv"))
+
+    # Save full dataset
+    full_scaled_df = pd.concat([X_train_m_scaled, X_test_m_scaled], axis=0)
+    full_y = pd.concat([y_train_m, y_test_m], axis=0)
+    full_scaled_df['TargetSpendingPerSeason'] = full_y.values
+    save_frame(full_scaled_df, os.path.join(output_dir, "XY_Full_Marketing.csv"))
+
+    # Save scaler
+    joblib.dump(marketing_scaler, 'models/marketing_timeline_scaler.pkl')
+
+    print("✅ Marketing Timeline datasets created (split & full)")
+    print(f"📊 Feature count: {X_train_m_scaled.shape[1]} (including one-hot columns)")
+
+    return {
+        "X_train": X_train_m_scaled,
+        "X_test": X_test_m_scaled,
+        "y_train": y_train_m,
+        "y_test": y_test_m,
+        "full": full_scaled_df,
+        "scaler": marketing_scaler,
+    }
+
+
+if __name__ == "__main__":
+    # ─────────────────────────────────────────────
+    # 2. Load raw data and persona model
+    # ─────────────────────────────────────────────
+    df_unscaled = load_frame(raw_base_path)
+    persona_model = joblib.load('models/persona_classifier.pkl')
+    main_scaler = joblib.load('models/main_scaler.pkl')
+
+    build_marketing_datasets(df_unscaled, persona_model, main_scaler)
\ No newline at end of file
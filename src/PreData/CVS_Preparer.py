@@ -0,0 +1,250 @@
+import os
+import numpy as np
+import pandas as pd
+import joblib
+
+# ─────────────────────────────────────────────
+# Fitted preparation state (train once, transform anywhere)
+# ─────────────────────────────────────────────
+# prepare_data used to refit a LabelEncoder per column on every run and throw
+# the state away, so new customers could only be encoded by re-running the
+# whole preparation on the training data. DataPreparer keeps everything the
+# steps learn from the training frame:
+#
+#   - median per numeric column (STEP 1)
+#   - columns switched to the 'Unknown' placeholder (STEP 2)
+#   - sorted labels per categorical column, i.e. LabelEncoder.classes_ (STEP 5)
+#   - log1p shift per skewed column (STEP 7)
+#
+# fit_transform() is the training path (it may drop rows); transform() is the
+# serving path: it never drops rows and encodes unseen labels as -1.
+
+INVALID_TOKENS = ['?', 'none', 'null', 'nan', '', 'nan']
+PLACEHOLDER_TOKENS = ['?', 'None', 'null', 'nan', '', 'NaN']
+CYCLICAL_MAP = {'PreferredHour': 23, 'PreferredMonth': 12, 'PreferredDayOfWeek': 6}
+SKEW_TARGETS = ['MonetaryTotal', 'Frequency', 'TotalQuantity']
+IP_MAX_CHARS = 15  # "255.255.255.255"
+PREPARER_PATH = 'models/data_preparer.pkl'
+
+
+def _per_unique(series, fn):
+    """Evaluates a string expression once per distinct value and broadcasts it to the rows."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    values = fn(pd.Series(uniques, dtype=series.dtype))
+    return np.asarray(values)[codes]
+
+
+def parse_ipv4_octets(series):
+    """
+    Parses dotted IPs into an (n, 4) uint8 array (one byte per octet), same
+    values as str.split('.', expand=True) + to_numeric(errors='coerce').fillna(0).
+
+    Canonical addresses (digits and dots only, octets up to 255) are decoded
+    from a fixed-width uint8 byte matrix, one column of characters at a time;
+    anything else (signs, spaces, letters, missing values, octets > 255) goes
+    through the pandas path. If one of those yields a value outside 0..255
+    the array is int64 instead, so malformed octets keep their legacy value.
+    """
+    text = series.astype(str)
+    values = text.to_numpy(dtype=object, na_value="")
+    if len(values) == 0:
+        return np.zeros((0, 4), dtype=np.uint8)
+
+    fits = np.fromiter((isinstance(v, str) and len(v) <= IP_MAX_CHARS for v in values), dtype=bool, count=len(values))
+    raw = np.where(fits, values, "").astype(f"S{IP_MAX_CHARS}").view(np.uint8).reshape(len(values), IP_MAX_CHARS)
+    is_digit = (raw >= ord("0")) & (raw <= ord("9"))
+    is_dot = raw == ord(".")
+
+    # Accumulated in uint16 and saturated at 256, which marks an octet too large for a byte
+    wide = np.zeros((len(values), 4), dtype=np.uint16)
+    rows = np.arange(len(values))
+    part = np.zeros(len(values), dtype=np.uint8)
+    for c in range(IP_MAX_CHARS):
+        digit_rows = is_digit[:, c] & (part < 4)
+        r, p = rows[digit_rows], part[digit_rows]
+        wide[r, p] = np.minimum(wide[r, p] * 10 + (raw[digit_rows, c] - ord("0")), 256)
+        part += is_dot[:, c]
+
+    fast = fits & (is_digit | is_dot | (raw == 0)).all(axis=1) & (wide <= 255).all(axis=1)
+    octets = wide.astype(np.uint8)
+    del wide
+
+    slow = ~fast
+    if slow.any():
+        ip_split = text[slow].str.split('.', expand=True)
+        parsed = np.zeros((int(slow.sum()), 4), dtype=np.int64)
+        for i in range(4):
+            if i in ip_split.columns:
+                parsed[:, i] = pd.to_numeric(ip_split[i], errors='coerce').fillna(0).astype(int).to_numpy()
+        if ((parsed < 0) | (parsed > 255)).any():
+            octets = octets.astype(np.int64)
+        octets[slow] = parsed
+    return octets
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+class DataPreparer:
+    """Fitted, picklable version of the prepare_data steps."""
+
+    def __init__(self):
+        self.input_columns = None
+        self.output_columns = None
+        self.medians = {}
+        self.placeholder_cols = []
+        self.categories = {}
+        self.log_shifts = {}
+        self.cyclical_map = dict(CYCLICAL_MAP)
+        self.report = {}
+
+    # ── Steps shared by fit and transform ──
+    def _fill_and_flag(self, df, rows=None):
+        out = {}
+        for col in df.columns:
+            s = df[col] if rows is None else df[col].iloc[rows]
+            if col in self.medians:
+                s = s.fillna(self.medians[col])
+            elif col in self.placeholder_cols:
+                s = s.replace(PLACEHOLDER_TOKENS, 'Unknown').fillna('Unknown')
+            out[col] = s
+        return out
+
+    def _split_date_and_ip(self, out):
+        if 'RegistrationDate' in out:
+            # format='mixed' parses each value on its own, so parsing the
+            # distinct dates once gives the same result
+            reg = out.pop('RegistrationDate')
+            dates = pd.Series(_per_unique(reg, lambda u: pd.to_datetime(u, errors='coerce', format='mixed')), index=reg.index)
+            out['Reg_Year'] = dates.dt.year
+            out['Reg_Month'] = dates.dt.month
+            out['Reg_Day'] = dates.dt.day
+        if 'LastLoginIP' in out:
+            ip = out.pop('LastLoginIP')
+            octets = parse_ipv4_octets(ip)
+            for i in range(4):
+                out[f'IP_Octet_{i+1}'] = pd.Series(octets[:, i], index=ip.index)
+
+    def _cyclical(self, out):
+        for col, max_val in self.cyclical_map.items():
+            if col in out:
+                s = out.pop(col)
+                out[f'{col}_sin'] = np.sin(2 * np.pi * s / max_val)
+                out[f'{col}_cos'] = np.cos(2 * np.pi * s / max_val)
+
+    # ── Training path ──
+    def fit_transform(self, df, verbose=True):
+        say = print if verbose else (lambda *args, **kwargs: None)
+        self.input_columns = list(df.columns)
+
+        # --- 1. Missing Values ---
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        self.medians = {col: float(v) for col, v in df[numeric_cols].median().items()}
+        say(f"📊 [STEP 1] Numeric Imputation: ... COMPLETE (Median)")
+
+        # --- 2. Invalid Data Cleaning ---
+        total_removed = 0
+        self.placeholder_cols = []
+        keep = np.ones(len(df), dtype=bool)
+        n_kept = len(df)
+
+        # Selecting columns that are strings/objects
+        for col in df.select_dtypes(include=['object', 'string']).columns:
+            invalid = _per_unique(df[col], lambda u: u.astype(str).str.lower().isin(INVALID_TOKENS))
+            # Percentages are taken over the rows still kept, as when rows were dropped column by column
+            invalid_count = int((invalid & keep).sum())
+            invalid_pct = invalid_count / n_kept if n_kept else np.nan
+
+            if 0 < invalid_pct < 0.10:
+                keep &= ~invalid
+                n_kept -= invalid_count
+                total_removed += invalid_count
+            elif invalid_pct >= 0.10:
+                self.placeholder_cols.append(col)
+
+        rows = np.flatnonzero(keep) if n_kept < len(df) else None
+        out = self._fill_and_flag(df, rows)
+        say(f"🧹 [STEP 2] Invalid Data Cleaning: .. COMPLETE")
+        say(f"   >> Removed {total_removed} rows | Flagged {len(self.placeholder_cols)} cols as 'Unknown'")
+
+        # --- 3/4. Dates and IP ---
+        had_date, had_ip = 'RegistrationDate' in out, 'LastLoginIP' in out
+        self._split_date_and_ip(out)
+        if had_date:
+            say(f"📅 [STEP 3] Date Normalization: ..... COMPLETE (Y/M/D Split)")
+        if had_ip:
+            say(f"🌐 [STEP 4] IP Parsing: ............. COMPLETE (4-Octet Split)")
+
+        # --- 5. Categorical Encoding (Integer Mapping) ---
+        # Same codes as LabelEncoder().fit_transform(col.astype(str)): sorted labels
+        self.categories = {}
+        for col, s in out.items():
+            if col != 'CustomerID' and _is_text(s):
+                codes, uniques = pd.factorize(s, use_na_sentinel=False)
+                labels = pd.Series(uniques, dtype=s.dtype).astype(str)
+                label_codes, classes = pd.factorize(labels, sort=True)
+                classes = list(classes)
+                if (label_codes < 0).any():
+                    # LabelEncoder sorts missing values last
+                    label_codes[label_codes < 0] = len(classes)
+                    classes.append(np.nan)
+                self.categories[col] = classes
+                out[col] = pd.Series(label_codes.astype(np.int64)[codes], index=s.index)
+        say(f"🔢 [STEP 5] Label Encoding: ......... COMPLETE (Integer mapping)")
+
+        # --- 6. Cyclical Normalization ---
+        self._cyclical(out)
+        say(f"🔄 [STEP 6] Cyclical Mapping: ....... COMPLETE (Sine/Cosine)")
+
+        # --- 7. Skewness (Log Transform) ---
+        self.log_shifts = {}
+        for col in SKEW_TARGETS:
+            if col in out:
+                shift = abs(out[col].min()) + 1 if out[col].min() <= 0 else 0
+                self.log_shifts[col] = shift
+                out[col] = np.log1p(out[col] + shift)
+        say(f"📈 [STEP 7] Skewness Correction: .... COMPLETE (Log1p)")
+
+        prepared = pd.DataFrame(out, index=df.index if rows is None else df.index[rows])
+        self.output_columns = list(prepared.columns)
+        self.report = {"rows_in": len(df), "rows_removed": total_removed}
+        return prepared
+
+    # ── Serving path ──
+    def transform(self, df):
+        """Applies the fitted steps to new rows (no row is dropped; unseen labels -> -1)."""
+        if self.output_columns is None:
+            raise RuntimeError("DataPreparer is not fitted")
+        missing = [col for col in self.input_columns if col not in df.columns]
+        if missing:
+            raise KeyError(f"Missing input columns: {missing}")
+
+        out = self._fill_and_flag(df[self.input_columns])
+        self._split_date_and_ip(out)
+        for col, classes in self.categories.items():
+            s = out[col]
+            out[col] = pd.Series(_per_unique(s, lambda u: pd.Index(classes).get_indexer(u.astype(str))).astype(np.int64),
+                                 index=s.index)
+        self._cyclical(out)
+        for col, shift in self.log_shifts.items():
+            out[col] = np.log1p(out[col] + shift)
+        return pd.DataFrame(out, index=df.index)[self.output_columns]
+
+    def category_mapping(self, features=None):
+        """{column: {"code": "label"}} for the encoded columns (what CorrespondenceMap used to join for)."""
+        features = self.categories if features is None else features
+        return {
+            col: {str(code): str(label) for code, label in enumerate(self.categories[col])}
+            for col in features if col in self.categories
+        }
+
+    # ── Persistence ──
+    def save(self, path=PREPARER_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path=PREPARER_PATH):
+        return joblib.load(path)
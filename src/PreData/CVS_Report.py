@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import inspect
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless: figures are only ever written to files
+import matplotlib.pyplot as plt
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from Pipeline_Cache import FileInput, fingerprint, code_fingerprint
+from CVS_Storage import HAS_PYARROW, resolve_frame_path
+
+# ─────────────────────────────────────────────
+# Headless, cached analysis reports
+# ─────────────────────────────────────────────
+# The analysis scripts (churn distribution, correlation, feature importance)
+# used to end in plt.show() or write PNGs into the working directory, and
+# recomputed everything on every run. A report now lives in
+# report/<name>/:
+#
+#   <name>.png        the figure (rendered with the Agg backend)
+#   <table>.parquet   every DataFrame/Series statistic (index kept; .csv without pyarrow)
+#   stats.json        every other statistic (counts, pairs, thresholds, ...)
+#   manifest.json     sha256 of inputs + params + source of the report's modules
+#
+# When the manifest key still matches, the statistics are read back and
+# neither compute() nor render() runs.
+
+REPORT_DIR = 'report'
+
+
+def _is_file(value):
+    # 'data/x.csv' also counts when only its .parquet/.feather variant exists
+    return isinstance(value, str) and (os.path.isfile(value) or resolve_frame_path(value) is not None)
+
+
+class Report:
+    """One named report: compute(**inputs, **params) -> dict of statistics, render(stats) draws on a new figure."""
+
+    def __init__(self, name, compute, render, report_dir=REPORT_DIR, figsize=(12, 7)):
+        self.name = name
+        self.compute = compute
+        self.render = render
+        self.figsize = figsize
+        self.dir = os.path.join(report_dir, name)
+        self.manifest_path = os.path.join(self.dir, "manifest.json")
+        self.figure_path = os.path.join(self.dir, f"{name}.png")
+
+    def key(self, inputs, params):
+        return fingerprint({
+            "inputs": {k: FileInput(v) if _is_file(v) else v for k, v in inputs.items()},
+            "params": params,
+            # Whole modules, so edits to helpers called by compute/render count too
+            "code": code_fingerprint(inspect.getmodule(self.compute), inspect.getmodule(self.render)),
+        })
+
+    # ── Statistics on disk ──
+    def _table_path(self, table):
+        return os.path.join(self.dir, f"{table}.parquet" if HAS_PYARROW else f"{table}.csv")
+
+    def _save_stats(self, stats):
+        tables, values = {}, {}
+        for k, v in stats.items():
+            if isinstance(v, (pd.DataFrame, pd.Series)):
+                frame = v.to_frame() if isinstance(v, pd.Series) else v
+                path = self._table_path(k)
+                frame.to_parquet(path) if HAS_PYARROW else frame.to_csv(path)
+                tables[k] = {"file": os.path.basename(path), "series": isinstance(v, pd.Series)}
+            else:
+                values[k] = v
+        with open(os.path.join(self.dir, "stats.json"), "w") as f:
+            json.dump(values, f, indent=2, default=str)
+        return tables
+
+    def _load_stats(self, manifest):
+        with open(os.path.join(self.dir, "stats.json")) as f:
+            stats = json.load(f)
+        for k, meta in manifest["tables"].items():
+            path = os.path.join(self.dir, meta["file"])
+            frame = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, index_col=0)
+            stats[k] = frame.iloc[:, 0] if meta["series"] else frame
+        return stats
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    # ── Public API ──
+    def build(self, inputs=None, params=None, force=False, options=None):
+        """
+        Returns the statistics, recomputing and re-rendering only when the
+        inputs (file contents or values), params or code changed.
+        `inputs` values that are stored files are hashed from disk; `options`
+        are passed to compute() too but don't change the result (e.g. n_jobs),
+        so they are not part of the key.
+        """
+        inputs, params, options = inputs or {}, params or {}, options or {}
+        key = self.key(inputs, params)
+        manifest = self._read_manifest()
+        if not force and manifest and manifest["key"] == key and os.path.exists(self.figure_path):
+            try:
+                stats = self._load_stats(manifest)
+                print(f"♻️  [REPORT] {self.name}: up to date, skipped ({self.figure_path})")
+                return stats
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ [REPORT] {self.name}: unreadable statistics ({e}), rebuilding")
+
+        os.makedirs(self.dir, exist_ok=True)
+        start = time.perf_counter()
+        stats = self.compute(**inputs, **params, **options)
+        tables = self._save_stats(stats)
+
+        fig = plt.figure(figsize=self.figsize)
+        try:
+            self.render(stats)
+            plt.tight_layout()
+            fig.savefig(self.figure_path)
+        finally:
+            plt.close(fig)
+
+        with open(self.manifest_path, "w") as f:
+            json.dump({"key": key, "created": time.time(), "params": params, "tables": tables,
+                       "figure": os.path.basename(self.figure_path)}, f, indent=2, default=str)
+        print(f"🖼️  [REPORT] {self.name}: rendered in {time.perf_counter() - start:.2f}s -> {self.figure_path}")
+        return stats
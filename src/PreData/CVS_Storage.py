@@ -0,0 +1,189 @@
+import os
+import warnings
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Pluggable storage for pipeline DataFrames
+# ─────────────────────────────────────────────
+# Every stage used to round-trip through CSV. Artifacts are now written in a
+# columnar binary format (Parquet by default, or Feather) which keeps dtypes
+# (bool one-hots, ints, categories) and skips float formatting/parsing.
+#
+# Paths keep their historical ".csv" names: save_frame('.../cleaned_data.csv')
+# writes '.../cleaned_data.parquet', and load_frame('.../cleaned_data.csv')
+# reads whichever of .parquet/.feather/.csv exists and is the most recent.
+#
+#   ML_RETAIL_DATA_FORMAT = parquet | feather | csv   (default: parquet)
+#   ML_RETAIL_CSV_EXPORT  = 1  also write the .csv next to the binary file
+
+FORMAT_EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def resolve_format(fmt=None):
+    fmt = (fmt or os.environ.get("ML_RETAIL_DATA_FORMAT", "parquet")).lower()
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unknown data format '{fmt}' (expected one of {list(FORMAT_EXTENSIONS)})")
+    if fmt != "csv" and not HAS_PYARROW:
+        warnings.warn(f"pyarrow is not installed, falling back to CSV instead of {fmt}.")
+        fmt = "csv"
+    return fmt
+
+
+def artifact_path(path, fmt):
+    """'data/x.csv' + 'parquet' -> 'data/x.parquet'."""
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def resolve_frame_path(path):
+    """Returns the most recently written variant of `path` (any format), or None."""
+    candidates = []
+    for fmt in FORMAT_EXTENSIONS:
+        if fmt != "csv" and not HAS_PYARROW:
+            continue
+        candidate = artifact_path(path, fmt)
+        try:
+            candidates.append((os.stat(candidate).st_mtime_ns, candidate))
+        except FileNotFoundError:
+            continue
+    return max(candidates)[1] if candidates else None
+
+
+def save_frame(df, path, fmt=None, csv_export=None):
+    """Writes a DataFrame (or Series) without its index. Returns the written path."""
+    fmt = resolve_format(fmt)
+    if csv_export is None:
+        csv_export = os.environ.get("ML_RETAIL_CSV_EXPORT", "0") == "1"
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    out_path = artifact_path(path, fmt)
+    if fmt == "parquet":
+        df.to_parquet(out_path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(out_path)
+    else:
+        df.to_csv(out_path, index=False)
+
+    if csv_export and fmt != "csv":
+        df.to_csv(artifact_path(path, "csv"), index=False)
+    return out_path
+
+
+def load_frame(path, fmt=None):
+    """Reads a DataFrame saved by save_frame (or a legacy CSV)."""
+    real_path = artifact_path(path, fmt) if fmt else resolve_frame_path(path)
+    if real_path is None or not os.path.exists(real_path):
+        raise FileNotFoundError(f"No stored frame found for {path}")
+
+    ext = os.path.splitext(real_path)[1]
+    if ext == ".parquet":
+        return pd.read_parquet(real_path)
+    if ext == ".feather":
+        return pd.read_feather(real_path)
+    return pd.read_csv(real_path)
+
+
+# ─────────────────────────────────────────────
+# Chunked access (exports larger than RAM)
+# ─────────────────────────────────────────────
+def iter_frame_chunks(path, chunksize=100_000, dtype=None, fmt=None):
+    """
+    Yields consecutive DataFrame chunks of a stored frame. Chunk indexes
+    continue from one chunk to the next (0..n-1 overall), like a full read.
+    `dtype` is only used for CSV sources, where types are inferred per chunk.
+    """
+    real_path = artifact_path(path, fmt) if fmt else resolve_frame_path(path)
+    if real_path is None or not os.path.exists(real_path):
+        raise FileNotFoundError(f"No stored frame found for {path}")
+
+    ext = os.path.splitext(real_path)[1]
+    if ext == ".csv":
+        chunks = pd.read_csv(real_path, chunksize=chunksize, dtype=dtype)
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        chunks = (b.to_pandas() for b in pq.ParquetFile(real_path).iter_batches(batch_size=chunksize))
+    else:
+        import pyarrow as pa
+        reader = pa.ipc.open_file(real_path)
+        chunks = (reader.get_batch(i).to_pandas() for i in range(reader.num_record_batches))
+
+    offset = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def infer_csv_dtypes(path, chunksize=100_000):
+    """
+    Per-column dtype a full read_csv of `path` would infer, from one chunked
+    pass, so every chunk of a later iter_frame_chunks(..., dtype=...) parses
+    alike. None when the stored frame is not a CSV (binary formats keep dtypes).
+    """
+    real_path = resolve_frame_path(path)
+    if real_path is None or not real_path.endswith(".csv"):
+        return None
+
+    seen = {}
+    for chunk in iter_frame_chunks(path, chunksize):
+        for col, dtype in chunk.dtypes.items():
+            seen.setdefault(col, []).append(dtype)
+
+    dtypes = {}
+    for col, found in seen.items():
+        unique = list(dict.fromkeys(found))
+        if len(unique) == 1:
+            dtypes[col] = unique[0]
+        elif all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t) for t in unique):
+            dtypes[col] = np.dtype("float64")
+        else:
+            strings = [t for t in unique if pd.api.types.is_string_dtype(t)]
+            dtypes[col] = strings[0] if strings else np.dtype("object")
+    return dtypes
+
+
+class FrameChunkWriter:
+    """Appends DataFrame chunks to one artifact (same layout as save_frame)."""
+
+    def __init__(self, path, fmt=None):
+        self.fmt = resolve_format(fmt)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = artifact_path(path, self.fmt)
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.fmt == "csv":
+            df.to_csv(self.path, index=False, mode="w" if self._header else "a", header=self._header)
+            self._header = False
+            return
+
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self._schema)
+        self._writer.write_table(table.cast(self._schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,9 +3,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
-
-# Load data
-df = pd.read_csv('data/preparedData/prepared_data.csv')
+from CVS_Storage import load_frame, save_frame
 
 def split_and_save_data(df):
     # THE ELITE 3
@@ -25,7 +23,7 @@ def split_and_save_data(df):
     # --- SAVE X_unscaled IN data/preparedData/ ---
     prep_dir = "data/preparedData/"
     os.makedirs(prep_dir, exist_ok=True)
-    X.to_csv(os.path.join(prep_dir, "X_unscaled.csv"), index=False)
+    save_frame(X, os.path.join(prep_dir, "X_unscaled.csv"))
 
     # Set up output directory for splits
     output_dir = "data/TestTrainData/"
@@ -45,10 +43,10 @@ def split_and_save_data(df):
     X_test_scaled = pd.DataFrame(scaler.transform(X_test), columns=X.columns)
 
     # --- 5. SAVE SCALED SPLITS & LABELS ---
-    X_train_scaled.to_csv(os.path.join(output_dir, "X_Train.csv"), index=False)
-    X_test_scaled.to_csv(os.path.join(output_dir, "X_Test.csv"), index=False)
-    y_train.to_csv(os.path.join(output_dir, "y_Train.csv"), index=False)
-    y_test.to_csv(os.path.join(output_dir, "y_Test.csv"), index=False)
+    save_frame(X_train_scaled, os.path.join(output_dir, "X_Train.csv"))
+    save_frame(X_test_scaled, os.path.join(output_dir, "X_Test.csv"))
+    save_frame(y_train, os.path.join(output_dir, "y_Train.csv"))
+    save_frame(y_test, os.path.join(output_dir, "y_Test.csv"))
     
     # --- 6. SAVE SCALER ---
     os.makedirs('models', exist_ok=True)
@@ -60,4 +58,16 @@ def split_and_save_data(df):
     print(f"   - Train/Test (Scaled & Unscaled): {output_dir}")
     print(f"   - Scaler: models/main_scaler.pkl")
 
-split_and_save_data(df)
+    return {
+        "X_unscaled": X,
+        "X_train": X_train_scaled,
+        "X_test": X_test_scaled,
+        "y_train": y_train,
+        "y_test": y_test,
+        "scaler": scaler,
+    }
+
+if __name__ == "__main__":
+    # Load data
+    df = load_frame('data/preparedData/prepared_data.csv')
+    split_and_save_data(df)
@@ -1,50 +1,61 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
+import sys
+from CVS_Storage import load_frame, resolve_frame_path
+from CVS_Report import Report
 
 # --- 1. Load Data (Keeping your exact path) ---
 data_path = 'data/TestTrainData/y_Test.csv'
 
-if not os.path.exists(data_path):
-    print(f"❌ File not found at {data_path}")
-else:
-    # Load the data
-    y_data = pd.read_csv(data_path)
-    
+
+def compute_churn_distribution(data_path):
+    y_data = load_frame(data_path)
+
     # --- 2. Target the Churn Column ---
-    # Based on your previous output, column 0 is CustomerID. 
+    # Based on your previous output, column 0 is CustomerID.
     # We take column 1 which should be the Churn label.
-    target_col = y_data.columns[0] 
-    
-    print(f"✅ Analyzing column: '{target_col}'")
+    target_col = y_data.columns[0]
 
     # --- 3. Calculate Frequencies ---
     counts = y_data[target_col].value_counts().sort_index()
     percentages = y_data[target_col].value_counts(normalize=True).sort_index() * 100
-
-    print("\n" + "="*35)
-    print(f"📊 CHURN FREQUENCY (0-3)")
-    print("="*35)
     summary = pd.DataFrame({'Count': counts, 'Percentage (%)': percentages.round(2)})
-    print(summary)
-    print("="*35)
+    return {"target_col": target_col, "summary": summary}
+
+
+def render_churn_distribution(stats):
+    counts = stats["summary"]['Count']
 
-    # --- 4. Visualize ---
-    plt.figure(figsize=(8, 5))
     # Fixed the warning by assigning hue and x
     ax = sns.barplot(x=counts.index, y=counts.values, hue=counts.index, palette="magma", legend=False)
-    
+
     # Add counts on top of bars
     for i, v in enumerate(counts.values):
         ax.text(i, v + (max(counts.values)*0.02), str(v), ha='center', fontweight='bold')
 
-    plt.title(f"Distribution of {target_col} in Raw Data")
+    plt.title(f"Distribution of {stats['target_col']} in Raw Data")
     plt.xlabel("Churn Class (0-3)")
     plt.ylabel("Number of Customers")
-    
+
     # Adding descriptive labels if they match your business logic
     plt.xticks(ticks=[0, 1, 2, 3], labels=['Class 0', 'Class 1', 'Class 2', 'Class 3'])
-    
-    plt.tight_layout()
-    plt.show()
\ No newline at end of file
+
+
+churn_distribution_report = Report("churn_distribution", compute_churn_distribution, render_churn_distribution,
+                                   figsize=(8, 5))
+
+
+if __name__ == "__main__":
+    if resolve_frame_path(data_path) is None:
+        print(f"❌ File not found at {data_path}")
+    else:
+        # --- 4. Statistics + figure (cached in report/churn_distribution/) ---
+        stats = churn_distribution_report.build({"data_path": data_path}, force="--force" in sys.argv)
+        print(f"✅ Analyzing column: '{stats['target_col']}'")
+
+        print("\n" + "="*35)
+        print(f"📊 CHURN FREQUENCY (0-3)")
+        print("="*35)
+        print(stats["summary"])
+        print("="*35)
@@ -1,33 +1,33 @@
-import pandas as pd
 import json
 import os
-
-# Load both datasets
-raw_df = pd.read_csv('data/preparedData/cleaned_data.csv')
-encoded_df = pd.read_csv('data/preparedData/prepared_data.csv')
+from CVS_Preparer import DataPreparer, PREPARER_PATH
 
 # Features we want to map
 categorical_features = ['FavoriteSeason', 'CustomerType', 'RFMSegment', 'Region', 'ChurnRiskCategory']
+MAPPING_PATH = 'data/metadata/category_mapping.json'
+
+
+def build_category_mapping(preparer, output_path=MAPPING_PATH):
+    """
+    Writes { feature: { "0": "Automne", "1": "Hiver", ... } } for the Flask
+    Dashboard, straight from the encoder state fitted by prepare_data
+    (no more joining cleaned_data with prepared_data row by row).
+    """
+    mapping_report = preparer.category_mapping(categorical_features)
+
+    # Save as JSON for the Flask Dashboard
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(mapping_report, f, indent=4)
+
+    print(f"✅ Correspondence Map created in {output_path}")
+    return mapping_report
+
+
+if __name__ == "__main__":
+    # Rebuild the map from the preparer saved by CVS_Datafixer.py
+    preparer = DataPreparer.load(PREPARER_PATH)
 
-mapping_report = {}
-
-for col in categorical_features:
-    if col in raw_df.columns and col in encoded_df.columns:
-        # Create a unique mapping of Label -> Number
-        # We dropna to ensure we don't map nulls
-        pairs = pd.DataFrame({
-            'label': raw_df[col].astype(str),
-            'value': encoded_df[col]
-        }).drop_duplicates().sort_values('value')
-        
-        # Convert to dictionary { "0": "Summer", "1": "Winter" ... }
-        mapping_report[col] = dict(zip(pairs['value'].astype(int).astype(str), pairs['label']))
-
-# Save as JSON for the Flask Dashboard
-os.makedirs('data/metadata', exist_ok=True)
-with open('data/metadata/category_mapping.json', 'w') as f:
-    json.dump(mapping_report, f, indent=4)
-
-print("✅ Correspondence Map created in data/metadata/category_mapping.json")
-# Print a preview
-print(json.dumps(mapping_report, indent=2))
\ No newline at end of file
+    mapping_report = build_category_mapping(preparer)
+    # Print a preview
+    print(json.dumps(mapping_report, indent=2))
\ No newline at end of file
@@ -0,0 +1,273 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import joblib
+import pandas as pd
+
+# ==========================================
+# 1. SETUP PATHS
+# ==========================================
+# Every stage script lives in its own folder and expects the project root as
+# the working directory (paths like 'data/...'), exactly as when run by hand.
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SRC_DIR)
+for sub in ["PreData", os.path.join("PreData", "CVS_Cleaning"), os.path.join("PreData", "CVS_DataFix"), "Models"]:
+    sys.path.insert(0, os.path.join(SRC_DIR, sub))
+
+from CVS_Storage import load_frame, save_frame
+from CVS_RemoveData import clean_data_with_reports, clean_data_streaming
+import CVS_RemoveData
+import CVS_Datafixer
+import CVS_Preparer
+import CVS_Train_Test_Spilt
+import CVS_Marketing_Train_Test_Spilt
+from CVS_Datafixer import prepare_data
+from CVS_Preparer import DataPreparer, PREPARER_PATH
+from CorrespondenceMap import build_category_mapping
+from CVS_Train_Test_Spilt import split_and_save_data
+from Customer_Classifier import train_persona_model
+from CVS_Marketing_Train_Test_Spilt import build_marketing_datasets
+from Churn_Predictor import train_churn_model
+from Marketing_Regressor import train_marketing_model
+from Pipeline_Cache import StageCache, FileInput, code_fingerprint
+
+RAW_PATH = 'data/raw_data.csv'
+CLEANED_PATH = 'data/preparedData/cleaned_data.csv'
+PREPARED_PATH = 'data/preparedData/prepared_data.csv'
+SPLIT_DIR = 'data/TestTrainData/'
+MARKETING_DIR = 'data/MarketingTimelineData/'
+CLEAN_PARAMS = {"var_threshold": 0.95, "corr_threshold": 0.8, "outlier_contamination": 0.05}
+
+
+# ==========================================
+# 2. STAGES
+# ==========================================
+# Each stage reads its inputs from the shared context (the previous stage's
+# in-memory output) and only falls back to disk when the run starts later
+# in the chain. Outputs are still persisted so the app and the *_Test
+# scripts see the same artifacts as before.
+#
+# The preprocessing stages go through ctx["cache"] (a StageCache): they are
+# skipped when their inputs, parameters and code are unchanged, and their
+# artifacts are rewritten from the cached outputs.
+def _context_value(ctx, key, loader):
+    if key not in ctx:
+        ctx[key] = loader()
+    return ctx[key]
+
+
+def _load_split():
+    return {
+        "X_train": load_frame(os.path.join(SPLIT_DIR, "X_Train.csv")),
+        "X_test": load_frame(os.path.join(SPLIT_DIR, "X_Test.csv")),
+        "y_train": load_frame(os.path.join(SPLIT_DIR, "y_Train.csv")).iloc[:, 0],
+        "y_test": load_frame(os.path.join(SPLIT_DIR, "y_Test.csv")).iloc[:, 0],
+    }
+
+
+def _cache(ctx):
+    return _context_value(ctx, "cache", lambda: StageCache(enabled=False))
+
+
+def stage_clean(ctx):
+    if ctx.get("stream_clean"):
+        # Raw export too large for memory: clean it chunk by chunk straight to
+        # disk; the next stage loads the (much smaller) cleaned frame
+        params = ctx.get("clean_params", CLEAN_PARAMS)
+        clean_data_streaming(RAW_PATH, CLEANED_PATH, chunksize=ctx["stream_clean"], **params)
+        return {}
+
+    # Hash the raw export from disk so a cache hit never has to parse it
+    raw_input = ctx["raw"] if "raw" in ctx else FileInput(RAW_PATH)
+    params = ctx.get("clean_params", CLEAN_PARAMS)
+
+    def compute():
+        raw = _context_value(ctx, "raw", lambda: load_frame(RAW_PATH))
+        cleaned = clean_data_with_reports(raw, **params)
+        save_frame(cleaned, CLEANED_PATH)
+        return {"cleaned": cleaned}
+
+    return _cache(ctx).run(
+        "clean", compute,
+        inputs={"raw": raw_input},
+        params=params,
+        # Whole modules, so edits to the helpers they call invalidate the cache too
+        code=code_fingerprint(CVS_RemoveData),
+        restore=lambda out: save_frame(out["cleaned"], CLEANED_PATH),
+    )
+
+
+def stage_prepare(ctx):
+    cleaned = _context_value(ctx, "cleaned", lambda: load_frame(CLEANED_PATH))
+
+    def compute():
+        prepared = prepare_data(cleaned, PREPARED_PATH)
+        return {"prepared": prepared, "preparer": DataPreparer.load(PREPARER_PATH)}
+
+    def restore(out):
+        save_frame(out["prepared"], PREPARED_PATH)
+        out["preparer"].save(PREPARER_PATH)
+        build_category_mapping(out["preparer"])
+
+    return _cache(ctx).run(
+        "prepare", compute,
+        inputs={"cleaned": cleaned},
+        # prepare_data is split into module-level helpers: hash the whole modules
+        code=code_fingerprint(CVS_Datafixer, CVS_Preparer),
+        restore=restore,
+    )
+
+
+def stage_mapping(ctx):
+    # prepare already writes the map; this rebuilds it from the fitted encoders alone
+    preparer = _context_value(ctx, "preparer", lambda: DataPreparer.load(PREPARER_PATH))
+    return {"category_mapping": build_category_mapping(preparer)}
+
+
+def stage_split(ctx):
+    prepared = _context_value(ctx, "prepared", lambda: load_frame(PREPARED_PATH))
+
+    def restore(out):
+        split = out["split"]
+        save_frame(split["X_unscaled"], 'data/preparedData/X_unscaled.csv')
+        save_frame(split["X_train"], os.path.join(SPLIT_DIR, "X_Train.csv"))
+        save_frame(split["X_test"], os.path.join(SPLIT_DIR, "X_Test.csv"))
+        save_frame(split["y_train"], os.path.join(SPLIT_DIR, "y_Train.csv"))
+        save_frame(split["y_test"], os.path.join(SPLIT_DIR, "y_Test.csv"))
+        joblib.dump(split["scaler"], 'models/main_scaler.pkl')
+
+    def compute():
+        split = split_and_save_data(prepared)
+        return {"split": split, "main_scaler": split["scaler"]}
+
+    return _cache(ctx).run(
+        "split", compute,
+        inputs={"prepared": prepared},
+        code=code_fingerprint(CVS_Train_Test_Spilt),
+        restore=restore,
+    )
+
+
+def stage_persona(ctx):
+    split = _context_value(ctx, "split", _load_split)
+    main_scaler = _context_value(ctx, "main_scaler", lambda: joblib.load('models/main_scaler.pkl'))
+    return {"persona_model": train_persona_model(split["X_train"], scaler=main_scaler)}
+
+
+def stage_marketing_split(ctx):
+    prepared = _context_value(ctx, "prepared", lambda: load_frame(PREPARED_PATH))
+    persona_model = _context_value(ctx, "persona_model", lambda: joblib.load('models/persona_classifier.pkl'))
+    main_scaler = _context_value(ctx, "main_scaler", lambda: joblib.load('models/main_scaler.pkl'))
+
+    def restore(out):
+        marketing = out["marketing"]
+        save_frame(marketing["X_train"], os.path.join(MARKETING_DIR, "X_Train_Marketing.csv"))
+        save_frame(marketing["X_test"], os.path.join(MARKETING_DIR, "X_Test_Marketing.csv"))
+        save_frame(marketing["y_train"], os.path.join(MARKETING_DIR, "y_Train_Marketing.csv"))
+        save_frame(marketing["y_test"], os.path.join(MARKETING_DIR, "y_Test_Marketing.csv"))
+        save_frame(marketing["full"], os.path.join(MARKETING_DIR, "XY_Full_Marketing.csv"))
+        joblib.dump(marketing["scaler"], 'models/marketing_timeline_scaler.pkl')
+
+    return _cache(ctx).run(
+        "marketing_split",
+        lambda: {"marketing": build_marketing_datasets(prepared, persona_model, main_scaler)},
+        inputs={"prepared": prepared, "persona_model": persona_model, "main_scaler": main_scaler},
+        code=code_fingerprint(CVS_Marketing_Train_Test_Spilt),
+        restore=restore,
+    )
+
+
+def stage_churn(ctx):
+    split = _context_value(ctx, "split", _load_split)
+    main_scaler = _context_value(ctx, "main_scaler", lambda: joblib.load('models/main_scaler.pkl'))
+    return {"churn_model": train_churn_model(split["X_train"], split["y_train"].values.ravel(), scaler=main_scaler)}
+
+
+def stage_marketing(ctx):
+    marketing = _context_value(ctx, "marketing", lambda: {"full": load_frame('data/MarketingTimelineData/XY_Full_Marketing.csv')})
+    rf_model, _ = train_marketing_model(marketing["full"])
+    return {"marketing_model": rf_model}
+
+
+STAGES = [
+    ("clean", stage_clean),
+    ("prepare", stage_prepare),
+    ("mapping", stage_mapping),
+    ("split", stage_split),
+    ("persona", stage_persona),
+    ("marketing_split", stage_marketing_split),
+    ("churn", stage_churn),
+    ("marketing", stage_marketing),
+]
+STAGE_NAMES = [name for name, _ in STAGES]
+
+
+# ==========================================
+# 3. RUNNER
+# ==========================================
+def select_stages(start=None, stop=None, only=None):
+    if only:
+        unknown = [s for s in only if s not in STAGE_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown stages {unknown} (expected {STAGE_NAMES})")
+        return [s for s in STAGES if s[0] in only]
+
+    i = STAGE_NAMES.index(start) if start else 0
+    j = STAGE_NAMES.index(stop) + 1 if stop else len(STAGES)
+    if i >= j:
+        raise ValueError(f"Stage '{start}' comes after '{stop}'")
+    return STAGES[i:j]
+
+
+def run_pipeline(start=None, stop=None, only=None, track_memory=True, ctx=None, cache=None):
+    """Runs the selected stages in one process. Returns (context, timings DataFrame)."""
+    ctx = {} if ctx is None else ctx
+    ctx["cache"] = cache if cache is not None else StageCache()
+    records = []
+
+    if track_memory:
+        tracemalloc.start()
+    try:
+        for name, fn in select_stages(start, stop, only):
+            print("\n" + "#" * 60)
+            print(f"▶️  STAGE: {name}")
+            print("#" * 60)
+            if track_memory:
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            ctx.update(fn(ctx))
+            elapsed = time.perf_counter() - t0
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if track_memory else None
+            records.append({"stage": name, "seconds": round(elapsed, 3),
+                            "peak_mb": round(peak_mb, 2) if peak_mb is not None else None})
+    finally:
+        if track_memory:
+            tracemalloc.stop()
+
+    timings = pd.DataFrame(records)
+    print("\n" + "=" * 45)
+    print("⏱️  PIPELINE SUMMARY")
+    print("=" * 45)
+    print(timings.to_string(index=False))
+    print(f"Total: {timings['seconds'].sum():.2f}s" if not timings.empty else "No stage run.")
+    print("=" * 45)
+    return ctx, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ML_Retail data + training pipeline in one process.")
+    parser.add_argument("--from", dest="start", choices=STAGE_NAMES, help="first stage to run")
+    parser.add_argument("--to", dest="stop", choices=STAGE_NAMES, help="last stage to run")
+    parser.add_argument("--only", nargs="+", choices=STAGE_NAMES, help="run exactly these stages")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak-memory tracking")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute the preprocessing stages")
+    parser.add_argument("--refresh", action="store_true", help="recompute and overwrite cached stage outputs")
+    parser.add_argument("--stream-clean", type=int, metavar="ROWS", help="clean the raw export in chunks of ROWS rows")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+    run_pipeline(args.start, args.stop, args.only, track_memory=not args.no_memory,
+                 ctx={"stream_clean": args.stream_clean} if args.stream_clean else None,
+                 cache=StageCache(enabled=not args.no_cache, refresh=args.refresh))